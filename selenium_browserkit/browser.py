@@ -1,9 +1,8 @@
-import os
 import random
 import sys
+import threading
 import json
 import shutil
-import psutil
 import zipfile
 from pathlib import Path
 from math import ceil
@@ -19,6 +18,15 @@ from selenium.webdriver.chrome.options import Options as ChromeOptions
 from .node import Node
 from .utils import Utility, DIR_PATH
 from .utils.browser_helper import Chromium, TeleHelper, AIHelper
+from .utils.registry import ProfileRegistry
+from .utils.filelock import FileLock
+from .utils.process import ProcessTable, ProcessGroup
+from .utils.monitor import ResourceMonitor, ResourceBudget
+from .utils.clock import get_clock
+from .utils.trace import LatencyReport
+from .utils.ai_cache import AICache
+from .utils.startup import StartupGraph, ValidationCache
+from .utils.config import Config, load_config
 
 @dataclass
 class BrowserConfig:
@@ -27,6 +35,19 @@ class BrowserConfig:
     sys_chrome: bool = False
     use_tele: bool = False
     use_ai: bool = False
+    max_memory_mb: int | None = None
+    max_cpu_percent: float | None = None
+    budget_action: str = 'warn'
+    monitor_interval: float = 5
+    speed: float | None = None
+    trace: bool = False
+    page_load_strategy: str = 'normal'
+    ai_cache_ttl: float = 600
+    ai_cache_threshold: int | None = None
+    ai_cache_file: bool = False
+    ai_rpm: float = 15
+    ai_max_concurrent: int = 4
+    token_cache_ttl: float = 600
 
 class BrowserManager:                                                                                                                                                                              # Anh em cứ yên tâm chạy nhé, không có mã độc đâu! :D Chỉ giả vờ đánh lừa người ngoài chút thôi! 🚀
     def __init__(self, auto_handler=None, setup_handler =None) -> None:
@@ -69,13 +90,18 @@ class BrowserManager:
         self._user_data_dir = None
         self._extensions_dir = DIR_PATH / 'extensions'
         self._path_chromium = None
-        self._pid_path = None
+        self._registry: ProfileRegistry | None = None
+        self._startup: StartupGraph | None = None
+        self._monitor: ResourceMonitor | None = None
+        self._report = LatencyReport()
         self._tele_bot = None
         self._ai_bot = None
         self._matrix: list[list[str | None]] = [[None]]
         self._extensions = []
         self._proxies_info = []
+        self._proxies_from_config = False
         self._live_proxies_parts = []
+        self._matrix_lock = threading.Lock()
         # lấy kích thước màn hình
         monitors = get_monitors()
         if len(monitors) > 1:
@@ -87,7 +113,11 @@ class BrowserManager:
 
     @overload
     def update_config(
-        self, *, headless: bool, disable_gpu: bool, sys_chrome: bool, use_tele: bool, use_ai: bool) -> None: ...
+        self, *, headless: bool, disable_gpu: bool, sys_chrome: bool, use_tele: bool, use_ai: bool,
+        max_memory_mb: int | None, max_cpu_percent: float | None, budget_action: str, monitor_interval: float,
+        speed: float | None, trace: bool, page_load_strategy: str,
+        ai_cache_ttl: float, ai_cache_threshold: int | None, ai_cache_file: bool,
+        ai_rpm: float, ai_max_concurrent: int, token_cache_ttl: float) -> None: ...
     def update_config(self, **kwargs: BrowserConfig):
         """
         Cập nhật lại cấu hình cho BrowserManager trước khi thực thi.
@@ -109,6 +139,47 @@ class BrowserManager:
             use_ai (bool, optional):
                 Nếu True, khởi tạo class `AIHelper` và có thể dùng `Node.ask_ai` khi token được cấu hình `config.txt` hợp lệ.
                 Mặc định là False.
+            max_memory_mb (int, optional):
+                Tổng RAM (MB) tối đa cho cây tiến trình Chrome của mỗi profile. 
+                Khi đặt, `_run_multi` cũng chỉ mở profile mới khi máy còn đủ RAM trống cho ngân sách này (hoặc khi không còn profile nào đang chạy).
+                Mặc định là None (không giới hạn).
+            max_cpu_percent (float, optional):
+                CPU tối đa (%, 100 = một nhân) cho mỗi profile. Mặc định là None (không giới hạn).
+            budget_action (str, optional):
+                Xử lý khi vượt ngân sách: 'warn' (cảnh báo), 'close_tabs' (đóng tab nền), 'restart' (mở lại trình duyệt).
+                'close_tabs' và 'restart' được thực hiện giữa các bước của `Node.execute_chain`.
+                Mặc định là 'warn'.
+            monitor_interval (float, optional):
+                Chu kỳ (giây) lấy mẫu RAM/CPU. Mặc định là 5.
+            speed (float, optional):
+                Hệ số cho mọi khoảng chờ giả lập người dùng (`Utility.wait_time`, `Node.wait`, delay giữa các profile).
+                1 = bình thường, 0.2 = nhanh gấp 5 lần, 0 = không chờ. Không ảnh hưởng timeout chờ trang/phần tử.
+                Mặc định là None (giữ nguyên đồng hồ hiện tại).
+            trace (bool, optional):
+                Nếu True, đo thời gian từng bước của mọi `Node.execute_chain` (ngủ, chờ WebDriver, thử lại, kết quả)
+                và in báo cáo độ trễ theo từng bước, gom cho mọi profile, khi kết thúc. Xem `latency_report()`.
+                Mặc định là False.
+            page_load_strategy (str, optional):
+                Chiến lược tải trang của chromedriver: 'normal' (chờ load), 'eager' (chờ DOMContentLoaded) hoặc 'none'.
+                Dùng 'eager'/'none' để `Node.go_to(wait_until='commit' | 'domcontentloaded' | 'networkidle')` trả về sớm.
+                Mặc định là 'normal'.
+            ai_cache_ttl (float, optional):
+                Thời gian (giây) dùng lại câu trả lời của `Node.ask_ai` cho cùng prompt và cùng ảnh chụp,
+                dùng chung cho mọi profile. 0 = tắt cache. Mặc định là 600.
+            ai_cache_threshold (int, optional):
+                Mặc định None: ảnh phải giống hệt từng byte mới dùng lại câu trả lời.
+                Đặt số (ví dụ 4) để coi hai ảnh có dHash khác nhau tối đa bấy nhiêu bit (trên 64) là cùng một màn hình
+                - không dùng khi hỏi captcha (captcha khác nhau trên cùng bố cục trang có dHash rất gần nhau).
+            ai_cache_file (bool, optional):
+                Nếu True, lưu cache AI vào `ai_cache.sqlite3` (thư mục tool) để dùng lại giữa các lần chạy.
+                Mặc định là False.
+            ai_rpm (float, optional):
+                Số yêu cầu tối đa mỗi phút gửi lên Gemini, tính chung cho mọi profile. 0 = không giới hạn. Mặc định là 15.
+            ai_max_concurrent (int, optional):
+                Số yêu cầu AI được gửi đồng thời, các profile còn lại xếp hàng. Mặc định là 4.
+            token_cache_ttl (float, optional):
+                Thời gian (giây) nhớ token Telegram/Gemini đã xác thực (file `token_cache.json`),
+                mở lại tool trong khoảng này không cần xác thực qua mạng. 0 = luôn xác thực. Mặc định là 600.
         Args:
             **kwargs (BrowserConfig): 
                 Tập các key-value để ghi đè lên config hiện tại.
@@ -138,10 +209,22 @@ class BrowserManager:
         '''
         Utility._logger(profile_name, message)
 
+    def latency_report(self) -> LatencyReport:
+        '''
+        Báo cáo thời gian từng bước `Node.execute_chain` của mọi profile trong lần chạy (cần `update_config(trace=True)`
+        hoặc `execute_chain(..., trace=True)`).
+
+        Ví dụ:
+            for row in browser_manager.latency_report().steps():
+                print(row['chain'], row['step'], row['p95'], row['sleep'], row['roundtrip'])
+        '''
+        return self._report
+
     def _get_user_data_dir(self):
-        dir_path = Utility.read_config('USER_DATA_DIR')
-        if dir_path and Path(dir_path[0]).exists():
-            return Path(dir_path[0])
+        config = load_config()
+        dir_path = config.user_data_dir if config else None
+        if dir_path and dir_path.exists():
+            return dir_path
         else:
             return DIR_PATH/'user_data'
             
@@ -186,24 +269,44 @@ class BrowserManager:
         """
         Gán profile vào một ô trống và trả về tọa độ (x, y).
         """
-        for row in range(len(self._matrix)):
-            for col in range(len(self._matrix[0])):
-                if self._matrix[row][col] is None:
-                    self._matrix[row][col] = profile_name
-                    return row, col
+        with self._matrix_lock:
+            for row in range(len(self._matrix)):
+                for col in range(len(self._matrix[0])):
+                    if self._matrix[row][col] is None:
+                        self._matrix[row][col] = profile_name
+                        return row, col
         return None, None
 
     def _release_position(self, profile_name: int, row, col):
         """
         Giải phóng ô khi profile kết thúc.
         """
-        for row in range(len(self._matrix)):
-            for col in range(len(self._matrix[0])):
-                if self._matrix[row][col] == profile_name:
-                    self._matrix[row][col] = None
-                    return True
+        with self._matrix_lock:
+            for row in range(len(self._matrix)):
+                for col in range(len(self._matrix[0])):
+                    if self._matrix[row][col] == profile_name:
+                        self._matrix[row][col] = None
+                        return True
         return False
 
+    def _resize_matrix(self, number_profiles: int, max_concurrent_profiles: int):
+        """
+        Tạo lại ma trận vị trí khi đổi số profile chạy đồng thời giữa chừng, giữ nguyên ô của các profile đang chạy
+        (chuyển sang ô trống khác nếu ô cũ không còn trong ma trận mới).
+        """
+        with self._matrix_lock:
+            occupied = [(row, col, name) for row, cells in enumerate(self._matrix) for col, name in enumerate(cells) if name is not None]
+            self._get_matrix(number_profiles=max(1, number_profiles), max_concurrent_profiles=max_concurrent_profiles)
+            moved = []
+            for row, col, name in occupied:
+                if row < len(self._matrix) and col < len(self._matrix[0]):
+                    self._matrix[row][col] = name
+                else:
+                    moved.append(name)
+            free = [(row, col) for row, cells in enumerate(self._matrix) for col, name in enumerate(cells) if name is None]
+            for name, (row, col) in zip(moved, free):
+                self._matrix[row][col] = name
+
     def _create_extension_proxy(self, profile_name, proxy_parts):
 
         manifest_json = """
@@ -312,6 +415,7 @@ class BrowserManager:
         chrome_options.add_experimental_option('excludeSwitches', ['enable-logging', 'enable-automation'])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_argument('--log-level=3')
+        chrome_options.page_load_strategy = self.config.page_load_strategy
 
         # hiệu suất
         if Utility._need_no_sandbox():
@@ -354,7 +458,8 @@ class BrowserManager:
         for ext in self._extensions:
             chrome_options.add_extension(ext)
 
-        service = Service(log_path='NUL')
+        # chromedriver chạy trong process group riêng → đóng được cả cây Chrome bằng một tín hiệu
+        service = Service(log_path='NUL', popen_kw=ProcessGroup.popen_kwargs())
         self._log(profile_name, 'Đang mở Chrome...')
         driver = webdriver.Chrome(service=service, options=chrome_options)
 
@@ -520,80 +625,172 @@ class BrowserManager:
         self._extensions = result
 
     def _check_before_run_tool(self):
+        '''
+        Các bước kiểm tra trước khi chạy tool, chạy song song theo đồ thị phụ thuộc (`StartupGraph`):
+            - 'chromium': tải/cài Chromium (nếu không dùng Chrome hệ thống).
+            - 'tele', 'ai': xác thực token (kết quả thành công được nhớ `token_cache_ttl` giây trên đĩa).
+            - 'proxy:<i>' → 'proxies': kiểm tra từng proxy song song rồi gom danh sách proxy sống.
+            - 'extensions': tìm file extension.
+            - 'registry': đăng ký tool và dọn Chrome của các lease bị bỏ rơi.
+
+        Hàm trả về ngay sau khi xếp lịch các bước; nơi cần kết quả chờ đúng bước mình cần (`_wait_startup`),
+        nên profile đầu tiên mở được trước khi các bước chậm không liên quan (ví dụ xác thực AI) xong.
+        '''
         print("=================================")
         print('Checking trước khi chạy...')
         print("=================================")
         print("...")
-        if not self.config.sys_chrome:
+        if self.config.speed is not None:
+            get_clock().speed = max(0.0, float(self.config.speed))
+        self._startup = graph = StartupGraph()
+        validation_cache = ValidationCache(DIR_PATH / 'token_cache.json', ttl=self.config.token_cache_ttl)
+
+        def setup_chromium():
             self._path_chromium = Chromium().path
+
+        def setup_tele():
+            self._tele_bot = TeleHelper(validation_cache=validation_cache)
+
+        def setup_ai():
+            cache = None
+            if self.config.ai_cache_ttl > 0:
+                cache = AICache(
+                    threshold=self.config.ai_cache_threshold,
+                    ttl=self.config.ai_cache_ttl,
+                    path=DIR_PATH / 'ai_cache.sqlite3' if self.config.ai_cache_file else None)
+            self._ai_bot = AIHelper(cache=cache, rpm=self.config.ai_rpm, max_concurrent=self.config.ai_max_concurrent,
+                                    validation_cache=validation_cache)
+
+        def collect_proxies():
+            # Giữ thứ tự trong cấu hình
+            self._live_proxies_parts = [parts for parts in graph.wait(*proxy_steps) if parts]
+
+        def setup_registry():
+            # Đăng ký tool và dọn các lease bị bỏ rơi (tool tắt đột ngột)
+            registry = ProfileRegistry(self._user_data_dir)
+            registry.register_tool()
+            table = ProcessTable.snapshot()
+            for lease in registry.expire(table):
+                ProfileRegistry.process_group(lease, table).terminate(table=table)
+            registry.start_heartbeat()
+            self._registry = registry
+
+        if not self.config.sys_chrome:
+            graph.add('chromium', setup_chromium)
         # Đọc file config
         config_path = DIR_PATH / 'config.txt'
         if config_path.exists():
             if self.config.use_tele:
-                self._tele_bot = TeleHelper()
+                graph.add('tele', setup_tele)
             if self.config.use_ai:
-                self._ai_bot = AIHelper()
+                graph.add('ai', setup_ai)
         else:
             print(f"⚠️  Không tìm thấy file config: {config_path}\n→ Đang sử dụng cấu hình mặc định.\n📘 Tham khảo config_example.txt tại: https://github.com/tranledienlam/selenium-browserkit/tree/main/examples")      
         self._user_data_dir = self._get_user_data_dir()
 
         # check extension
         if self._extensions:
-            self._check_extensions()
+            graph.add('extensions', self._check_extensions)
 
         # check proxies
         if not self._proxies_info:
-            self._proxies_info = Utility.read_config('PROXY')
-            if self._proxies_info is None:
-                self._proxies_info = []
+            config = load_config()
+            self._proxies_info = config.proxies if config else []
+            self._proxies_from_config = True
         if self._proxies_info:
             print(f'🛠️  Đang kiểm tra proxy...')
-        for proxy_info in self._proxies_info:
-            proxy_parts = Utility._parse_proxy(proxy_info)
-            check_proxy = Utility._is_proxy_working(proxy_parts)
-            if check_proxy:
-                self._live_proxies_parts.append(proxy_parts)
-
-        # xử lý file pid nếu tồn tại
-        pid_files = list(self._user_data_dir.glob("*.pid"))
-        for file in pid_files:
-            python_pid = int(file.stem)
-            if not Utility._is_process_alive(python_pid):
-                Utility._remove_lock(file)
-        self._pid_path = self._user_data_dir/f"{os.getpid()}.pid"
-        Utility._pid_python(self._pid_path)
-        # Xử lý file lock nếu tồn tại
-        lock_files = list(self._user_data_dir.glob("*.lock"))
-        for lock in lock_files:
-            data = Utility._read_lock(lock)
-            if data:
-                if Utility._is_process_alive(data.get('PYTHONPID')):
-                    pass
-                else:
-                    Utility._kill_chrome(data.get('CHROMEPID'))
-                    Utility._remove_lock(lock)
+        proxy_steps = [f'proxy:{i}' for i in range(len(self._proxies_info))]
+        for step, proxy_info in zip(proxy_steps, self._proxies_info):
+            graph.add(step, lambda proxy_info=proxy_info: self._check_proxy(proxy_info))
+        graph.add('proxies', collect_proxies, deps=proxy_steps)
+
+        graph.add('registry', setup_registry)
+        self._monitor = ResourceMonitor(self.config.monitor_interval)
+
+    @staticmethod
+    def _check_proxy(proxy_info: str) -> dict | None:
+        '''Trả về thông tin proxy nếu proxy hoạt động, ngược lại None.'''
+        proxy_parts = Utility._parse_proxy(proxy_info)
+        return proxy_parts if Utility._is_proxy_working(proxy_parts) else None
+
+    def _refresh_proxies(self, proxies_info: list[str]):
+        '''Kiểm tra lại danh sách proxy dùng chung ở thread nền, thay `_live_proxies_parts` khi xong.'''
+        def refresh():
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                parts = list(pool.map(self._check_proxy, proxies_info))
+            self._live_proxies_parts = [proxy_parts for proxy_parts in parts if proxy_parts]
+            self._log(message=f'🔄 Proxy dùng chung: {len(self._live_proxies_parts)}/{len(proxies_info)} hoạt động')
+
+        threading.Thread(target=refresh, name='proxy-reload', daemon=True).start()
+
+    def _reload_config(self, config: Config, max_concurrent_profiles: int, delay_between_profiles: float, number_profiles: int) -> tuple[int, float]:
+        '''
+        Áp dụng `config.txt` vừa thay đổi trong lúc `_run_multi` đang chạy.
 
-    def _check_before_run_browser(self, path_lock, profile_name):
-        path_lock_chrome = self._user_data_dir/profile_name/"lockfile"
+        - MAX_PROFLIES: đổi số profile chạy đồng thời (ma trận vị trí được tạo lại, profile đang chạy giữ nguyên).
+        - DELAY_PROFILES: đổi thời gian chờ giữa hai lần mở profile.
+        - PROXY: kiểm tra lại proxy dùng chung ở thread nền (chỉ khi proxy lấy từ `config.txt`, không phải `add_proxies`).
 
-        # check lockfile chrome có tồn tại hay không
-        if path_lock_chrome.exists():
-            # Chờ profile được giải phóng nếu đang bị khóa
-            data_lock = Utility._read_lock(path_lock)
-            if data_lock == None:
-                pass
-            elif data_lock == {}:
-                Utility._remove_lock(path_lock)
-            else:
-                name_tool = data_lock.get("TOOL")
-                if not (name_tool == Utility._sanitize_text(DIR_PATH.name)) and Utility._is_process_alive(data_lock.get('PYTHONPID')):
-                    self._log(profile_name, f"❌ Đang lock bởi tool [{name_tool}]")
-                    return False
+        Returns:
+            tuple[int, float]: (max_concurrent_profiles, delay_between_profiles) mới.
+        '''
+        if config.max_profiles and config.max_profiles != max_concurrent_profiles:
+            self._log(message=f'🔄 MAX_PROFLIES: {max_concurrent_profiles} → {config.max_profiles}')
+            max_concurrent_profiles = config.max_profiles
+            self._resize_matrix(number_profiles, max_concurrent_profiles)
+        if config.delay_profiles is not None and config.delay_profiles != delay_between_profiles:
+            self._log(message=f'🔄 DELAY_PROFILES: {delay_between_profiles} → {config.delay_profiles}')
+            delay_between_profiles = config.delay_profiles
+        if self._proxies_from_config and config.proxies != self._proxies_info:
+            self._log(message=f'🔄 PROXY thay đổi, đang kiểm tra lại {len(config.proxies)} proxy...')
+            self._proxies_info = config.proxies
+            self._refresh_proxies(config.proxies)
+        return max_concurrent_profiles, delay_between_profiles
+
+    def _wait_startup(self, *steps: str):
+        '''Chờ các bước kiểm tra `steps` của `_check_before_run_tool` (không truyền → chờ tất cả).'''
+        if self._startup:
+            self._startup.wait(*steps)
+
+    def _get_profile_lock(self, profile_name: str) -> FileLock:
+        return FileLock(self._user_data_dir / f'{Utility._sanitize_text(profile_name)}.lock')
+
+    def _check_before_run_browser(self, profile_name) -> FileLock | None:
+        '''
+        Giành quyền độc quyền profile trước khi mở trình duyệt.
 
+        Returns:
+            FileLock | None: Khóa profile (phải giữ trong suốt phiên chạy), None nếu profile đang bận
+                hoặc không khởi tạo được sổ đăng ký profile (bước 'registry' lỗi).
+        '''
+        if self._registry is None:
+            self._log(profile_name, "❌ Không khởi tạo được sổ đăng ký profile (profiles.db), bỏ qua profile")
+            return None
+
+        # Khóa OS trên file <profile>.lock, tự nhả khi tool kết thúc (kể cả crash)
+        profile_lock = self._get_profile_lock(profile_name)
+        if not profile_lock.acquire():
+            lease = self._registry.get(profile_name)
+            self._log(profile_name, f"❌ Đang lock bởi tool [{lease.get('tool') if lease else '?'}]")
+            return None
+
+        # lockfile của Chrome (Windows) bị giữ độc quyền khi Chrome đang mở profile.
+        # Xóa được → file sót lại sau crash; không xóa được → Chrome ngoài tool đang dùng profile
+        path_lock_chrome = self._user_data_dir/profile_name/"lockfile"
+        try:
+            path_lock_chrome.unlink(missing_ok=True)
+        except OSError:
             self._log(profile_name, f"❌ Đang lock. Nhưng không xác định được tool cụ thể đang chạy")
-            return False
+            profile_lock.release()
+            return None
 
-        Utility._remove_lock(path_lock)
+        # Lease chỉ để hiển thị tool đang giữ và dọn Chrome khi crash
+        try:
+            self._registry.acquire(profile_name, force=True)
+        except Exception as e:
+            self._log(profile_name, f"❌ Không ghi được lease profile: {e}")
+            profile_lock.release()
+            return None
 
         # fix thuộc tính "exit_type": "Crashed" → "Normal".
         try:
@@ -616,33 +813,46 @@ class BrowserManager:
         except Exception as e:
             self._log(message={e})
 
-        return True
+        return profile_lock
 
-    def _check_after_run_browser(self, driver, path_lock):
-        # Tìm Chrome con của chromedriver
-        chrome_pid = None
+    def _check_after_run_browser(self, driver, profile_name) -> ProcessGroup:
+        # Nhóm tiến trình của chromedriver (leader, có process group riêng) và toàn bộ Chrome con
+        group = ProcessGroup()
         try:
-            chromedriver_pid = driver.service.process.pid
-            parent = psutil.Process(chromedriver_pid)
-            children = parent.children(recursive=True)
-            for child in children:
-                if "chrome" in child.name().lower():
-                    chrome_pid = child.pid
-                    break
+            group = ProcessGroup.from_leader(driver.service.process.pid)
         except Exception as e:
             print("Không tìm thấy Chrome con:", e)
 
-        # Lock profile với PID
-        Utility._lock_profile(path_lock, chrome_pid)
+        # Ghi nhóm tiến trình vào lease để dọn chính xác nếu tool crash
+        self._registry.set_processes(profile_name, group, group.find('chrome'))
         
-        return chrome_pid
+        return group
 
-    def _check_after_close_browser(self, path_lock, chrome_pid):
-        Utility._kill_chrome(chrome_pid)
-        Utility._remove_lock(path_lock)
+    def _check_after_close_browser(self, profile_name, group: ProcessGroup | None, profile_lock: FileLock):
+        if self._monitor:
+            self._monitor.unwatch(profile_name)
+        if group:
+            group.terminate()
+        self._registry.release(profile_name)
+        profile_lock.release()
 
     def _check_before_close_tool(self):
-        Utility._remove_lock(self._pid_path)
+        if self._startup:
+            self._startup.shutdown()
+        if self._monitor:
+            self._monitor.stop()
+        if len(self._report):
+            print("=================================")
+            print('⏱️  Thời gian từng bước execute_chain:')
+            print(self._report.format())
+            print("=================================")
+        if self._tele_bot:
+            self._tele_bot.close()
+        if self._ai_bot:
+            self._ai_bot.close()
+        if self._registry:
+            self._registry.stop_heartbeat()
+            self._registry.unregister_tool()
 
     def _run_browser(self, profile: dict, row: int = 0, col: int = 0, stop_flag: bool = False):
         '''
@@ -671,18 +881,48 @@ class BrowserManager:
         '''
         profile_name = profile['profile_name']
         proxy_info = profile.get('proxy_info')
-        path_lock = self._user_data_dir / f'''{Utility._sanitize_text(profile_name)}.lock'''
         
-        if not self._check_before_run_browser(path_lock=path_lock, profile_name=profile_name):
+        self._wait_startup('registry')
+        profile_lock = self._check_before_run_browser(profile_name=profile_name)
+        if not profile_lock:
+            # Trả ô để `_run_multi` không chờ mãi một profile không chạy
+            self._release_position(profile_name, row, col)
             return
 
         driver = None
+        group = None
+
+        def restart():
+            # Mở lại trình duyệt cùng profile khi vượt ngân sách tài nguyên (gọi từ Node.checkpoint)
+            nonlocal driver, group
+            url = None
+            try:
+                url = driver.current_url
+                driver.quit()
+            except Exception:
+                pass
+            group.terminate()
+            driver = self._browser(profile_name, proxy_info)
+            group = self._check_after_run_browser(driver=driver, profile_name=profile_name)
+            self._arrange_window(driver, row, col)
+            self._monitor.watch(profile_name, group, budget, restart)
+            if url and url.startswith('http'):
+                driver.get(url)
+            return driver
+
+        budget = ResourceBudget(self.config.max_memory_mb, self.config.max_cpu_percent, self.config.budget_action)
         try:
+            self._wait_startup('chromium', 'extensions', 'proxies')
             driver = self._browser(profile_name, proxy_info)
-            chrome_pid = self._check_after_run_browser(driver=driver, path_lock=path_lock)
+            group = self._check_after_run_browser(driver=driver, profile_name=profile_name)
+            if self._monitor:
+                self._monitor.watch(profile_name, group, budget, restart)
 
             self._arrange_window(driver, row, col)
-            node = Node(driver, profile_name, self._tele_bot, self._ai_bot)
+            # Xác thực Tele/AI chạy song song trong lúc Chrome khởi động
+            self._wait_startup('tele', 'ai')
+            node = Node(driver, profile_name, self._tele_bot, self._ai_bot, self._monitor, self._report)
+            node.trace = self.config.trace
 
             handler = self._setup_handler if stop_flag else self._auto_handler
             if handler:
@@ -702,6 +942,9 @@ class BrowserManager:
                 try:
                     Utility.wait_time(1, True)
                     self._log(profile_name, 'Đóng... wait')
+                    # Ghi nhận thêm renderer/GPU sinh ra trong lúc chạy trước khi chromedriver thoát
+                    if group:
+                        group.refresh(driver.service.process.pid)
 
                     driver.quit()
                 except Exception as e:
@@ -709,8 +952,9 @@ class BrowserManager:
                     pass
 
             # Giải phóng profile
-            self._check_after_close_browser(path_lock=path_lock,
-                                            chrome_pid=chrome_pid)
+            self._check_after_close_browser(profile_name=profile_name,
+                                            group=group,
+                                            profile_lock=profile_lock)
             self._release_position(profile_name, row, col)
 
     def _run_multi(self, profiles: list[dict], max_concurrent_profiles: int = 1, delay_between_profiles: int = 10):
@@ -728,27 +972,54 @@ class BrowserManager:
             - Xác định vị trí hiển thị trình duyệt (`row`, `col`) thông qua `_get_position`.
             - Khi có vị trí trống, hồ sơ sẽ được khởi chạy thông qua phương thức `run`.
             - Nếu không có vị trí nào trống, chương trình chờ 10 giây trước khi kiểm tra lại.
+            - Mỗi vòng lặp nạp lại `config.txt` nếu file thay đổi: MAX_PROFLIES, DELAY_PROFILES, PROXY có hiệu lực ngay (xem `_reload_config`).
         '''
         queue = [profile for profile in profiles]
         self._get_matrix(
             max_concurrent_profiles=max_concurrent_profiles,
             number_profiles=len(queue)
         )
-
-        with ThreadPoolExecutor(max_workers=max_concurrent_profiles) as executor:
+        config = load_config()
+        config_delay = config.delay_profiles if config else None
+        if config_delay is not None:
+            delay_between_profiles = config_delay
+        running = set()
+        ram_waiting = False
+
+        # Số thread không giới hạn cứng: số profile đồng thời do `running` và ma trận vị trí quyết định (đổi được khi chạy)
+        with ThreadPoolExecutor(max_workers=max(1, len(queue))) as executor:
             while len(queue) > 0:
+                # Nạp lại config.txt nếu file thay đổi trong lúc chạy
+                latest = load_config()
+                if latest is not None and latest is not config:
+                    config = latest
+                    max_concurrent_profiles, delay_between_profiles = self._reload_config(
+                        config, max_concurrent_profiles, delay_between_profiles, len(queue) + len(running))
+
+                running = {future for future in running if not future.done()}
                 profile = queue[0]
                 profile_name = profile['profile_name']
-                row, col = self._get_position(profile_name)
+                # Chỉ mở thêm profile khi máy còn đủ RAM cho ngân sách của nó → đỉnh RAM dễ dự đoán.
+                # Không còn profile nào đang chạy để giải phóng RAM → vẫn mở (chờ thêm cũng không có RAM)
+                if self.config.max_memory_mb and ResourceMonitor.host_available_mb() < self.config.max_memory_mb:
+                    if running:
+                        if not ram_waiting:
+                            self._log(profile_name, f'⏳ RAM trống dưới {self.config.max_memory_mb} MB, chờ profile khác giải phóng...')
+                            ram_waiting = True
+                        get_clock().poll(10)
+                        continue
+                    self._log(profile_name, f'⚠️ RAM trống dưới {self.config.max_memory_mb} MB nhưng không có profile nào đang chạy, vẫn mở profile')
+                ram_waiting = False
+                row, col = self._get_position(profile_name) if len(running) < max_concurrent_profiles else (None, None)
 
                 if row is not None and col is not None:
                     queue.pop(0)
-                    executor.submit(self._run_browser, profile, row, col)
+                    running.add(executor.submit(self._run_browser, profile, row, col))
                     # Thời gian chờ mở profile kế
                     Utility.wait_time(delay_between_profiles, True)
                 else:
                     # Thời gian chờ check lại
-                    Utility.wait_time(10, True)
+                    get_clock().poll(10)
 
     def _run_stop(self, profiles: list[dict]):
         '''
@@ -806,24 +1077,24 @@ class BrowserManager:
 
         # Đầu vào trước khi chạy tool
 
-        max_concurrent_profiles = Utility.read_config('MAX_PROFLIES')
-        try:
-            if max_concurrent_profiles:
-                max_concurrent_profiles = int(max_concurrent_profiles[0])
-            else:
-                max_concurrent_profiles = 4
-        except (ValueError, TypeError):
-            print(f'❌ Không thể đọc dữ liệu: (Sử dụng mặc định: 4)')
-            for text in max_concurrent_profiles:
-                print(f'    MAX_PROFLIES={text}')
-            max_concurrent_profiles = 4
-
-        # Thông báo nội dung Tool hoạt động
+        config = load_config()
+        if config and config.max_profiles:
+            max_concurrent_profiles = config.max_profiles
+        elif config and config.first('MAX_PROFLIES', 'MAX_PROFILES'):
+            print(f'❌ Không thể đọc dữ liệu: (Sử dụng mặc định: {max_concurrent_profiles})')
+            print(f'    MAX_PROFLIES={config.first("MAX_PROFLIES", "MAX_PROFILES")}')
+
+        # Thông báo nội dung Tool hoạt động (không chờ xác thực Tele/AI)
+        self._wait_startup('chromium', 'extensions')
         print("\n"+"=" * 60)
         print(f"⚙️  Tool Automation Airdrop đang sử dụng:")
-        if self._tele_bot and self._tele_bot.valid:
+        if not self._startup.done('tele'):
+            print(f"{'':<4}{'📍 Tele bot:':<22}đang kiểm tra...")
+        elif self._tele_bot and self._tele_bot.valid:
             print(f"{'':<4}{'📍 Tele bot:':<22}{self._tele_bot.bot_name}")
-        if self._ai_bot and self._ai_bot.valid:
+        if not self._startup.done('ai'):
+            print(f"{'':<4}{'📍 AI bot Gemini:':<22}đang kiểm tra...")
+        elif self._ai_bot and self._ai_bot.valid:
             print(f"{'':<4}{'📍 AI bot Gemini:':<22}{self._ai_bot.model_name}")
         if self._path_chromium:
             print(f"{'':<4}{'📍 Đường dẫn Chrome:':<22}{self._path_chromium}")
@@ -890,17 +1161,15 @@ class BrowserManager:
                 Utility._print_section('LỖI: Lựa chọn không hợp lệ. Vui lòng thử lại...', "🛑")
                 continue
             
-            ## Add profile đang hoạt động
-            active_profiles = {}
-            lock_files = list(self._user_data_dir.glob("*.lock"))
-            for lock in lock_files:
-                data = Utility._read_lock(lock)
-                if data:
-                    if Utility._is_process_alive(data.get('PYTHONPID')):
-                        active_profiles[lock.name] = data.get('TOOL')
+            ## Add profile đang hoạt động (try-lock không chặn trên file lock của profile)
+            self._wait_startup('registry')
+            active_profiles = self._registry.active() if self._registry else {}
             for profile in show_profiles:
                 name = profile["profile_name"]
-                profile["tool"] = active_profiles.get(name, None)
+                if FileLock.is_locked(self._get_profile_lock(name).path):
+                    profile["tool"] = active_profiles.get(name, '?')
+                else:
+                    profile["tool"] = None
 
             # Menu B
             if auto:
@@ -958,7 +1227,7 @@ class BrowserManager:
             # Loại bỏ profile đang mở
             if any(p.get("tool") is not None for p in execute_profiles):
                 Utility._print_section('Chương trình bỏ qua các profile đang mở ở tool khác', "🛑")
-                execute_profiles = [p for p in execute_profiles if p['tool'] is not None]
+                execute_profiles = [p for p in execute_profiles if p['tool'] is None]
 
             # Chạy tool
             if choice_a in ('1','2'):
@@ -976,24 +1245,28 @@ class BrowserManager:
                     if not isinstance(profile_name, str):
                         continue
                     profile_path = self._user_data_dir / profile['profile_name']
-                    lock_path = self._user_data_dir / f"{profile['profile_name']}.lock"
                     for _ in range(1,3):
                         try:
                             shutil.rmtree(profile_path)
                             profiles_to_deleted.append(profile['profile_name'])
-                            Utility._remove_lock(lock_path)
+                            if self._registry:
+                                self._registry.release(profile['profile_name'], force=True)
                             break
                         except Exception as e:
                             self._log(message=f"❌ Lỗi khi xóa profile {profile_name}: {e}")
-                            lock_files = list(self._user_data_dir.glob("*.lock"))
-                            for lock in lock_files:
-                                data = Utility._read_lock(lock)
-                                if data:
-                                    if Utility._sanitize_text(DIR_PATH.name) != data.get('TOOL') and not Utility._is_process_alive(data.get('PYTHONPID')):
-                                        pass
-                                    else:
-                                        Utility._kill_chrome(data.get('CHROMEPID'))
-                                        Utility._remove_lock(lock)
+                            if not self._registry:
+                                Utility.wait_time(2)
+                                continue
+                            # Chỉ kill Chrome còn sót của lease hết hạn hoặc do chính tiến trình này giữ
+                            # (tool khác chạy cùng thư mục có cùng tên tool nhưng khác PID)
+                            table = ProcessTable.snapshot()
+                            leases = self._registry.expire(table)
+                            lease = self._registry.get(profile['profile_name'])
+                            if self._registry.owns(lease):
+                                leases.append(lease)
+                                self._registry.release(profile['profile_name'])
+                            for lease in leases:
+                                ProfileRegistry.process_group(lease, table).terminate(table=table)
 
                             self._log(message=f"Thử lại 2s...")
                             Utility.wait_time(2)
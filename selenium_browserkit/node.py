@@ -1,3 +1,5 @@
+import time
+import base64
 from datetime import datetime
 from typing import cast
 from selenium import webdriver
@@ -8,33 +10,124 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, ElementClickInterceptedException, ElementNotInteractableException, ElementNotVisibleException, NoSuchWindowException, WebDriverException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, ElementClickInterceptedException, ElementNotInteractableException, ElementNotVisibleException, NoSuchWindowException, InvalidSessionIdException, WebDriverException
 
 from .utils import Utility, DIR_PATH
 from .utils.browser_helper import TeleHelper, AIHelper
+from .utils.monitor import ResourceMonitor, ResourceUsage
+from .utils import scripts
+from .utils.clock import get_clock
+from .utils.element_cache import ElementCache
+from .utils.trace import StepSpan, ChainResult, RoundTripMeter, LatencyReport
 
 class Node:
-    def __init__(self, driver: webdriver.Chrome, profile_name: str, tele_bot: TeleHelper|None = None, ai_bot: AIHelper|None = None) -> None:
+    def __init__(self, driver: webdriver.Chrome, profile_name: str, tele_bot: TeleHelper|None = None, ai_bot: AIHelper|None = None, monitor: ResourceMonitor|None = None, report: LatencyReport|None = None) -> None:
         '''
         Khởi tạo một đối tượng Node để quản lý và thực hiện các tác vụ tự động hóa trình duyệt.
 
         Args:
             driver (webdriver.Chrome): WebDriver điều khiển trình duyệt Chrome.
             profile_name (str): Tên profile được sử dụng để khởi chạy trình duyệt
+            monitor (ResourceMonitor, optional): Bộ theo dõi tài nguyên của BrowserManager (cung cấp `usage` và ngân sách RAM/CPU).
+            report (LatencyReport, optional): Nơi gom thời gian từng bước `execute_chain` của mọi profile.
         '''
         self._driver = driver
         self._profile_name = profile_name
         self._tele_bot = tele_bot
         self._ai_bot = ai_bot
+        self._monitor = monitor
+        self._report = report
         # Khoảng thời gian đợi mặc định giữa các hành động (giây)
         self.wait = 3
         self.timeout = 30  # Thời gian chờ mặc định (giây) cho các thao tác
+        # Cách chờ trước mỗi hành động khi không truyền `wait`:
+        #   - 'ready': chờ trang sẵn sàng (DOM yên lặng, hết request, phần tử đứng yên), tối đa `self.wait` giây
+        #   - 'sleep': luôn ngủ `self.wait` giây (±40%) như trước
+        self.wait_policy = 'ready'
+        # Thời gian chờ tối thiểu (giây, ±40%) trước mỗi hành động ở chế độ 'ready' để thao tác giống người
+        self.min_wait = 0.3
+        # Cache kết quả find/finds, bật bằng `enable_cache()`
+        self._cache: ElementCache | None = None
+        # Đo thời gian từng bước của mọi `execute_chain` (mặc định tắt, bật riêng từng lần bằng `trace=True`)
+        self.trace = False
+        # Kết quả đo của chuỗi gần nhất (khi có đo)
+        self.last_chain: ChainResult | None = None
+        # Thời điểm các mốc tải trang của lần `go_to` gần nhất
+        self.last_navigation: dict | None = None
     
     def _get_wait(self, wait: float|None = None):
         if wait is None:
             wait = self.wait
         return wait
     
+    def _pre_wait(self, wait: float|None = None, fix: bool = False, element: WebElement|None = None):
+        '''
+        Chờ trước khi thực hiện hành động.
+
+        - `wait` được truyền vào, hoặc `wait_policy = 'sleep'` → ngủ đúng thời gian đó.
+        - `wait_policy = 'ready'` → chờ trang sẵn sàng (tối đa `self.wait` giây thật, không nhân `speed`), sau đó bù cho đủ `self.min_wait`.
+        '''
+        if wait is not None or self.wait_policy != 'ready':
+            Utility.wait_time(self._get_wait(wait), fix)
+            return
+
+        clock = get_clock()
+        start = clock.now()
+        if self.wait_for_ready(timeout=self.wait, element=element) is None:
+            # Không chạy được script (trang chặn JS, tab đang đóng, ...) → quay về cách ngủ cũ
+            Utility.wait_time(self.wait, fix)
+            return
+        floor = self.min_wait if fix else clock.jitter(self.min_wait)
+        # Thời gian chờ trang đã là thời gian thực → chỉ bù phần còn thiếu (quy về thang `speed`)
+        elapsed = (clock.now() - start) / clock.speed if clock.speed else floor
+        if floor > elapsed:
+            Utility.wait_time(floor - elapsed, True)
+
+    def enable_cache(self, max_size: int = 128):
+        '''
+        Bật cache kết quả `find`/`finds` theo (by, value, parent_element).
+
+        Args:
+            max_size (int, optional): Số locator tối đa được cache (LRU). Mặc định 128.
+
+        Mô tả:
+            - Lần tìm lặp lại chỉ tốn một `execute_script` rất nhẹ để kiểm tra DOM chưa đổi, không `WebDriverWait`
+              và không chờ `wait_policy` (trừ khi truyền `wait`).
+            - Cache tự mất hiệu lực khi điều hướng, đổi/đóng tab, reload hoặc khi DOM đổi cấu trúc/thuộc tính.
+              Thay đổi chỉ ở text không làm mất cache, nên tránh dùng cache cho XPath lọc theo text.
+        '''
+        self._cache = ElementCache(max_size)
+
+    def disable_cache(self):
+        '''Tắt cache kết quả `find`/`finds`.'''
+        self._cache = None
+
+    def _invalidate_cache(self):
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _dom_generation(self) -> tuple[str, int] | None:
+        try:
+            page_id, generation = self._driver.execute_script(scripts.DOM_GENERATION)
+            return page_id, generation
+        except WebDriverException:
+            return None
+
+    def _from_cache(self, by: str, value: str, parent_element: WebElement|None, wait: float|None, many: bool = False) -> list[WebElement] | None:
+        if self._cache is None:
+            return None
+        generation = self._dom_generation()
+        if generation is None:
+            return None
+        elements = self._cache.get(ElementCache.key(by, value, parent_element, many), *generation)
+        if elements and wait is not None:
+            Utility.wait_time(wait)
+        return elements
+
+    def _to_cache(self, by: str, value: str, parent_element: WebElement|None, generation: tuple[str, int] | None, elements: list[WebElement], many: bool = False):
+        if self._cache is not None and generation is not None:
+            self._cache.put(ElementCache.key(by, value, parent_element, many), elements, *generation)
+
     def _get_timeout(self, timeout: float|None = None):
         if timeout is None:
             timeout = self.timeout
@@ -42,9 +135,9 @@ class Node:
     
     def _save_screenshot(self) -> str|None:
         snapshot_dir = DIR_PATH / 'snapshot'
-        screenshot_png = self.take_screenshot()
+        screenshot = self.capture(format='jpeg', quality=80)
         
-        if screenshot_png is None:
+        if screenshot is None:
             return None
         
         if not snapshot_dir.exists():
@@ -53,10 +146,11 @@ class Node:
             self.log(f'✅ Tạo thư mục Snapshot thành công')
 
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        file_path = str(snapshot_dir/f'{self._profile_name}_{timestamp}.png')
+        suffix = '.png' if screenshot.startswith(b'\x89PNG') else '.jpg'
+        file_path = str(snapshot_dir/f'{self._profile_name}_{timestamp}{suffix}')
         try:
             with open(file_path, 'wb') as f:
-                f.write(screenshot_png)
+                f.write(screenshot)
 
             self.log(f'✅ Ảnh đã được lưu tại Snapshot')
             return file_path
@@ -66,15 +160,72 @@ class Node:
             return None
         
     def _send_screenshot_to_telegram(self, message: str):
-        screenshot_png = self.take_screenshot()
+        # Telegram nén lại ảnh về tối đa 1280px → không cần gửi ảnh lớn hơn
+        screenshot = self.capture(format='jpeg', quality=75, max_width=1280)
         
-        if screenshot_png is None:
+        if screenshot is None:
             return
         
         timestamp = datetime.now().strftime('%Y-%m-%d_%H:%M:%S')
         message = f'[{timestamp}][{self._profile_name}] - {message}'
-        if self._tele_bot and self._tele_bot.send_photo(screenshot_png, message):
-            self.log(message=f"✅ Ảnh đã được gửi đến Telegram bot.")
+        # Gửi nền (không chặn profile), lỗi gửi được TeleHelper ghi log
+        if self._tele_bot and self._tele_bot.send_photo(screenshot, message, self._profile_name):
+            self.log(message=f"📤 Ảnh đã được xếp hàng gửi đến Telegram bot.")
+        else:
+            self._save_screenshot()
+
+    @property
+    def usage(self) -> ResourceUsage | None:
+        '''Mức sử dụng RAM/CPU hiện tại của cây tiến trình Chrome (None nếu không được theo dõi).'''
+        if not self._monitor:
+            return None
+        return self._monitor.usage(self._profile_name)
+
+    def _close_background_tabs(self) -> int:
+        self._invalidate_cache()
+        current = self._driver.current_window_handle
+        closed = 0
+        for handle in self._driver.window_handles:
+            if handle == current:
+                continue
+            try:
+                self._driver.switch_to.window(handle)
+                self._driver.close()
+                closed += 1
+            except WebDriverException:
+                pass
+        self._driver.switch_to.window(current)
+        return closed
+
+    def checkpoint(self) -> bool:
+        '''
+        Điểm an toàn để xử lý khi profile vượt ngân sách tài nguyên (được `execute_chain` gọi giữa các bước).
+
+        - 'close_tabs': đóng các tab/cửa sổ nền, giữ tab hiện tại.
+        - 'restart': mở lại trình duyệt cùng profile và quay lại URL đang mở.
+
+        Returns:
+            bool: False nếu cần mở lại trình duyệt nhưng thất bại, ngược lại True.
+        '''
+        action = self._monitor.pop_action(self._profile_name) if self._monitor else None
+        if action == 'close_tabs':
+            try:
+                closed = self._close_background_tabs()
+                self.log(f'♻️ Đã đóng {closed} tab nền để giải phóng tài nguyên')
+            except WebDriverException as e:
+                self.log(f'❌ Không thể đóng tab nền: {e}')
+        elif action == 'restart':
+            self.log('♻️ Đang mở lại trình duyệt để giải phóng tài nguyên...')
+            try:
+                driver = self._monitor.restart(self._profile_name)
+            except Exception as e:
+                self.log(f'Lỗi khi mở lại trình duyệt: {e}')
+                driver = None
+            if not driver:
+                self.log('❌ Không thể mở lại trình duyệt')
+                return False
+            self._driver = driver
+        return True
 
     def _execute_node(self, node_action, *args):
         """
@@ -90,7 +241,7 @@ class Node:
             return False
         return True
 
-    def execute_chain(self, actions: list[tuple], message_error: str = 'Dừng thực thi chuỗi hành động'):
+    def execute_chain(self, actions: list[tuple], message_error: str = 'Dừng thực thi chuỗi hành động', trace: bool | None = None, retries: int = 0) -> bool | ChainResult:
         """
         Thực hiện chuỗi các node hành động. 
         Dừng lại nếu một node thất bại.
@@ -105,11 +256,17 @@ class Node:
                     - `stop_on_failure` (bool): Nếu False, không dừng chuỗi hành động dù hành động hiện tại thất bại. Mặc định là True
 
             message_error (str): Thông báo lỗi khi xảy ra thất bại trong chuỗi hành động. Nên là tên actions cụ thể của nó
+                (cũng là tên chuỗi trong báo cáo thời gian).
+            trace (bool, optional): True → đo thời gian từng bước và trả về `ChainResult`.
+                None → theo `self.trace` (đo và ghi vào báo cáo chung nhưng vẫn trả về bool). Mặc định None.
+            retries (int, optional): Số lần thử lại một bước thất bại trước khi xem là thất bại. Mặc định 0.
 
         Returns:
-            bool: 
+            bool | ChainResult: 
                 - `True` nếu tất cả các hành động đều được thực thi thành công.
                 - `False` nếu có bất kỳ hành động nào thất bại.    
+                - `ChainResult` (dùng được như bool) nếu `trace=True`, chứa thời gian từng bước:
+                  ngủ (`sleep`), chờ WebDriver (`roundtrip`, `roundtrips`), số lần thử và kết quả.
 
         Ví dụ: 
             actions = [
@@ -120,8 +277,26 @@ class Node:
             ]
 
             self.execute_chain(actions, message_error="Lỗi trong quá trình thực hiện chuỗi hành động.")
+
+            result = self.execute_chain(actions, message_error="Import ví", trace=True)
+            print(result.summary())
         """
-        for action in actions:
+        measure = self.trace if trace is None else trace
+        result = ChainResult(message_error)
+        try:
+            result.ok = self._run_chain(actions, message_error, retries, result.spans if measure else None)
+        except Exception:
+            result.ok = False
+            raise
+        finally:
+            if measure:
+                self.last_chain = result
+                if self._report is not None:
+                    self._report.add(self._profile_name, result)
+        return result if trace else result.ok
+
+    def _run_chain(self, actions: list[tuple], message_error: str, retries: int, spans: list[StepSpan] | None) -> bool:
+        for index, action in enumerate(actions):
             stop_on_failure = True
 
             if isinstance(action, tuple):
@@ -144,7 +319,48 @@ class Node:
                     f"{action} phải là một function hoặc tuple chứa function.")
                 return False
 
-            if not self._execute_node(func, *args):
+            span = None
+            if spans is not None:
+                span = StepSpan(index, getattr(func, '__name__', str(func)))
+                spans.append(span)
+                clock = get_clock()
+                meter = RoundTripMeter.of(self._driver)
+                started, slept = time.perf_counter(), clock.thread_slept()
+                calls, waited = meter.read()
+
+            try:
+                if not self.checkpoint():
+                    if span is not None:
+                        span.outcome = 'aborted'
+                    self.log(f'Lỗi - {message_error}')
+                    return False
+
+                success = self._execute_node(func, *args)
+                attempts = 1
+                while not success and attempts <= retries:
+                    attempts += 1
+                    self.log(f'🔁 Thử lại lần {attempts - 1}/{retries}: {getattr(func, "__name__", func)}', show_log=False)
+                    Utility.wait_time(1)
+                    success = self._execute_node(func, *args)
+                if span is not None:
+                    span.attempts = attempts
+                    span.outcome = 'ok' if success else ('failed' if stop_on_failure else 'skipped')
+            except Exception as e:
+                if span is not None:
+                    span.outcome, span.error = 'error', str(e)
+                raise
+            finally:
+                if span is not None:
+                    # Driver có thể đã được mở lại tại checkpoint → đọc lại bộ đếm của driver hiện tại
+                    meter_now = RoundTripMeter.of(self._driver)
+                    if meter_now is not meter:
+                        calls, waited = 0, 0.0
+                    span.total = time.perf_counter() - started
+                    span.sleep = clock.thread_slept() - slept
+                    count, seconds = meter_now.read()
+                    span.roundtrips, span.roundtrip = count - calls, seconds - waited
+
+            if not success:
                 self.log(
                     f'Lỗi {["skip "] if not stop_on_failure else ""}- {message_error}')
                 if stop_on_failure:
@@ -187,6 +403,49 @@ class Node:
             self.log(f'❌ Không thể chụp ảnh màn hình: {e}')
             return None
 
+    def capture(self, element: WebElement|None = None, clip: tuple[float, float, float, float]|None = None, format: str = 'jpeg', quality: int = 70, scale: float = 1.0, max_width: int|None = None) -> bytes|None:
+        '''
+        Chụp ảnh gọn nhẹ qua CDP `Page.captureScreenshot`: chỉ vùng cần thiết, nén JPEG/WebP và thu nhỏ ngay trong trình duyệt.
+
+        Args:
+            element (WebElement, optional): Chỉ chụp phần tử này (kể cả khi nằm ngoài khung nhìn).
+            clip (tuple[float, float, float, float], optional): Vùng (x, y, width, height) theo CSS px của trang.
+                Không truyền `element` lẫn `clip` → chụp khung nhìn hiện tại.
+            format (str, optional): 'jpeg' (mặc định), 'webp' hoặc 'png'.
+            quality (int, optional): Chất lượng 0-100 cho jpeg/webp. Mặc định 70.
+            scale (float, optional): Hệ số thu nhỏ (1 = kích thước gốc). Mặc định 1.
+            max_width (int, optional): Chiều rộng tối đa của ảnh (px), tự giảm `scale` nếu cần.
+
+        Returns:
+            bytes | None: Dữ liệu ảnh theo `format`, None nếu không chụp được.
+                Trình duyệt không hỗ trợ CDP → ảnh PNG chụp bằng WebDriver.
+        '''
+        if format not in ('jpeg', 'webp', 'png'):
+            self.log(f'❗ format "{format}" không hợp lệ (jpeg | webp | png)')
+            return None
+        try:
+            box = self._driver.execute_script(scripts.CAPTURE_GEOMETRY, element)
+            if clip:
+                box.update(zip(('x', 'y', 'width', 'height'), clip))
+            if max_width and box['width'] > 0:
+                scale = min(scale, max_width / (box['width'] * box['dpr']))
+            params = {
+                'format': format,
+                'clip': {'x': box['x'], 'y': box['y'], 'width': box['width'], 'height': box['height'], 'scale': scale},
+                'captureBeyondViewport': element is not None or clip is not None,
+            }
+            if format != 'png':
+                params['quality'] = quality
+            data = self._driver.execute_cdp_cmd('Page.captureScreenshot', params)['data']
+            return base64.b64decode(data)
+        except Exception as e:
+            self.log(f'⚠️ Không chụp được ảnh qua CDP: {e}', show_log=False)
+        try:
+            return element.screenshot_as_png if element is not None else self._driver.get_screenshot_as_png()
+        except Exception as e:
+            self.log(f'❌ Không thể chụp ảnh màn hình: {e}')
+            return None
+
     def snapshot(self, message: str = 'Mô tả lý do snapshot', stop: bool = True):
         '''
         Ghi lại trạng thái trình duyệt bằng hình ảnh và dừng thực thi chương trình.
@@ -209,13 +468,14 @@ class Node:
         if stop:
             raise ValueError(f'{message}')
 
-    def new_tab(self, url: str|None = None, method: str = 'script', wait: float|None = None, timeout: float|None = None):
+    def new_tab(self, url: str|None = None, method: str = 'cdp', wait: float|None = None, timeout: float|None = None):
         '''
         Mở một tab mới trong trình duyệt và (tuỳ chọn) điều hướng đến URL cụ thể.
 
         Args:
             url (str, optional): URL đích cần điều hướng đến sau khi mở tab mới. Mặc định là `None`.
-            method (str, optional): - Phương thức điều hướng URL. Mặc định: `script`
+            method (str, optional): - Phương thức điều hướng URL (xem `go_to`). Mặc định: `cdp`
+                - `'cdp'` → dùng lệnh CDP `Page.navigate`.
                 - `'script'` → sử dụng JavaScript để thay đổi location.
                 - `'get'` → sử dụng `driver.get(url)`.
             wait (float, optional): Thời gian chờ trước khi thực hiện thao tác (tính bằng giây). Mặc định là giá trị của `self.wait`.
@@ -234,10 +494,10 @@ class Node:
             # Mở tab mới và điều hướng đến Google
             self.new_tab(url="https://www.google.com")
         '''
-        wait = self._get_wait(wait)
+        self._invalidate_cache()
         timeout = self._get_timeout(timeout)
 
-        Utility.wait_time(wait)
+        self._pre_wait(wait)
         try:
             self._driver.switch_to.new_window(WindowTypes.TAB)
 
@@ -260,49 +520,238 @@ class Node:
             self.log(f'❌ Lỗi khi Tab mới{" ("+url+")" if url else ""}: {e}')
             return None
 
-    def go_to(self, url: str, method: str = 'script', wait: float|None = None, timeout: float|None = None, show_log: bool = True):
+    def _install_tracker(self):
+        # Cài NETWORK_TRACKER vào mọi document mới của tab hiện tại (chạy trước script của trang) → đếm được cả request lúc tải trang.
+        # `Page.addScriptToEvaluateOnNewDocument` chỉ áp dụng cho target hiện tại → ghi nhận theo từng tab (window handle)
+        try:
+            handle = self._driver.current_window_handle
+            tracked = self._driver.__dict__.setdefault('_bk_tracked_tabs', set())
+            if handle in tracked:
+                return
+            self._driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': scripts.NETWORK_TRACKER})
+            tracked.add(handle)
+        except Exception as e:
+            self.log(f'⚠️ Không cài được bộ theo dõi mạng qua CDP: {e}', show_log=False)
+
+    def _document_origin(self) -> tuple[float|None, str|None]:
+        '''`performance.timeOrigin` và URL của tài liệu hiện tại (để nhận ra khi tài liệu mới thay thế nó).'''
+        try:
+            origin, url = self._driver.execute_script('return [performance.timeOrigin, location.href];')
+            return origin, url
+        except WebDriverException:
+            return None, None
+
+    def _wait_navigation(self, wait_until: str, timeout: float, idle_time: float, max_inflight: int,
+                         old_origin: float|None = None, old_url: str|None = None) -> dict:
         '''
-        Điều hướng trình duyệt đến một URL cụ thể và chờ trang tải hoàn tất.
+        Chờ mốc `wait_until` trong tài liệu MỚI sau khi điều hướng.
+
+        Với strategy 'eager'/'none' hoặc `method='script'`, script chờ có thể chạy trong tài liệu cũ (điều hướng chưa commit):
+        tài liệu cũ trả về `stale` hoặc bị hủy giữa chừng ("document unloaded", context destroyed) → chạy lại cho tới khi
+        tài liệu khác `old_origin` trả lời hoặc hết `timeout`.
+        '''
+        deadline = time.monotonic() + timeout
+        while True:
+            # Chia nhỏ thời gian chờ để không vượt timeout script mặc định (30s) của WebDriver
+            budget = min(max(deadline - time.monotonic(), 0), 20)
+            try:
+                result = self._driver.execute_async_script(
+                    scripts.NAVIGATION_WAIT, wait_until, int(budget * 1000), int(idle_time * 1000), max_inflight,
+                    old_origin, old_url)
+            except (NoSuchWindowException, InvalidSessionIdException):
+                raise
+            except WebDriverException:
+                # Tài liệu cũ bị hủy trong lúc script đang chờ → chờ tài liệu mới
+                if time.monotonic() >= deadline:
+                    return {'reached': False, 'stale': True, 'url': old_url,
+                            'commit': None, 'domcontentloaded': None, 'load': None, 'networkidle': None}
+                get_clock().poll(0.1)
+                continue
+            if result['reached'] or time.monotonic() >= deadline:
+                return result
+
+    def go_to(self, url: str, method: str = 'cdp', wait: float|None = None, timeout: float|None = None, show_log: bool = True,
+              wait_until: str = 'load', idle_time: float = 0.5, max_inflight: int = 0):
+        '''
+        Điều hướng trình duyệt đến một URL cụ thể và chờ trang tải tới mốc `wait_until`.
 
         Args:
             url (str): URL đích cần điều hướng đến.
-            method (str, optional): - Phương thức điều hướng URL. Mặc định: `script`
+            method (str, optional): - Phương thức điều hướng URL. Mặc định: `cdp`
+                - `'cdp'` → dùng lệnh CDP `Page.navigate` (trình duyệt không hỗ trợ CDP → tự chuyển sang `'script'`).
                 - `'script'` → sử dụng JavaScript để thay đổi location.
                 - `'get'` → sử dụng `driver.get(url)`.
             wait (float, optional): Thời gian chờ trước khi điều hướng, mặc định là giá trị của `self.wait = 3`.
             timeout (float, optional): Thời gian chờ tải trang, mặc định là giá trị của `self.timeout = 30`.
+            wait_until (str, optional): Mốc coi là tải xong:
+                - `'commit'`: tài liệu mới đã thay thế tài liệu cũ (đã nhận phản hồi).
+                - `'domcontentloaded'`: DOM đã parse xong.
+                - `'load'`: sự kiện load (như `document.readyState == 'complete'`). Mặc định.
+                - `'networkidle'`: DOM đã parse, còn tối đa `max_inflight` request fetch/XHR và không có hoạt động mạng
+                  (kể cả ảnh/script/css) trong `idle_time` giây.
+            idle_time (float, optional): Khoảng yên lặng mạng cho `'networkidle'`. Mặc định 0.5 giây.
+            max_inflight (int, optional): Số request được phép còn chạy với `'networkidle'` (long-polling, quảng cáo). Mặc định 0.
 
         Returns:
             bool | None:
-                - `True`: Điều hướng thành công và trang đã load xong.
-                - `False`: Điều hướng được nhưng trang load không hoàn tất trong thời gian chờ (timeout).
+                - `True`: Điều hướng thành công và trang đã tới mốc `wait_until`.
+                - `False`: Điều hướng được nhưng trang chưa tới mốc `wait_until` trong thời gian chờ (timeout).
                 - `None`: Lỗi không xác định (driver bị crash, lỗi JS, tab đóng, ngoại lệ Selenium,...).
+
+        Mô tả:
+            - Thời điểm từng mốc (giây, tính từ lúc bắt đầu điều hướng) được lưu ở `self.last_navigation`:
+              `commit`, `domcontentloaded`, `load`, `networkidle` (None nếu chưa tới) cùng `elapsed`, `reached`, `url`.
+            - Với page load strategy 'normal' (mặc định của BrowserManager), chromedriver chỉ trả lệnh kế tiếp sau khi
+              trang load xong, nên 'commit'/'domcontentloaded' chỉ trả về sớm hơn khi đặt `page_load_strategy='eager'`
+              hoặc `'none'` trong `BrowserManager.update_config`.
         '''
-        wait = self._get_wait(wait)
+        self._invalidate_cache()
         timeout = self._get_timeout(timeout)
 
-        methods = ['script', 'get']
-        Utility.wait_time(wait)
+        methods = ['cdp', 'script', 'get']
+        milestones = ['commit', 'domcontentloaded', 'load', 'networkidle']
+        self._pre_wait(wait)
         if method not in methods:
             self.log(f'Gọi url sai phương thức. Chỉ gồm [{methods}]')
             return False
+        if wait_until not in milestones:
+            self.log(f'wait_until không hợp lệ. Chỉ gồm [{milestones}]')
+            return False
         try:
+            old_origin, old_url = self._document_origin()
+            start = time.monotonic()
+            if method == 'cdp':
+                self._install_tracker()
+                try:
+                    navigated = self._driver.execute_cdp_cmd('Page.navigate', {'url': url})
+                except WebDriverException as e:
+                    self.log(f'⚠️ Không điều hướng được qua CDP ({e.msg}), chuyển sang script', show_log=False)
+                    method = 'script'
+                else:
+                    if navigated.get('errorText'):
+                        self.log(f'❌ - Khi tải trang "{url}": {navigated["errorText"]}')
+                        return None
+                    if not navigated.get('loaderId'):
+                        # Điều hướng trong cùng tài liệu (chỉ đổi #hash) → không có tài liệu mới để chờ
+                        old_origin = None
             if method == 'get':
                 self._driver.get(url)
             elif method == 'script':
-                self._driver.execute_script(f"window.location.href = '{url}';")
-
-            if self.wait_for_page_load(wait=0, timeout=timeout, show_log=False):
-                self.log(f"✅ Trang {url} đã load xong.", show_log=show_log)
+                self._driver.execute_script("window.location.href = arguments[0];", url)
+
+            result = self._wait_navigation(wait_until, max(timeout - (time.monotonic() - start), 0), idle_time, max_inflight,
+                                           old_origin, old_url)
+            self.last_navigation = {
+                'url': result['url'],
+                'method': method,
+                'wait_until': wait_until,
+                'reached': result['reached'],
+                'elapsed': round(time.monotonic() - start, 3),
+                **{name: (round(result[name] / 1000, 3) if result[name] is not None else None) for name in milestones},
+            }
+            if result['reached']:
+                self.log(f"✅ Trang {url} đã load xong ({wait_until} sau {self.last_navigation['elapsed']}s).", show_log=show_log)
                 return True
             else:
-                self.log(f"❌ Timeout khi chờ trang {url} load", show_log=show_log)
+                self.log(f"❌ Timeout khi chờ trang {url} load ({wait_until})", show_log=show_log)
                 return False
 
         except Exception as e:
             self.log(f'❌ - Khi tải trang "{url}": {e}') # không show_log để tất cả node khác thấy lỗi
             return None
 
+    def _wait_for(self, by: str, value: str, condition: str = 'present', timeout: float|None = None, parent_element: WebElement|None = None, text: str|None = None, many: bool = False):
+        '''
+        Chờ điều kiện của phần tử ngay trong trang (`scripts.WAIT_FOR`): trả về ngay khi điều kiện đúng,
+        mỗi lần chờ chỉ một lệnh WebDriver (chia nhỏ mỗi 20 giây để không vượt timeout script mặc định).
+        Script lỗi (trang chặn JS, locator không hỗ trợ) → chờ bằng WebDriverWait như trước.
+
+        Returns:
+            WebElement | list[WebElement] | bool: Phần tử (hoặc danh sách nếu `many`), True với 'gone'.
+
+        Raises:
+            TimeoutException: Hết `timeout` mà điều kiện chưa đúng.
+        '''
+        timeout = self._get_timeout(timeout)
+        deadline = time.monotonic() + timeout
+        while True:
+            budget = min(max(deadline - time.monotonic(), 0), 20)
+            try:
+                status, result = self._driver.execute_async_script(
+                    scripts.WAIT_FOR, by, value, condition, text, many, int(budget * 1000), parent_element)
+            except (StaleElementReferenceException, NoSuchWindowException):
+                raise
+            except WebDriverException as e:
+                status, result = 'error', e.msg
+            if status == 'ok':
+                return True if condition == 'gone' else result
+            if status == 'error':
+                self.log(f'⚠️ Không chờ được ({by}, {value}) trong trang: {result}. Chuyển sang WebDriverWait', show_log=False)
+                return self._wait_for_polling(by, value, condition, max(deadline - time.monotonic(), 0), parent_element, text, many)
+            if time.monotonic() >= deadline:
+                raise TimeoutException(f'({by}, {value}) chưa đạt "{condition}" sau {timeout}s')
+
+    def _wait_for_polling(self, by: str, value: str, condition: str, timeout: float, parent_element: WebElement|None = None, text: str|None = None, many: bool = False):
+        accept = {
+            'present': lambda el: True,
+            'visible': lambda el: el.is_displayed(),
+            'clickable': lambda el: el.is_displayed() and el.is_enabled(),
+            'text': lambda el: ' '.join(el.text.split()) == ' '.join(str(text).split()),
+        }
+
+        def matches(context):
+            elements = context.find_elements(by, value)
+            if condition == 'gone':
+                return not elements or not elements[0].is_displayed()
+            if condition == 'present' and not many:
+                return elements[0] if elements else False
+            found = [el for el in elements if accept[condition](el)]
+            if not found:
+                return False
+            return found if many else found[0]
+
+        search_context = parent_element if parent_element else self._driver
+        return WebDriverWait(search_context, timeout, ignored_exceptions=[StaleElementReferenceException]).until(matches)
+
+    def wait_until(self, by: str, value: str, condition: str = 'visible', text: str|None = None, parent_element: WebElement|None = None, timeout: float|None = None, show_log: bool = True) -> WebElement|bool|None:
+        '''
+        Chờ phần tử đạt một điều kiện. Việc chờ diễn ra trong trình duyệt (MutationObserver + requestAnimationFrame),
+        trả về ngay khi điều kiện đúng thay vì poll WebDriver mỗi 0.5 giây.
+
+        Args:
+            by (str): Kiểu định vị phần tử (ví dụ: By.ID, By.CSS_SELECTOR, By.XPATH).
+            value (str): Giá trị tương ứng với phương thức tìm phần tử.
+            condition (str, optional):
+                - 'present': có trong DOM.
+                - 'visible': đang hiển thị (mặc định).
+                - 'clickable': hiển thị và không bị disabled.
+                - 'gone': không còn trong DOM hoặc bị ẩn.
+                - 'text': text hiển thị (đã gộp khoảng trắng) đúng bằng `text`.
+            text (str, optional): Nội dung mong muốn khi `condition='text'`.
+            parent_element (WebElement, optional): Nếu có, chỉ tìm trong phần tử này.
+            timeout (float, optional): Thời gian chờ tối đa (giây). Mặc định là `self.timeout`.
+            show_log (bool, optional): Có hiển thị log ra console hay không. Mặc định: True (cho phép).
+
+        Returns:
+            WebElement | bool | None: Phần tử đạt điều kiện (True với 'gone'), None nếu hết thời gian hoặc lỗi.
+        '''
+        conditions = ('present', 'visible', 'clickable', 'gone', 'text')
+        if condition not in conditions:
+            self.log(f'❗ condition "{condition}" không hợp lệ {conditions}', show_log=show_log)
+            return None
+        timeout = self._get_timeout(timeout)
+        try:
+            result = self._wait_for(by, value, condition, timeout, parent_element, text)
+            self.log(f'✅ ({by}, {value}) đã "{condition}"', show_log=show_log)
+            return result
+        except TimeoutException:
+            self.log(f'⏰ ({by}, {value}) chưa "{condition}" sau {timeout}s', show_log=show_log)
+        except StaleElementReferenceException:
+            self.log(f'Phần tử ({by}, {value}) đã bị thay đổi hoặc bị loại bỏ khỏi DOM', show_log=show_log)
+        except Exception as e:
+            self.log(f'❌ Lỗi khi chờ ({by}, {value}) "{condition}": {e}', show_log=show_log)
+        return None
+
     def wait_for_disappear(self, by: str, value: str,
         parent_element: WebElement|None = None,
         wait: float|None = None,
@@ -325,38 +774,19 @@ class Node:
                 - True nếu phần tử biến mất (tức là hoàn tất loading).
                 - False nếu hết timeout mà phần tử vẫn còn (coi như lỗi).
         """
-        wait = self._get_wait(wait)
         timeout = timeout if timeout is not None else self.timeout
 
-        Utility.wait_time(wait)
-        search_context = parent_element if parent_element else self._driver
-
-        check_timeout = Utility.timeout(timeout)
-        wait_log = True
+        self._pre_wait(wait)
         try:
-            while check_timeout():
-                try:
-                    element = search_context.find_element(by, value)
-                    if not element.is_displayed():
-                        if show_log:
-                            self.log(f"✅ Phần tử ({by}, {value}) đã biến mất.")
-                        return True
-                    else:
-                        if show_log and wait_log:
-                            wait_log = False
-                            self.log(f'⏳ Đang chờ ({by}, {value}) biến mất.')
-                except (StaleElementReferenceException, NoSuchElementException):
-                    # Element không còn tồn tại trong DOM → coi là đã biến mất
-                    if show_log:
-                        self.log(f"✅ Phần tử ({by}, {value}) không còn trong DOM.")
-                    return True
-
-                Utility.wait_time(0.5)
-
+            # Không còn trong DOM hoặc bị ẩn đều tính là đã biến mất
+            self._wait_for(by, value, 'gone', timeout, parent_element)
+            if show_log:
+                self.log(f"✅ Phần tử ({by}, {value}) đã biến mất.")
+            return True
+        except TimeoutException:
             if show_log:
                 self.log(f"⏰ Timeout - Phần tử ({by}, {value}) vẫn còn sau {timeout}s.")
             return False
-
         except Exception as e:
             self.log(f"❌ Lỗi khi chờ phần tử biến mất ({by}, {value}): {e}")
             return False
@@ -375,7 +805,6 @@ class Node:
                 - True: Trang đã load xong.
                 - False: Quá thời gian timeout hoặc lỗi khác khi kiểm tra trạng thái trang.
         '''
-        wait = self._get_wait(wait)
         timeout = self._get_timeout(timeout)
 
         try:
@@ -391,6 +820,29 @@ class Node:
             self.log(f"❌ Timeout khi chờ trang load: {e}", show_log=show_log)
             return False
 
+    def wait_for_ready(self, timeout: float|None = None, quiet: float = 0.3, element: WebElement|None = None) -> bool|None:
+        '''
+        Chờ trang sẵn sàng để thao tác: DOM đã parse, không còn request fetch/XHR đang chạy,
+        DOM không thay đổi trong `quiet` giây và (nếu có) `element` đứng yên giữa 2 frame.
+
+        Args:
+            timeout (float, optional): Thời gian chờ tối đa (giây). Mặc định là `self.wait`.
+            quiet (float, optional): Khoảng thời gian DOM phải yên lặng (giây). Mặc định 0.3.
+            element (WebElement, optional): Phần tử cần đứng yên (hết animation/di chuyển layout).
+
+        Returns:
+            bool | None:
+                - `True`: Trang đã sẵn sàng.
+                - `False`: Hết thời gian chờ mà trang vẫn còn hoạt động (request dài, animation liên tục...).
+                - `None`: Không chạy được script kiểm tra.
+        '''
+        timeout = self.wait if timeout is None else timeout
+        try:
+            return bool(self._driver.execute_async_script(
+                scripts.WAIT_READY, int(timeout * 1000), int(quiet * 1000), element))
+        except WebDriverException:
+            return None
+
     def get_url(self, wait: float|None = None):
         '''
         Phương thức lấy url hiện tại
@@ -401,9 +853,8 @@ class Node:
         Returns:
             Chuỗi str URL hiện tại
         '''
-        wait = self._get_wait(wait)
 
-        Utility.wait_time(wait, True)
+        self._pre_wait(wait, True)
         try:
             return self._driver.current_url
 
@@ -427,15 +878,19 @@ class Node:
                 - WebElement: nếu tìm thấy phần tử.
                 - `None`: nếu không tìm thấy hoặc xảy ra lỗi.
         '''
-        wait = self._get_wait(wait)
         timeout = self._get_timeout(timeout)
 
-        Utility.wait_time(wait)
+        cached = self._from_cache(by, value, parent_element, wait)
+        if cached:
+            self.log(message=f'Tìm thấy phần tử ({by}, {value}) (cache)', show_log=show_log)
+            return cached[0]
+
+        self._pre_wait(wait)
         try:
-            search_context = parent_element if parent_element else self._driver
-            element = WebDriverWait(search_context, timeout).until(
-                EC.presence_of_element_located((by, value))
-            )
+            # Thế hệ DOM lấy TRƯỚC khi tìm: DOM đổi giữa chừng thì entry tự mất hiệu lực
+            generation = self._dom_generation() if self._cache is not None else None
+            element = self._wait_for(by, value, 'present', timeout, parent_element)
+            self._to_cache(by, value, parent_element, generation, [element])
             self.log(message=f'Tìm thấy phần tử ({by}, {value})', show_log=show_log)
             return element
 
@@ -466,14 +921,17 @@ class Node:
             list[WebElement]: Danh sách các phần tử tìm thấy.
         '''
         timeout = self._get_timeout(timeout)
-        wait = self._get_wait(wait)
-        Utility.wait_time(wait)
 
+        cached = self._from_cache(by, value, parent_element, wait, many=True)
+        if cached:
+            self.log(message=f'Tìm thấy {len(cached)} phần tử ({by}, {value}) (cache)', show_log=show_log)
+            return list(cached)
+
+        self._pre_wait(wait)
         try:
-            search_context = parent_element if parent_element else self._driver
-            elements = WebDriverWait(search_context, timeout).until(
-                EC.presence_of_all_elements_located((by, value))
-            )   
+            generation = self._dom_generation() if self._cache is not None else None
+            elements = self._wait_for(by, value, 'present', timeout, parent_element, many=True)
+            self._to_cache(by, value, parent_element, generation, elements, many=True)
             self.log(message=f'Tìm thấy {len(elements)} phần tử ({by}, {value})', show_log=show_log)
             return elements
 
@@ -486,6 +944,70 @@ class Node:
 
         return []   
     
+    def query_many(self, locators: list[tuple[str, str]], mode: str = 'any', parent_element: WebElement|None = None, wait: float|None = None, timeout: float|None = None, show_log: bool = True) -> dict[tuple[str, str], WebElement]:
+        '''
+        Chờ nhiều locator cùng lúc ngay trong trình duyệt (một vòng lặp, không tốn timeout cho từng locator).
+
+        Args:
+            locators (list[tuple[str, str]]): Danh sách (by, value), hỗ trợ id, name, class name, tag name,
+                css selector, xpath, link text, partial link text.
+            mode (str, optional):
+                - 'any': chờ tới khi có ít nhất một locator khớp, trả về mọi locator đang khớp (mặc định).
+                - 'all': chờ tới khi tất cả locator đều khớp.
+                - 'first': như 'any' nhưng chỉ trả về locator khớp đứng đầu danh sách (theo thứ tự ưu tiên).
+            parent_element (WebElement, optional): Nếu có, chỉ tìm trong phần tử này.
+            wait (float, optional): Thời gian chờ trước khi tìm. Mặc định theo `wait_policy`.
+            timeout (float, optional): Thời gian tối đa chờ điều kiện của `mode`. Mặc định là `self.timeout`.
+            show_log (bool, optional): Có hiển thị log ra console hay không. Mặc định: True (cho phép).
+
+        Returns:
+            dict[tuple[str, str], WebElement]: {(by, value): phần tử} của các locator đang khớp, theo thứ tự của `locators`.
+                Rỗng nếu hết thời gian mà không locator nào khớp. Với 'all', thiếu locator nghĩa là chưa đạt điều kiện.
+
+        Ví dụ:
+            state = node.query_many([
+                (By.XPATH, '//button[text()="Connect"]'),
+                (By.CSS_SELECTOR, '.account-address'),
+            ], mode='first')
+            if (By.CSS_SELECTOR, '.account-address') in state:
+                ...
+        '''
+        if mode not in ('any', 'all', 'first'):
+            self.log(f'❗ mode "{mode}" không hợp lệ (any | all | first)', show_log=show_log)
+            return {}
+
+        locators = [tuple(locator) for locator in locators]
+        timeout = self._get_timeout(timeout)
+        self._pre_wait(wait)
+
+        # Thời gian chờ trang là thời gian thực, không theo `speed`/VirtualClock
+        deadline = time.monotonic() + timeout
+        found: list[WebElement | None] = [None] * len(locators)
+        broken: set[int] = set()
+        try:
+            while True:
+                # Chia nhỏ thời gian chờ để không vượt timeout script mặc định (30s) của WebDriver
+                budget = min(max(deadline - time.monotonic(), 0), 20)
+                found, errors = self._driver.execute_async_script(
+                    scripts.QUERY_MANY, [list(locator) for locator in locators], mode, int(budget * 1000), parent_element)
+                for index, error in errors:
+                    if index not in broken:
+                        broken.add(index)
+                        self.log(f'❗ Locator {locators[index]} lỗi: {error}', show_log=show_log)
+                met = all(found) if mode == 'all' else any(found)
+                impossible = bool(broken) if mode == 'all' else len(broken) == len(locators)
+                if met or impossible or time.monotonic() >= deadline:
+                    break
+        except WebDriverException as e:
+            self.log(f'❗ Lỗi khi tìm nhiều phần tử {locators}: {e}', show_log=show_log)
+
+        matched = {locator: element for locator, element in zip(locators, found) if element is not None}
+        if matched:
+            self.log(message=f'Tìm thấy {len(matched)}/{len(locators)} phần tử: {list(matched)}', show_log=show_log)
+        else:
+            self.log(f'Không tìm thấy phần tử nào trong {locators} sau {timeout}s', show_log=show_log)
+        return matched
+
     def find_in_shadow(self, selectors: list[tuple[str, str]], wait: float|None = None, timeout: float|None = None):
         '''
         Tìm phần tử trong nhiều lớp shadow-root.
@@ -499,8 +1021,7 @@ class Node:
             WebElement | None: Trả về phần tử cuối cùng nếu tìm thấy, ngược lại trả về None.
         '''
         timeout = self._get_timeout(timeout)
-        wait = self._get_wait(wait)
-        Utility.wait_time(wait)
+        self._pre_wait(wait)
 
         if not isinstance(selectors, list) or len(selectors) < 2:
             self.log("Selectors không hợp lệ (phải có ít nhất 2 phần tử).")
@@ -555,49 +1076,46 @@ class Node:
 
         return None
 
-    def finds_by_text(self, text: str, parent_element: WebElement | None = None, wait: float | None = None, timeout: float | None = None, show_log: bool = True) -> list[WebElement]:
+    def finds_by_text(self, text: str, parent_element: WebElement | None = None, wait: float | None = None, timeout: float | None = None, show_log: bool = True, mode: str = 'contains', visible_only: bool = False) -> list[WebElement]:
         '''
         Tìm tất cả phần tử chứa đoạn text cho trước, bất kể thẻ nào (div, p, span,...).
 
         Args:
-            text (str): Nội dung cần tìm (sẽ tìm theo contains, không phân biệt tag).
-            by (str): Kiểu định vị phần tử, mặc định là By.XPATH.
+            text (str): Nội dung cần tìm (không phân biệt hoa/thường, không tính khác biệt khoảng trắng).
             parent_element (WebElement, optional): Nếu có, tìm trong phần tử này.
             wait (float, optional): Thời gian chờ trước khi tìm.
             timeout (float, optional): Thời gian chờ tối đa để tìm phần tử.
             show_log (bool, optional): Có hiển thị log ra console hay không. Mặc định: True (cho phép).
+            mode (str, optional): Cách so khớp:
+                - 'contains': text của phần tử chứa `text` (mặc định).
+                - 'exact': text của phần tử đúng bằng `text`.
+                - 'regex': `text` là biểu thức chính quy (JavaScript, không phân biệt hoa/thường).
+            visible_only (bool, optional): Chỉ lấy phần tử đang hiển thị. Mặc định False.
 
         Returns:
-            list[WebElement]: Danh sách phần tử chứa đoạn text.
+            list[WebElement]: Danh sách phần tử nhỏ nhất chứa đoạn text (không gồm các thẻ cha bao ngoài).
+
+        Mô tả:
+            - Toàn bộ việc tìm chạy trong trình duyệt, mỗi lần thử chỉ một lần `execute_script`.
+            - Text được chuẩn hóa NFC, chữ thường theo locale và gộp khoảng trắng; truyền qua arguments nên chứa dấu nháy vẫn đúng.
         '''
-        timeout = self._get_timeout(timeout)
-        wait = self._get_wait(wait)
-        Utility.wait_time(wait)
+        if mode not in ('contains', 'exact', 'regex'):
+            self.log(f'❗ mode "{mode}" không hợp lệ (contains | exact | regex)', show_log=show_log)
+            return []
 
-        # XPath để tìm phần tử chứa đoạn text
-        if parent_element:
-            prefix = ".//"
-        else:
-            prefix = "//"
-
-        xpath = (
-            f"{prefix}*[contains("
-            "translate(normalize-space(.), "
-            "'ABCDEFGHIJKLMNOPQRSTUVWXYZÀÁÂÃÈÉÊÌÍÒÓÔÕÙÚĂĐĨŨƠƯÀÁẢÃẠẮẰẲẴẶẤẦẨẪẬÉÈẺẼẸÊỀẾỂỄỆÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢÙÚỦŨỤƯỪỨỬỮỰÝỲỶỸỴ', "
-            "'abcdefghijklmnopqrstuvwxyzàáâãèéêìíòóôõùúăđĩũơưàáảãạắằẳẵặấầẩẫậéèẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựýỳỷỹỵ'"
-            "), "
-            f"'{text.lower()}')]"
-        )
+        timeout = self._get_timeout(timeout)
+        self._pre_wait(wait)
 
+        check_timeout = Utility.timeout(timeout)
         try:
-            search_context = parent_element if parent_element else self._driver
-            elements = WebDriverWait(search_context, timeout).until(
-                EC.presence_of_all_elements_located((By.XPATH, xpath))
-            )
-            self.log(message=f'🔍 Tìm thấy {len(elements)} phần tử chứa "{text}"', show_log=show_log)
-            return elements
-
-        except TimeoutException:
+            while True:
+                elements = self._driver.execute_script(scripts.FIND_BY_TEXT, text, mode, visible_only, parent_element)
+                if elements:
+                    self.log(message=f'🔍 Tìm thấy {len(elements)} phần tử chứa "{text}"', show_log=show_log)
+                    return elements
+                if not check_timeout():
+                    break
+                get_clock().poll(0.5)
             self.log(f'❌ Không tìm thấy phần tử chứa "{text}" trong {timeout}s', show_log=show_log)
         except StaleElementReferenceException:
             self.log(f'⚠️ Phần tử chứa "{text}" đã bị thay đổi trong DOM', show_log=show_log)
@@ -606,6 +1124,11 @@ class Node:
 
         return []
 
+    def _scan_texts(self, texts: list[str], with_elements: bool, parent_element: WebElement | None = None) -> dict[int, list[WebElement] | None]:
+        # Một lần execute_script cho mọi đoạn text; text truyền qua arguments nên không lo dấu nháy
+        matches = self._driver.execute_script(scripts.TEXT_SCAN, texts, with_elements, parent_element)
+        return {idx: elements for idx, elements in matches}
+
     def has_texts(self, texts: str | list[str] | set[str], wait: float | None = None, show_log: bool = True) -> list[str]:
         """
         Kiểm tra nhanh các đoạn text có tồn tại trên trang (không phân biệt Hoa/thường).
@@ -618,35 +1141,70 @@ class Node:
         
         Returns: 
             list[str]: Danh sách nội dung thực sự tồn tại trên trang.
+
+        Mô tả:
+            - Text của trang chỉ được duyệt một lần (TreeWalker) và dò mọi đoạn text cùng lúc, dù có bao nhiêu đoạn.
+            - So khớp sau khi chuẩn hóa Unicode (NFC), chuyển chữ thường theo locale (đủ mọi bảng chữ cái, không chỉ
+              tiếng Việt) và gộp khoảng trắng. Bỏ qua nội dung của script/style.
         """
-        wait = self._get_wait(wait)
-        Utility.wait_time(wait)
+        self._pre_wait(wait)
         if isinstance(texts, str):
             texts = [texts]
         else:
             texts = list(texts)
 
-        found = []
-        for text in texts:
-            xpath = (
-                "//*[contains("
-                "translate(normalize-space(.), "
-                "'ABCDEFGHIJKLMNOPQRSTUVWXYZÀÁÂÃÈÉÊÌÍÒÓÔÕÙÚĂĐĨŨƠƯÀÁẢÃẠẮẰẲẴẶẤẦẨẪẬÉÈẺẼẸÊỀẾỂỄỆÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢÙÚỦŨỤƯỪỨỬỮỰÝỲỶỸỴ', "
-                "'abcdefghijklmnopqrstuvwxyzàáâãèéêìíòóôõùúăđĩũơưàáảãạắằẳẵặấầẩẫậéèẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựýỳỷỹỵ'"
-                "), "
-                f"'{text.lower()}')]"
-            )
-
-            if self._driver.find_elements(By.XPATH, xpath):
-                found.append(text)
+        try:
+            matches = self._scan_texts(texts, False)
+        except WebDriverException as e:
+            self.log(f'❗ Lỗi khi kiểm tra nội dung {texts}: {e}', show_log=show_log)
+            return []
 
+        found = [text for idx, text in enumerate(texts) if idx in matches]
         if found:
             self.log(f'🔍 Tìm thấy nội dung: {found}', show_log=show_log)
         else:
             self.log(f'🔍 Không tìm thấy nội dung: {texts}', show_log=show_log)
 
         return found
-    
+
+    def find_texts(self, texts: str | list[str] | set[str], parent_element: WebElement | None = None, wait: float | None = None, show_log: bool = True) -> dict[str, list[WebElement]]:
+        """
+        Như `has_texts` nhưng trả về luôn các phần tử chứa từng đoạn text (một lần `execute_script` cho tất cả).
+
+        Args:
+            texts (str | list[str] | set[str]): nội dung cần tìm.
+            parent_element (WebElement, optional): Nếu có, chỉ tìm trong phần tử này.
+            wait (float, optional): Thời gian chờ trước khi tìm (giây).
+            show_log (bool, optional): Có hiển thị log ra console hay không. Mặc định: True (cho phép).
+
+        Returns:
+            dict[str, list[WebElement]]: {text: các phần tử nhỏ nhất chứa trọn đoạn text} cho các text tìm thấy.
+
+        Ví dụ:
+            found = node.find_texts(['Đăng nhập', 'Connect wallet'])
+            if 'Connect wallet' in found:
+                node.click(found['Connect wallet'][0])
+        """
+        self._pre_wait(wait)
+        if isinstance(texts, str):
+            texts = [texts]
+        else:
+            texts = list(texts)
+
+        try:
+            matches = self._scan_texts(texts, True, parent_element)
+        except WebDriverException as e:
+            self.log(f'❗ Lỗi khi tìm nội dung {texts}: {e}', show_log=show_log)
+            return {}
+
+        found = {text: matches[idx] for idx, text in enumerate(texts) if idx in matches}
+        if found:
+            self.log(f'🔍 Tìm thấy nội dung: {list(found)}', show_log=show_log)
+        else:
+            self.log(f'🔍 Không tìm thấy nội dung: {texts}', show_log=show_log)
+
+        return found
+
     def click(self, element: WebElement|None = None, wait: float|None = None) -> bool:
         '''
         Nhấp vào một phần tử trên trang web.
@@ -664,8 +1222,7 @@ class Node:
             - Gọi `.click()` trên phần tử sau khi chờ thời gian ngắn (nếu được chỉ định).
             - Ghi log kết quả thao tác hoặc lỗi gặp phải.
         '''
-        wait = self._get_wait(wait)
-        Utility.wait_time(wait)
+        self._pre_wait(wait, element=element)
         
         try:
             if element is None:
@@ -716,16 +1273,13 @@ class Node:
             - Nếu gặp lỗi liên quan đến Javascript (LavaMoat), phương thức sẽ thử lại bằng cách tìm phần tử theo cách khác.
         '''
         timeout = self._get_timeout(timeout)
-        wait = self._get_wait(wait)
 
         try:
             search_context = parent_element if parent_element else self._driver
             
-            element = WebDriverWait(search_context, timeout). until(
-                EC.element_to_be_clickable((by, value))
-            )
+            element = self._wait_for(by, value, 'clickable', timeout, parent_element)
 
-            Utility.wait_time(wait)
+            self._pre_wait(wait, element=element)
             element.click()
             self.log(f'Click phần tử ({by}, {value}) thành công')
             return True
@@ -749,7 +1303,7 @@ class Node:
                     element = WebDriverWait(search_context, timeout).until(
                         EC.presence_of_element_located((by, value))
                     )
-                    Utility.wait_time(wait)
+                    self._pre_wait(wait, element=element)
                     element.click()
                     self.log(f'Click phần tử ({by}, {value}) thành công (PT2)')
                     return True
@@ -764,7 +1318,129 @@ class Node:
 
         return False
 
-    def find_and_input(self, by: str, value: str, text: str, parent_element: WebElement|None = None, delay: float = 0.2, wait: float|None = None, timeout: float|None = None):
+    def _typing_delays(self, text: str, delay: float) -> list[float]:
+        '''Độ trễ (giây, đã dao động) trước mỗi ký tự; sau dấu cách/dấu câu dừng lâu hơn một chút như người gõ.'''
+        clock = get_clock()
+        delays = []
+        previous = ''
+        for ch in text:
+            base = delay * 1.8 if previous and not previous.isalnum() else delay
+            delays.append(clock.jitter(base))
+            previous = ch
+        return delays
+
+    # Phím Selenium (Keys.*) và ký tự điều khiển → mô tả phím cho `scripts.TYPE_TEXT`
+    _SPECIAL_KEYS = {
+        Keys.ENTER: ('Enter', 'Enter', 13),
+        Keys.RETURN: ('Enter', 'Enter', 13),
+        '\n': ('Enter', 'Enter', 13),
+        '\r': ('Enter', 'Enter', 13),
+        Keys.TAB: ('Tab', 'Tab', 9),
+        '\t': ('Tab', 'Tab', 9),
+        Keys.BACKSPACE: ('Backspace', 'Backspace', 8),
+        Keys.DELETE: ('Delete', 'Delete', 46),
+        Keys.ESCAPE: ('Escape', 'Escape', 27),
+        Keys.LEFT: ('ArrowLeft', 'ArrowLeft', 37),
+        Keys.UP: ('ArrowUp', 'ArrowUp', 38),
+        Keys.RIGHT: ('ArrowRight', 'ArrowRight', 39),
+        Keys.DOWN: ('ArrowDown', 'ArrowDown', 40),
+        Keys.HOME: ('Home', 'Home', 36),
+        Keys.END: ('End', 'End', 35),
+        Keys.PAGE_UP: ('PageUp', 'PageUp', 33),
+        Keys.PAGE_DOWN: ('PageDown', 'PageDown', 34),
+        Keys.INSERT: ('Insert', 'Insert', 45),
+    }
+
+    @classmethod
+    def _script_keys(cls, text: str) -> list[str | dict]:
+        '''
+        Chuyển `text` thành danh sách phím cho `scripts.TYPE_TEXT`, dừng ở phím Selenium đầu tiên không gõ được
+        trong trang (SHIFT, CONTROL, ... - phần từ đó trở đi gõ bằng ActionChains).
+        '''
+        keys = []
+        for ch in text:
+            if ch in cls._SPECIAL_KEYS:
+                key, code, key_code = cls._SPECIAL_KEYS[ch]
+                keys.append({'key': key, 'code': code, 'keyCode': key_code})
+            elif ch == Keys.SPACE:
+                keys.append(' ')
+            elif '\ue000' <= ch <= '\uf8ff':
+                break
+            else:
+                keys.append(ch)
+        return keys
+
+    def _focus_for_typing(self, element: WebElement):
+        '''Focus phần tử và đặt con trỏ cuối nội dung (bấm vào phần tử nếu trang chặn script).'''
+        try:
+            self._driver.execute_script(scripts.FOCUS_END, element)
+        except WebDriverException:
+            element.click()
+
+    def _type_text_actions(self, element: WebElement, text: str, delays: list[float]) -> int:
+        '''
+        Gõ phím thật (isTrusted) bằng MỘT chuỗi ActionChains: mọi phím và khoảng nghỉ gửi trong một lệnh
+        W3C Actions, chromedriver tự giữ nhịp. Lỗi giữa chừng được ném ra cho nơi gọi xử lý.
+        '''
+        if not text:
+            return 0
+        self._focus_for_typing(element)
+        speed = get_clock().speed
+        actions = ActionChains(self._driver)
+        for ch, ch_delay in zip(text, delays):
+            if ch_delay * speed > 0:
+                actions.pause(ch_delay * speed)
+            actions.send_keys(ch)
+        actions.perform()
+        return len(text)
+
+    def _type_text_script(self, element: WebElement, keys: list[str | dict], delays: list[float]) -> int:
+        '''Gõ ngay trong trang (1 lần gọi WebDriver, sự kiện tổng hợp). Trả về số phím đã gõ.'''
+        speed = get_clock().speed
+        delays_ms = [int(d * speed * 1000) for d in delays[:len(keys)]]
+        budget = sum(delays_ms) / 1000 + 10
+        # Timeout script mặc định 30s; chỉ hỏi/đổi khi chuỗi gõ dài hơn
+        script_timeout = self._driver.timeouts.script if budget > 30 else budget
+        try:
+            if budget > script_timeout:
+                self._driver.set_script_timeout(budget)
+            return int(self._driver.execute_async_script(scripts.TYPE_TEXT, element, keys, delays_ms) or 0)
+        except WebDriverException as e:
+            # Trang chặn script (LavaMoat, CSP...) hoặc script timeout → dừng script đang gõ và lấy tiến độ
+            self.log(f'⚠️ Không gõ được bằng script: {e.msg if hasattr(e, "msg") else e}', show_log=False)
+            try:
+                return int(self._driver.execute_script(scripts.TYPE_TEXT_CANCEL, element) or 0)
+            except WebDriverException:
+                return 0
+        finally:
+            if budget > script_timeout:
+                self._driver.set_script_timeout(script_timeout)
+
+    def _type_text(self, element: WebElement, text: str, delay: float = 0.2, method: str = 'script') -> int:
+        '''
+        Gõ `text` vào `element`, Python chỉ gọi WebDriver một lần và chờ một lần (độ trễ từng phím tính sẵn).
+
+        - 'script': toàn bộ chuỗi gõ ngay trong trang (`scripts.TYPE_TEXT`) bằng sự kiện tổng hợp (isTrusted=false).
+          `Keys.ENTER`/`'\\n'` (gửi form, xuống dòng trong textarea), `Keys.TAB` (chuyển ô), `Keys.BACKSPACE`, mũi tên...
+          được mô phỏng trong trang.
+        - 'actions': phím thật (isTrusted) gửi trong một chuỗi ActionChains, chromedriver tự giữ nhịp giữa các phím.
+
+        Cách 'script' bị gián đoạn (trang chặn script, timeout) hoặc gặp phím bổ trợ (SHIFT, CONTROL...) → phần còn lại
+        (từ phím đã gõ tới) được gõ tiếp bằng 'actions', không gõ lại từ đầu.
+
+        Returns:
+            int: Số ký tự đã gõ (bằng `len(text)` khi xong).
+        '''
+        delays = self._typing_delays(text, delay)
+        typed = 0
+        if method == 'script':
+            keys = self._script_keys(text)
+            typed = self._type_text_script(element, keys, delays)
+            if typed < len(keys):
+                self.log(f'⚠️ Gõ tiếp {len(text) - typed} ký tự còn lại bằng ActionChains', show_log=False)
+        return typed + self._type_text_actions(element, text[typed:], delays[typed:])
+
+    def find_and_input(self, by: str, value: str, text: str, parent_element: WebElement|None = None, delay: float = 0.2, wait: float|None = None, timeout: float|None = None, method: str = 'script'):
         '''
         Phương thức tìm và điền văn bản vào một phần tử trên trang web.
 
@@ -776,6 +1452,10 @@ class Node:
             delay (float): Thời gian trễ giữa mỗi ký tự khi nhập văn bản. Mặc định là 0.2 giây.
             wait (float, optional): Thời gian chờ trước khi thực hiện thao tác nhấp. Mặc định sử dụng giá trị `self.wait = 3`.
             timeout (float, optional): Thời gian tối đa để chờ phần tử có thể nhấp được. Mặc định sử dụng giá trị self.timeout = 30.
+            method (str, optional): Cách gõ (đều chỉ 1 lần gọi WebDriver, nhịp người gõ tính sẵn). Mặc định: `script`
+                - `'script'` → gõ ngay trong trang bằng sự kiện tổng hợp (isTrusted=false); `Keys.ENTER`/`Keys.TAB`/`'\\n'`,
+                  `Keys.BACKSPACE`, mũi tên... được mô phỏng trong trang.
+                - `'actions'` → phím thật (isTrusted) trong một chuỗi `ActionChains`, chromedriver tự giữ nhịp.
 
         Returns:
             bool: 
@@ -785,27 +1465,26 @@ class Node:
         Mô tả:
             - Phương thức sẽ tìm phần tử theo phương thức `by` và `value`.
             - Sau khi tìm thấy phần tử và đảm bảo phần tử có thể tương tác, phương thức sẽ thực hiện nhập văn bản `text` vào phần tử đó.
-            - Văn bản sẽ được nhập từng ký tự một, với thời gian trễ giữa mỗi ký tự được xác định bởi tham số `delay`.
+            - Văn bản sẽ được nhập từng ký tự một, với thời gian trễ giữa mỗi ký tự được xác định bởi tham số `delay` (dao động như người gõ).
+            - Nếu cách gõ bị gián đoạn giữa chừng, phần còn lại được gõ tiếp bằng `'actions'` (không gõ lặp phần đã có).
             - Nếu gặp lỗi, sẽ ghi lại thông báo lỗi cụ thể.
             - Nếu gặp lỗi liên quan đến Javascript (LavaMoat), phương thức sẽ thử lại bằng cách tìm phần tử theo cách khác.
         '''
         timeout = self._get_timeout(timeout)
-        wait = self._get_wait(wait)
 
         if not text:
             self.log(f'Không có text để nhập vào input')
             return False
+        before = None
         try:
             search_context = parent_element if parent_element else self._driver
             
-            element = WebDriverWait(search_context, timeout).until(
-                EC.visibility_of_element_located((by, value))
-            )
-            Utility.wait_time(wait)
+            element = self._wait_for(by, value, 'visible', timeout, parent_element)
+            self._pre_wait(wait, element=element)
 
-            for ch in text:
-                Utility.wait_time(delay)
-                ActionChains(self._driver).send_keys_to_element(element, ch).perform()
+            # Giá trị trước khi gõ (lấy qua endpoint WebDriver, không chạy JS) để PT2 không gõ lặp phần đã nhập
+            before = element.get_property('value')
+            self._type_text(element, text, delay, method)
             self.log(f'Nhập văn bản phần tử ({by}, {value}) thành công')
             return True
 
@@ -825,12 +1504,22 @@ class Node:
                     element = WebDriverWait(search_context, timeout).until(
                         EC.presence_of_element_located((by, value))
                     )
-                    Utility.wait_time(wait)
-                    
-                    for ch in text:
-                        Utility.wait_time(delay)
-                        ActionChains(self._driver).send_keys_to_element(element, ch).perform()
+                    self._pre_wait(wait, element=element)
+
+                    remaining = text
+                    current = element.get_property('value')
+                    if isinstance(before, str) and isinstance(current, str) and current != before:
+                        added = current[len(before):] if current.startswith(before) else None
+                        if added is not None and text.startswith(added):
+                            # Lần trước đã gõ được một phần → gõ tiếp
+                            remaining = text[len(added):]
+                        else:
+                            # Không xác định được phần đã gõ → trả ô về giá trị ban đầu rồi gõ lại
+                            element.clear()
+                            remaining = before + text
+                    self._type_text(element, remaining, delay, 'actions')
                     self.log(f'Nhập văn bản phần tử ({by}, {value}) thành công (PT2)')
+                    return True
                 
                 except Exception as e:
                     self.log(f'không xác định ({by}, {value}) {e}')
@@ -839,6 +1528,88 @@ class Node:
                 self.log(f'không xác định ({by}, {value}) {e}')
 
         return False
+
+    def fill_form(self, fields: dict[tuple[str, str], str|bool], parent_element: WebElement|None = None, fallback_typing: bool = True, delay: float = 0.1, wait: float|None = None, timeout: float|None = None) -> dict[tuple[str, str], bool]:
+        '''
+        Điền nhiều trường của form trong một lần gọi `execute_script`.
+
+        Args:
+            fields (dict[tuple[str, str], str | bool]): {(by, value): giá trị}. Checkbox/radio nhận bool.
+            parent_element (WebElement, optional): Nếu có, chỉ tìm các trường bên trong phần tử này.
+            fallback_typing (bool, optional): Trường từ chối giá trị gán bằng script (giá trị bị trang sửa lại/không editable)
+                sẽ được gõ phím thật bằng ActionChains. Mặc định True.
+            delay (float, optional): Độ trễ giữa các phím khi gõ phím thật. Mặc định 0.1 giây.
+            wait (float, optional): Thời gian chờ trước khi điền. Mặc định theo `wait_policy`.
+            timeout (float, optional): Thời gian tối đa chờ các trường xuất hiện. Mặc định là `self.timeout`.
+
+        Returns:
+            dict[tuple[str, str], bool]: Kết quả từng trường, True nếu giá trị cuối cùng đúng như mong muốn.
+
+        Mô tả:
+            - Giá trị được gán qua native setter của input/textarea/select (React/Vue nhận được thay đổi), sau đó phát `input` và `change`.
+            - Trường chưa xuất hiện được thử lại cho đến hết `timeout`.
+
+        Ví dụ:
+            node.fill_form({
+                (By.NAME, 'email'): 'abc@gmail.com',
+                (By.NAME, 'password'): 'secret',
+                (By.ID, 'agree'): True,
+            })
+        '''
+        timeout = self._get_timeout(timeout)
+        self._pre_wait(wait)
+
+        results: dict[tuple[str, str], bool] = {}
+        rejected: list[tuple[str, str]] = []
+        pending = list(fields)
+        check_timeout = Utility.timeout(timeout)
+        try:
+            while pending:
+                payload = [[by, value, fields[(by, value)]] for by, value in pending]
+                statuses = self._driver.execute_script(scripts.FILL_FORM, payload, parent_element)
+                missing = []
+                for locator, (status, detail) in zip(pending, statuses):
+                    if status == 'not_found':
+                        missing.append(locator)
+                    elif status == 'rejected':
+                        rejected.append(locator)
+                    else:
+                        results[locator] = status == 'ok'
+                        if status == 'error':
+                            self.log(f'❌ Lỗi khi điền {locator}: {detail}')
+                pending = missing
+                if pending and not check_timeout():
+                    break
+                if pending:
+                    get_clock().poll(0.5)
+        except WebDriverException as e:
+            self.log(f'❌ Không điền được form bằng script: {e}')
+            rejected.extend(pending)
+            pending = []
+
+        for locator in pending:
+            results[locator] = False
+            self.log(f'Không tìm thấy phần tử {locator} trong {timeout}s')
+
+        search_context = parent_element if parent_element else self._driver
+        for locator in rejected:
+            text = fields[locator]
+            results[locator] = False
+            if not fallback_typing or isinstance(text, bool):
+                continue
+            try:
+                element = search_context.find_element(*locator)
+                element.clear()
+                self._type_text(element, str(text), delay, 'actions')
+                results[locator] = element.get_attribute('value') == str(text)
+            except WebDriverException as e:
+                self.log(f'❌ Không gõ được vào {locator}: {e}')
+
+        results = {locator: results.get(locator, False) for locator in fields}
+        filled = sum(results.values())
+        self.log(f'{"✅" if filled == len(fields) else "⚠️"} Điền form {filled}/{len(fields)} trường')
+        return results
+
     def press_key(self, key: str, parent_element: WebElement|None = None, wait: float|None = None, timeout: float|None = None):
         '''
         Phương thức nhấn phím trên trang web.
@@ -861,10 +1632,9 @@ class Node:
             node.press_key('Tab', parent_element=element)
         '''
         timeout = self._get_timeout(timeout)
-        wait = self._get_wait(wait)
         
         try:
-            Utility.wait_time(wait)
+            self._pre_wait(wait)
             
             # Lấy key từ class Keys nếu có
             key_to_press = getattr(Keys, key.upper(), key)
@@ -912,9 +1682,8 @@ class Node:
             - Nếu gặp lỗi liên quan đến Javascript (LavaMoat), phương thức sẽ thử lại bằng cách tìm phần tử theo cách khác.
         '''
         timeout = self._get_timeout(timeout)
-        wait = self._get_wait(wait)
 
-        Utility.wait_time(wait)
+        self._pre_wait(wait)
         try:
             search_context = parent_element if parent_element else self._driver
             
@@ -942,6 +1711,25 @@ class Node:
 
         return None
 
+    def _tab_targets(self) -> list[dict] | None:
+        '''
+        Lấy URL và tiêu đề của mọi tab trong một lệnh CDP `Target.getTargets` (targetId của tab chính là window handle).
+
+        Returns:
+            list[dict] | None: Các target loại 'page' (gồm cả popup của extension), None nếu không dùng được CDP.
+        '''
+        try:
+            infos = self._driver.execute_cdp_cmd('Target.getTargets', {})['targetInfos']
+        except Exception:
+            return None
+        return [info for info in infos if info.get('type') == 'page']
+
+    @staticmethod
+    def _match_tab(info: dict, value: str, type: str) -> bool:
+        if type == 'title':
+            return value.lower() in info.get('title', '').lower()
+        return info.get('url', '').lower().startswith(value.lower())
+
     def switch_tab(self, value: str, type: str = 'url', wait: float|None = None, timeout: float|None = None, show_log: bool = True) -> bool:
         '''
         Chuyển đổi tab dựa trên tiêu đề hoặc URL.
@@ -955,16 +1743,50 @@ class Node:
 
         Returns:
             bool: True nếu tìm thấy và chuyển đổi thành công, False nếu không.
+
+        Mô tả:
+            - Đọc URL/tiêu đề mọi tab bằng một lệnh CDP rồi chuyển thẳng tới tab khớp, không ghé qua từng tab
+              (không nháy focus). Tab chưa mở (popup extension) được kiểm tra lại mỗi 0.25 giây.
+            - Không dùng được CDP → quay về cách duyệt lần lượt từng tab.
         '''
+        self._invalidate_cache()
         types = ['title', 'url']
         timeout = self._get_timeout(timeout)
-        wait = self._get_wait(wait)
-        found = False
 
         if type not in types:
-            self.log('Tìm không thành công. {type} phải thuộc {types}')
-            return found
-        Utility.wait_time(wait)
+            self.log(f'Tìm không thành công. {type} phải thuộc {types}')
+            return False
+        self._pre_wait(wait)
+
+        targets = self._tab_targets()
+        if targets is None:
+            return self._switch_tab_by_sweep(value, type, timeout, show_log)
+
+        check_timeout = Utility.timeout(timeout)
+        while True:
+            match = next((info for info in targets if self._match_tab(info, value, type)), None)
+            if match:
+                try:
+                    self._driver.switch_to.window(match['targetId'])
+                    self.log(message=f'Đã chuyển sang tab: {match["title"]} ({match["url"]})', show_log=show_log)
+                    return True
+                except NoSuchWindowException:
+                    # Tab vừa đóng, hoặc driver không dùng targetId làm window handle
+                    if match['targetId'] not in self._driver.window_handles:
+                        return self._switch_tab_by_sweep(value, type, timeout, show_log)
+            if not check_timeout():
+                break
+            get_clock().poll(0.25)
+            targets = self._tab_targets() or []
+
+        self.log(
+            message=f'Không tìm thấy tab có [{type}: {value}] sau {timeout}s.',
+            show_log=show_log
+        )
+        return False
+
+    def _switch_tab_by_sweep(self, value: str, type: str, timeout: float, show_log: bool) -> bool:
+        found = False
         try:
             current_handle = self._driver.current_window_handle
             current_title = self._driver.title
@@ -996,7 +1818,7 @@ class Node:
                         )
                         return found
 
-                Utility.wait_time(2)
+                get_clock().poll(2)
 
             # Không tìm thấy → Quay lại tab cũ
             self._driver.switch_to.window(current_handle)
@@ -1021,9 +1843,9 @@ class Node:
         Args:
             wait (float, optional): Thời gian chờ trước khi thực hiện reload, mặc định sử dụng giá trị `self.wait = 3`.
         '''
-        wait = self._get_wait(wait)
+        self._invalidate_cache()
 
-        Utility.wait_time(wait)
+        self._pre_wait(wait)
                 
         try:
             self._driver.refresh()
@@ -1046,14 +1868,14 @@ class Node:
         Returns:
             bool: True nếu đóng tab thành công, False nếu không.
         '''
+        self._invalidate_cache()
 
         timeout = self._get_timeout(timeout)
-        wait = self._get_wait(wait)
 
         current_handle = self._driver.current_window_handle
         all_handles = self._driver.window_handles
 
-        Utility.wait_time(wait)
+        self._pre_wait(wait)
         # Nếu chỉ có 1 tab, không thể đóng
         if len(all_handles) < 2:
             self.log(f'❌ Chỉ có 1 tab duy nhất, không thể đóng')
@@ -1061,7 +1883,7 @@ class Node:
 
         # Nếu không nhập `value`, đóng tab hiện tại & chuyển về tab trước
         if not value:
-            Utility.wait_time(wait)
+            self._pre_wait(wait)
 
             self.log(
                 f'Đóng tab: {self._driver.title} ({self._driver.current_url})')
@@ -1071,8 +1893,30 @@ class Node:
             self._driver.switch_to.window(all_handles[previous_index])
             return True
 
-        # Nếu có `value`, tìm tab theo tiêu đề hoặc URL
-        if self.switch_tab(value=value, type=type, show_log=False):
+        # Nếu có `value`, tìm tab theo tiêu đề hoặc URL.
+        # Tab khác tab hiện tại được đóng thẳng qua CDP, không cần chuyển focus sang nó
+        targets = self._tab_targets()
+        if targets is not None:
+            check_timeout = Utility.timeout(timeout)
+            while True:
+                match = next((info for info in targets if self._match_tab(info, value, type)), None)
+                if match and match['targetId'] != current_handle:
+                    try:
+                        self._driver.execute_cdp_cmd('Target.closeTarget', {'targetId': match['targetId']})
+                        self.log(f'Đóng tab: {match["title"]} ({match["url"]})')
+                        return True
+                    except WebDriverException as e:
+                        self.log(f'⚠️ Không đóng được tab qua CDP: {e}', show_log=False)
+                        break
+                if match or not check_timeout():
+                    break
+                get_clock().poll(0.25)
+                targets = self._tab_targets() or []
+            if not match:
+                self.log(f"❌ Không tìm thấy tab có {type}: {value}.")
+                return False
+
+        if self.switch_tab(value=value, type=type, timeout=timeout, show_log=False):
             found_handle = self._driver.current_window_handle
 
             self.log(
@@ -1104,9 +1948,8 @@ class Node:
         Mô tả:
             Phương thức sẽ nhận vào 1 element cụ thể, sau đó dùng driver.execute_script() để thực thi script
         '''
-        wait = self._get_wait(wait)
 
-        Utility.wait_time(wait)
+        self._pre_wait(wait)
         try:
             self._driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
             self.log(f'Cuộn đến {element} thành công')
@@ -1134,8 +1977,7 @@ class Node:
         Mô tả:
             Phương thức sẽ nhận vào 1 element cụ thể, sau đó dùng driver.execute_script() để thực thi script
         """
-        wait = self._get_wait(wait)
-        Utility.wait_time(wait)
+        self._pre_wait(wait)
         try:
             if position == "top":
                 self._driver.execute_script("window.scrollTo(0, 0);")
@@ -1159,7 +2001,7 @@ class Node:
             self.log(f"Lỗi khi cuộn trang: {e}")
         return False
 
-    def ask_ai(self, prompt: str, is_image: bool = True, wait: float|None = None) -> str|None:
+    def ask_ai(self, prompt: str, is_image: bool = True, wait: float|None = None, use_cache: bool = True) -> str|None:
         '''
         Gửi prompt và hình ảnh (nếu có) đến AI để phân tích và nhận kết quả.
 
@@ -1168,35 +2010,39 @@ class Node:
             is_image (bool, optional):  Nếu True, sẽ chụp ảnh màn hình hiện tại và gửi kèm. 
                                         Nếu False, chỉ gửi prompt không kèm ảnh.
             wait (float, optional): Thời gian chờ trước khi thực hiện hành động.
+            use_cache (bool, optional): Dùng lại câu trả lời đã cache cho cùng prompt và cùng ảnh chụp.
+                                        Đặt False khi thử lại vì câu trả lời trước sai. Mặc định True.
 
         Returns:
             str: Kết quả phân tích từ AI. Trả về None nếu có lỗi xảy ra.
         '''
-        wait = self._get_wait(wait)
 
         if not self._ai_bot or not self._ai_bot.valid:
             self.log(f'AI bot không hoạt động')
             return None
         
         self.log(f'AI đang suy nghĩ...')
-        Utility.wait_time(wait)
+        self._pre_wait(wait)
 
         result, error = None, None
         if is_image:
             try:
-                img_bytes = self._driver.get_screenshot_as_png()
-                result, error = self._ai_bot.ask(prompt, img_bytes)
+                # AIHelper thu nhỏ ảnh về 384px → chụp sẵn ảnh nhỏ thay vì PNG cả khung nhìn
+                img_bytes = self.capture(format='jpeg', quality=80, max_width=768)
+                if img_bytes is None:
+                    raise ValueError('capture')
+                result, error = self._ai_bot.ask(prompt, img_bytes, use_cache)
             except Exception as e:
                 error = f'Không thể chụp hình ảnh gửi đến AI bot'
         else:   
-            result, error =  self._ai_bot.ask(prompt)
+            result, error =  self._ai_bot.ask(prompt, use_cache=use_cache)
         
         if error:
             self.log(message=f'{error}')
             return None
         
         if result:
-            self.log(f'AI đã trả lời: "{result[:10]}{"..." if len(result) > 10 else ''}"')
+            self.log(f'AI đã trả lời: "{result[:10]}{"..." if len(result) > 10 else ""}"')
 
         return result
         
@@ -0,0 +1,149 @@
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image
+
+class AIEntry(NamedTuple):
+    answer: str
+    created: float
+
+class AICache:
+    '''
+    Cache câu trả lời của `AIHelper.ask`, khóa theo (model, prompt, khóa ảnh).
+
+    - Mặc định ảnh phải giống hệt từng byte (khóa ảnh = SHA-256 của ảnh chụp), nên các profile cùng một màn hình
+      không gửi lại yêu cầu lên AI, còn captcha khác (dù cùng bố cục trang) luôn được hỏi lại.
+    - `threshold` là số (tùy chọn): ảnh "gần giống" (khoảng cách Hamming giữa hai dHash 64 bit ≤ `threshold`) dùng chung
+      câu trả lời. Chỉ bật cho nội dung mà thay đổi nhỏ không làm đổi câu trả lời - KHÔNG dùng cho captcha.
+    - Prompt không kèm ảnh so khớp chính xác.
+    - Entry hết hạn sau `ttl` giây; giữ tối đa `max_size` entry, bỏ entry ít dùng nhất (LRU).
+    - `path` (tùy chọn): lưu thêm vào file SQLite để dùng lại giữa các lần chạy.
+
+    Args:
+        threshold (int, optional): Số bit khác nhau tối đa giữa hai dHash. Mặc định None = ảnh phải giống hệt từng byte.
+        ttl (float, optional): Thời gian sống của câu trả lời (giây). Mặc định 600.
+        max_size (int, optional): Số entry tối đa trong bộ nhớ. Mặc định 256.
+        path (str | Path, optional): File SQLite. None = chỉ cache trong bộ nhớ.
+    '''
+    def __init__(self, threshold: int | None = None, ttl: float = 600, max_size: int = 256, path: str | Path | None = None) -> None:
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str, int | None], AIEntry] = OrderedDict()
+        # (model, prompt) → các dHash đã cache, để chỉ so ảnh của cùng một câu hỏi
+        self._hashes: dict[tuple[str, str], set[int | None]] = {}
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path:
+            self._open_db(Path(path))
+
+    @staticmethod
+    def dhash(image: Image.Image) -> int:
+        '''dHash 64 bit: so độ sáng các điểm ảnh kề nhau trên ảnh xám 9x8.'''
+        pixels = list(image.convert('L').resize((9, 8), Image.Resampling.LANCZOS).getdata())
+        value = 0
+        for row in range(8):
+            for col in range(8):
+                value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+        return value
+
+    def image_key(self, img_bytes: bytes, image: Image.Image) -> int:
+        '''Khóa 64 bit của ảnh: SHA-256 của `img_bytes` (so khớp chính xác) hoặc dHash của `image` khi đặt `threshold`.'''
+        if self.threshold is None:
+            return int.from_bytes(hashlib.sha256(img_bytes).digest()[:8], 'big')
+        return self.dhash(image)
+
+    def _open_db(self, path: Path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS ai_cache ('
+                'model TEXT, prompt TEXT, phash TEXT, answer TEXT, created REAL, '
+                'PRIMARY KEY (model, prompt, phash))')
+            self._db.execute('DELETE FROM ai_cache WHERE created < ?', (time.time() - self.ttl,))
+            self._db.commit()
+            rows = self._db.execute(
+                'SELECT model, prompt, phash, answer, created FROM ai_cache ORDER BY created DESC LIMIT ?',
+                (self.max_size,)).fetchall()
+        except sqlite3.Error as e:
+            print(f'⚠️ Không mở được cache AI {path}: {e}')
+            self._db = None
+            return
+        for model, prompt, phash, answer, created in reversed(rows):
+            self._store((model, prompt, int(phash, 16) if phash else None), AIEntry(answer, created))
+
+    def _store(self, key: tuple[str, str, int | None], entry: AIEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._hashes.setdefault(key[:2], set()).add(key[2])
+        while len(self._entries) > self.max_size:
+            old_key, _ = self._entries.popitem(last=False)
+            self._forget(old_key)
+
+    def _forget(self, key: tuple[str, str, int | None]):
+        self._entries.pop(key, None)
+        hashes = self._hashes.get(key[:2])
+        if hashes is not None:
+            hashes.discard(key[2])
+            if not hashes:
+                del self._hashes[key[:2]]
+
+    def get(self, model: str, prompt: str, phash: int | None) -> str | None:
+        '''Trả về câu trả lời còn hạn của ảnh giống nhất (trong `threshold`), None nếu không có.'''
+        threshold = self.threshold or 0
+        with self._lock:
+            now = time.time()
+            best_key, best_distance = None, None
+            for cached in list(self._hashes.get((model, prompt), ())):
+                key = (model, prompt, cached)
+                if now - self._entries[key].created > self.ttl:
+                    self._forget(key)
+                    continue
+                if phash is None or cached is None:
+                    distance = 0 if phash == cached else None
+                else:
+                    distance = (phash ^ cached).bit_count()
+                if distance is not None and distance <= threshold and (best_distance is None or distance < best_distance):
+                    best_key, best_distance = key, distance
+
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return self._entries[best_key].answer
+
+    def put(self, model: str, prompt: str, phash: int | None, answer: str):
+        entry = AIEntry(answer, time.time())
+        with self._lock:
+            self._store((model, prompt, phash), entry)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO ai_cache VALUES (?, ?, ?, ?, ?)',
+                        (model, prompt, f'{phash:016x}' if phash is not None else '', answer, entry.created))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f'⚠️ Không ghi được cache AI: {e}')
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hashes.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute('DELETE FROM ai_cache')
+                    self._db.commit()
+                except sqlite3.Error:
+                    pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
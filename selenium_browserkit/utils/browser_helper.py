@@ -1,25 +1,81 @@
+import os
 import time
+import re
+import json
+import queue
+import stat
 import ctypes
+import shutil
+import hashlib
+import tarfile
+import zipfile
+import platform
+import tempfile
+import threading
 import subprocess
 import sys
 
-import urllib.request
+import urllib.parse
 from pathlib import Path
 from io import BytesIO
+from typing import NamedTuple
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import requests
 from google import genai
 from PIL import Image
 
 from .core import Utility
+from .filelock import FileLock
+from .ai_cache import AICache
+from .ratelimit import TokenBucket, backoff
+from .startup import ValidationCache
+
+class _TelePhoto(NamedTuple):
+    chat_id: str
+    photo: bytes
+    caption: str
+    profile_name: str
+    future: Future
 
 class TeleHelper:
-    def __init__(self) -> None:
+    _ALBUM_MAX = 10  # Telegram cho phép tối đa 10 ảnh mỗi album
+
+    def __init__(self, max_queue: int = 50, batch_window: float = 1.0, chat_rate: float = 1.0, retries: int = 3,
+                 validation_cache: ValidationCache | None = None) -> None:
+        '''
+        Gửi ảnh lên Telegram bot bằng một thread nền dùng chung cho mọi profile.
+
+        - `send_photo` chỉ đẩy ảnh vào hàng đợi (giới hạn `max_queue`) rồi trả về ngay, không chặn luồng tự động hóa.
+        - Dùng chung một `requests.Session` (giữ kết nối), giới hạn tốc độ theo từng chat.
+        - Các ảnh tới gần nhau (trong `batch_window` giây) được gộp thành album `sendMediaGroup`.
+        - Lỗi mạng/429/5xx được thử lại với thời gian chờ tăng dần (tôn trọng `retry_after` của Telegram);
+          chỉ khi Telegram từ chối token (401/404) bot mới bị tắt (`valid = False`).
+
+        Args:
+            max_queue (int, optional): Số ảnh tối đa chờ gửi. Mặc định 50.
+            batch_window (float, optional): Thời gian (giây) gom ảnh thành album. Mặc định 1.
+            chat_rate (float, optional): Số yêu cầu gửi tối đa mỗi giây cho một chat. Mặc định 1.
+            retries (int, optional): Số lần thử lại mỗi yêu cầu. Mặc định 3.
+            validation_cache (ValidationCache, optional): Nhớ token đã xác thực (và tên bot) để bỏ qua `getMe` khi mở lại tool.
+        '''
         self.valid: bool = False
         self.bot_name = None
         self._chat_id = None
         self._token = None
         self._endpoint = None
+        self.batch_window = batch_window
+        self.chat_rate = chat_rate
+        self.retries = retries
+        self._validation_cache = validation_cache
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        self._queue: queue.Queue[_TelePhoto | None] = queue.Queue(maxsize=max_queue)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
         
         self._get_token()
         if not self.valid:
@@ -29,13 +85,22 @@ class TeleHelper:
         if not self._token:
             return False
 
+        if self._validation_cache is not None:
+            cached = self._validation_cache.get('tele', self._endpoint, self._token)
+            if cached:
+                self.bot_name = cached.get('bot_name')
+                print(f"✅ Telegram bot hoạt động: {self.bot_name} (đã xác thực gần đây)")
+                return True
+
         url = f"{self._endpoint}/bot{self._token}/getMe"
         try:
-            response = requests.get(url, timeout=5)
+            response = self._session.get(url, timeout=5)
             data = response.json()
             if data.get("ok"):
                 self.bot_name = f"@{data['result']['username']}"
                 print(f"✅ Telegram bot hoạt động: {self.bot_name}")
+                if self._validation_cache is not None:
+                    self._validation_cache.put('tele', self._endpoint, self._token, bot_name=self.bot_name)
                 return True
             else:
                 return False
@@ -74,49 +139,170 @@ class TeleHelper:
 
             return False
 
-    def send_photo(self, screenshot_png, message: str = 'khởi động...'):
+    def send_photo(self, screenshot_png: bytes, message: str = 'khởi động...', profile_name: str = 'System') -> Future | None:
         """
-        Gửi tin nhắn đến Telegram bot. Kiểm tra token trước khi gửi.
+        Xếp ảnh vào hàng đợi gửi lên Telegram bot và trả về ngay.
+
+        Args:
+            screenshot_png (bytes): Ảnh PNG/JPEG.
+            message (str, optional): Chú thích ảnh.
+            profile_name (str, optional): Tên profile (dùng cho log khi gửi lỗi).
+
+        Returns:
+            Future | None: `future.result()` là True nếu Telegram nhận ảnh, False nếu thất bại.
+                None nếu bot không hoạt động hoặc hàng đợi đầy (ảnh bị bỏ).
         """
         if not self.valid or not all([self._chat_id, self._token]):
-            Utility._logger(message="❌ Không thể gửi tin nhắn: Token không hợp lệ hoặc chưa được thiết lập.")
-            self.valid = False
-            return False
-
-        url = f"{self._endpoint}/bot{self._token}/sendPhoto"
+            Utility._logger(profile_name, "❌ Không thể gửi tin nhắn: Token không hợp lệ hoặc chưa được thiết lập.")
+            return None
 
-        
-        data = {'chat_id': self._chat_id,
-                'caption': message}
-        # Gửi ảnh lên Telegram
+        item = _TelePhoto(self._chat_id, screenshot_png, message, profile_name, Future())
         try:
-            with BytesIO(screenshot_png) as screenshot_buffer:
-                files = {
-                    'photo': ('screenshot.png', screenshot_buffer, 'image/png')
-                }
-                response = requests.post(url, files=files, data=data, timeout=5)
-                res_json = response.json()
+            self._queue.put_nowait(item)
+        except queue.Full:
+            Utility._logger(profile_name, "⚠️ Hàng đợi gửi Telegram đã đầy, bỏ qua ảnh này.")
+            return None
+
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='tele-notifier', daemon=True)
+                self._worker.start()
+        return item.future
 
-                if not res_json.get("ok"):
-                    Utility._logger(message=f"❌ Gửi ảnh thất bại: {res_json}")
+    def _run(self):
+        '''Thread nền: lấy ảnh khỏi hàng đợi, gom theo chat trong `batch_window` giây rồi gửi.'''
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            stop = False
+            while len(batch) < self._ALBUM_MAX:
+                remaining = deadline - time.monotonic()
+                try:
+                    next_item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if next_item is None:
+                    stop = True
+                    break
+                batch.append(next_item)
+
+            chats: dict[str, list[_TelePhoto]] = {}
+            for photo in batch:
+                chats.setdefault(photo.chat_id, []).append(photo)
+            for chat_id, photos in chats.items():
+                try:
+                    self._deliver(chat_id, photos)
+                except Exception as e:
+                    # Lỗi ngoài dự kiến không được làm chết thread gửi: báo thất bại cho cả lô rồi gửi tiếp
+                    Utility._logger(photos[0].profile_name, f"❌ Gửi ảnh thất bại: {e}")
+                    for photo in photos:
+                        if not photo.future.done():
+                            photo.future.set_result(False)
+            if stop:
+                return
+
+    @staticmethod
+    def _photo_file(photo: bytes, name: str) -> tuple[str, bytes, str]:
+        # Node.capture gửi JPEG, take_screenshot gửi PNG
+        if photo.startswith(b'\x89PNG'):
+            return (f'{name}.png', photo, 'image/png')
+        return (f'{name}.jpg', photo, 'image/jpeg')
+
+    def _deliver(self, chat_id: str, photos: list[_TelePhoto]):
+        if len(photos) == 1:
+            photo = photos[0]
+            method = 'sendPhoto'
+            data = {'chat_id': chat_id, 'caption': photo.caption}
+            files = {'photo': self._photo_file(photo.photo, 'screenshot')}
+        else:
+            method = 'sendMediaGroup'
+            media = [{'type': 'photo', 'media': f'attach://photo{i}', 'caption': photo.caption} for i, photo in enumerate(photos)]
+            data = {'chat_id': chat_id, 'media': json.dumps(media, ensure_ascii=False)}
+            files = {f'photo{i}': self._photo_file(photo.photo, f'screenshot{i}') for i, photo in enumerate(photos)}
+
+        ok, error = self._post(chat_id, method, data, files)
+        for photo in photos:
+            if not ok:
+                Utility._logger(photo.profile_name, f"❌ Gửi ảnh thất bại: {error}")
+            photo.future.set_result(ok)
+
+    def _post(self, chat_id: str, method: str, data: dict, files: dict) -> tuple[bool, str | None]:
+        '''Gửi một yêu cầu (qua giới hạn tốc độ của chat), thử lại lỗi tạm thời. Trả về (thành công, lỗi).'''
+        bucket = self._buckets.setdefault(chat_id, TokenBucket(self.chat_rate))
+        url = f"{self._endpoint}/bot{self._token}/{method}"
+        error = None
+        for attempt in range(self.retries + 1):
+            bucket.acquire()
+            retry_after = None
+            try:
+                response = self._session.post(url, files=files, data=data, timeout=(5, 30))
+                res_json = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                error = f'Lỗi kết nối: {e}'
+            else:
+                if res_json.get("ok"):
+                    return True, None
+
+                error = res_json
+                code = res_json.get('error_code', response.status_code)
+                if code == 429:
+                    retry_after = res_json.get('parameters', {}).get('retry_after')
+                elif code in (401, 404):
+                    # Token bị thu hồi/sai → tắt bot, không thử lại
                     self.valid = False
-                    return False
+                    break
+                elif code < 500:
+                    break
 
-                return True
+            if attempt < self.retries:
+                time.sleep(retry_after if retry_after is not None else backoff(attempt))
+        return False, str(error)
 
-        except requests.exceptions.RequestException as e:
-            Utility._logger(message=f"❌ Lỗi kết nối khi gửi tin nhắn: {e}")
-            self.valid = False
-            return False
+    def close(self, timeout: float = 10):
+        '''Chờ gửi hết ảnh trong hàng đợi (tối đa `timeout` giây) rồi dừng thread nền.'''
+        with self._lock:
+            worker = self._worker
+        if worker is None or not worker.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        worker.join(timeout)
 
 class AIHelper:
-    def __init__(self, model_name: str = "gemini-2.0-flash"):
+    def __init__(self,
+                 model_name: str = "gemini-2.0-flash",
+                 cache: AICache | None = None,
+                 rpm: float = 15,
+                 max_concurrent: int = 4,
+                 retries: int = 3,
+                 workers: int = 2,
+                 base_url: str | None = None,
+                 validation_cache: ValidationCache | None = None):
         """
-        Khởi tạo AI Helper với API key và model name
+        Khởi tạo AI Helper với API key và model name.
+
+        Mỗi `BrowserManager` dùng chung một AIHelper cho mọi profile, nên đây là nơi điều phối mọi yêu cầu lên Gemini:
+            - Giới hạn số yêu cầu mỗi phút (token bucket) và số yêu cầu đồng thời.
+            - Tự thử lại lỗi quota/quá hạn/máy chủ bận với thời gian chờ lũy thừa có dao động (tôn trọng `retryDelay` nếu có).
+            - Xử lý ảnh (`_process_image`, dHash) trong một nhóm worker riêng.
+            - `submit` trả về `Future`, `ask` chờ kết quả.
         
         Args:
             api_key (str): API key của Gemini
             model_name (str, optional): Tên model sử dụng. Mặc định là "gemini-2.0-flash"
+            cache (AICache, optional): Cache câu trả lời theo (model, prompt, ảnh). None = không cache.
+            rpm (float, optional): Số yêu cầu tối đa mỗi phút (0 = không giới hạn). Mặc định 15.
+            max_concurrent (int, optional): Số yêu cầu gửi đồng thời tối đa. Mặc định 4.
+            retries (int, optional): Số lần thử lại khi gặp lỗi quota/quá hạn. Mặc định 3.
+            workers (int, optional): Số worker xử lý ảnh. Mặc định 2.
+            base_url (str, optional): Endpoint thay cho API Gemini mặc định (proxy, máy chủ giả lập khi test).
+                Có thể cấu hình trong `config.txt`: `AI_BOT=<TOKEN>|<BASE_URL>`.
+            validation_cache (ValidationCache, optional): Nhớ token đã xác thực để bỏ qua `models.list` khi mở lại tool.
             
         Returns:
             bool: True nếu AI hoạt động, False nếu không hoạt động
@@ -125,7 +311,14 @@ class AIHelper:
         self.model_name = model_name
         self.valid = False
         self._token = None
+        self._base_url = base_url
         self._client = None
+        self.cache = cache
+        self.retries = retries
+        self._validation_cache = validation_cache
+        self._bucket = TokenBucket(rpm / 60, capacity=max_concurrent) if rpm > 0 else None
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_concurrent), thread_name_prefix='ai-request')
+        self._prep_pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='ai-image')
         
         self._get_token()
         if not self.valid:
@@ -133,10 +326,17 @@ class AIHelper:
 
     def _check_token_valid(self) -> bool:
         try:
-            client = genai.Client(api_key=self._token)
+            http_options = {'base_url': self._base_url} if self._base_url else None
+            client = genai.Client(api_key=self._token, http_options=http_options)
+            if self._validation_cache is not None and self._validation_cache.get('ai', self._base_url, self._token) is not None:
+                self._client = client
+                print("✅ AI bot hoạt động (đã xác thực gần đây)")
+                return True
             _ = client.models.list()
             self._client = client
             print("✅ AI bot hoạt động")
+            if self._validation_cache is not None:
+                self._validation_cache.put('ai', self._base_url, self._token)
             return True
         except Exception as e:
             print(f"❌ Token lỗi: {e}")
@@ -148,9 +348,9 @@ class AIHelper:
 
         Nếu đọc được token hợp lệ (đúng định dạng và được Telegram xác nhận),
         thì gán giá trị vào các thuộc tính:
-            - self._chat_id
             - self._token
-            - self._endpoint
+            - self._base_url (nếu dòng cấu hình có dạng `<TOKEN>|<BASE_URL>`)
+            - self._client
             - self.valid = True
 
         Returns:
@@ -159,8 +359,11 @@ class AIHelper:
         tokens = Utility.read_config('AI_BOT')
         if tokens is not None:
             print(f'🛠️  Đang kiểm tra token AI bot...')
+            base_url = self._base_url
             for token in tokens:
-                self._token = token
+                parts = [part.strip() for part in token.split('|')]
+                self._token = parts[0]
+                self._base_url = parts[1].rstrip('/') if len(parts) >= 2 and 'http' in parts[1] else base_url
                 self.valid = self._check_token_valid()
                 if self.valid:
                     return True
@@ -193,78 +396,209 @@ class AIHelper:
 
         new_size = (new_width, new_height)
         return image.resize(new_size, Image.Resampling.LANCZOS)
+
+    def _prepare(self, img_bytes: bytes) -> tuple[Image.Image, int | None]:
+        '''Chạy trong nhóm worker xử lý ảnh: giải mã, thu nhỏ và tính khóa ảnh cho cache (nếu có cache).'''
+        resized_image = self._process_image(Image.open(BytesIO(img_bytes)))
+        phash = self.cache.image_key(img_bytes, resized_image) if self.cache is not None else None
+        return resized_image, phash
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        '''Lỗi tạm thời nên thử lại: quota/giới hạn tốc độ (429), quá hạn, máy chủ bận (5xx).'''
+        code = getattr(error, 'code', None)
+        if code in (429, 500, 502, 503, 504):
+            return True
+        message = str(error).lower()
+        return any(word in message for word in ('resource_exhausted', 'quota', 'deadline', 'timed out', 'unavailable'))
+
+    @staticmethod
+    def _retry_delay(error: Exception) -> float | None:
+        '''Thời gian chờ máy chủ yêu cầu (`RetryInfo.retryDelay`, ví dụ "12s"), None nếu không có.'''
+        match = re.search(r"retryDelay['\"]?\s*:\s*['\"]([\d.]+)s", str(error))
+        return float(match.group(1)) if match else None
+
+    @staticmethod
+    def _error_message(error: Exception) -> str:
+        error_message = str(error)
+        if "INVALID_ARGUMENT" in error_message or "API key not valid" in error_message:
+            return f"API key không hợp lệ. Vui lòng kiểm tra lại token."
+        elif "blocked" in error_message.lower():
+            return f"Prompt vi phạm chính sách nội dung - {error_message}"
+        elif "permission" in error_message.lower():
+            return f"Không có quyền truy cập API - {error_message}"
+        elif "quota" in error_message.lower() or "limit" in error_message.lower():
+            return f"Vượt quá giới hạn tài nguyên - {error_message}"
+        elif "timeout" in error_message.lower() or "deadline" in error_message.lower():
+            return f"Vượt quá thời gian xử lý - {error_message}"
+        else:
+            return f"Lỗi không xác định khi gửi yêu cầu đến AI - {error_message}"
+
+    def _generate(self, contents) -> str | None:
+        '''Gửi một yêu cầu (đã qua giới hạn tốc độ), thử lại lỗi tạm thời tối đa `self.retries` lần.'''
+        attempt = 0
+        while True:
+            if self._bucket is not None:
+                self._bucket.acquire()
+            try:
+                response = self._client.models.generate_content(model=self.model_name, contents=contents)
+                return response.text
+            except Exception as e:
+                if attempt >= self.retries or not self._is_retryable(e):
+                    raise
+                delay = self._retry_delay(e)
+                delay = backoff(attempt) if delay is None else delay + backoff(0, base=1.0)
+                Utility._logger(message=f'⏳ AI bận ({getattr(e, "code", None) or type(e).__name__}), thử lại sau {delay:.1f}s')
+                time.sleep(delay)
+                attempt += 1
+
+    def _request(self, prompt: str, prepared: Future | None, use_cache: bool) -> tuple[str | None, str | None]:
+        try:
+            resized_image, phash = prepared.result() if prepared is not None else (None, None)
+
+            if self.cache is not None and use_cache:
+                result = self.cache.get(self.model_name, prompt, phash)
+                if result is not None:
+                    return result, None
+
+            result = self._generate([resized_image, prompt] if resized_image is not None else prompt)
+            if self.cache is not None and result:
+                self.cache.put(self.model_name, prompt, phash, result)
+            return result, None
+        except Exception as e:
+            return None, self._error_message(e)
+
+    def submit(self, prompt: str, img_bytes: bytes | None = None, use_cache: bool = True) -> Future:
+        """
+        Gửi yêu cầu vào hàng đợi, không chờ kết quả.
+
+        Args:
+            prompt, img_bytes, use_cache: Như `ask`.
+
+        Returns:
+            Future[tuple[str | None, str | None]]: `future.result()` trả về (kết quả, lỗi) như `ask`.
+        """
+        if not self._client:
+            future = Future()
+            future.set_result((None, "AI bot không hoạt động"))
+            return future
+
+        prepared = self._prep_pool.submit(self._prepare, img_bytes) if img_bytes else None
+        return self._pool.submit(self._request, prompt, prepared, use_cache)
     
-    def ask(self, prompt: str, img_bytes: bytes | None = None) -> tuple[str | None, str | None]:
+    def ask(self, prompt: str, img_bytes: bytes | None = None, use_cache: bool = True) -> tuple[str | None, str | None]:
         """
         Gửi prompt và ảnh lên AI để phân tích
         
         Args:
             prompt (str): Câu hỏi hoặc yêu cầu gửi đến AI
             image (Image, optional): Ảnh cần phân tích. Nếu None, sẽ trả về None
+            use_cache (bool, optional): Dùng câu trả lời đã cache cho cùng prompt và ảnh (nếu có `self.cache`, so ảnh theo `cache.threshold`).
+                False = luôn hỏi lại AI (ví dụ khi câu trả lời cũ sai), câu trả lời mới vẫn được cache.
             
         Returns:
             tuple[str | None, str | None]: 
                 - Phần tử đầu tiên: Kết quả phân tích từ AI hoặc None nếu có lỗi
                 - Phần tử thứ hai: Thông báo lỗi hoặc None nếu không có lỗi
         """
-        result = None
-        try:
-            if not self._client:
-                return None, "AI bot không hoạt động"
-            
-            if img_bytes:
-                image = Image.open(BytesIO(img_bytes))
-                resized_image = self._process_image(image)
-                response = self._client.models.generate_content(
-                                    model=self.model_name,
-                                    contents=[resized_image, prompt]
-                                )
-            else:
-                response = self._client.models.generate_content(
-                                    model=self.model_name,
-                                    contents=prompt
-                                )
-            
-            result = response.text
-            return result, None
-            
-        except Exception as e:
-            error_message = str(e)
-            if "INVALID_ARGUMENT" in error_message or "API key not valid" in error_message:
-                return None, f"API key không hợp lệ. Vui lòng kiểm tra lại token."
-            elif "blocked" in error_message.lower():
-                return None, f"Prompt vi phạm chính sách nội dung - {error_message}"
-            elif "permission" in error_message.lower():
-                return None, f"Không có quyền truy cập API - {error_message}"
-            elif "quota" in error_message.lower() or "limit" in error_message.lower():
-                return None, f"Vượt quá giới hạn tài nguyên - {error_message}"
-            elif "timeout" in error_message.lower() or "deadline" in error_message.lower():
-                return None, f"Vượt quá thời gian xử lý - {error_message}"
-            else:
-                return None, f"Lỗi không xác định khi gửi yêu cầu đến AI - {error_message}"
+        return self.submit(prompt, img_bytes, use_cache).result()
+
+    def close(self):
+        '''Dừng các nhóm worker (các yêu cầu đang chờ vẫn được xử lý xong).'''
+        self._pool.shutdown(wait=False)
+        self._prep_pool.shutdown(wait=False)
 
 class Chromium:
     """
-    Hỗ trợ tự động tải về và giải nén trình duyệt Chromium từ GitHub, bằng công cụ 7zr.exe.
+    Hỗ trợ tự động tải về, kiểm tra và cài đặt trình duyệt Chromium vào thư mục cache dùng chung cho mọi tool trên máy.
+
+    - Tải song song nhiều đoạn (HTTP Range), tải tiếp được khi bị gián đoạn.
+    - Kiểm tra SHA-256 (nếu được ghim) trước khi giải nén.
+    - Giải nén `.zip`/`.tar.*` bằng Python, `.7z` bằng công cụ 7zr.exe (chỉ Windows).
+    - Cài đặt nguyên tử vào thư mục theo phiên bản: `<cache>/<platform>-<version>`, khóa cài đặt bằng `FileLock`.
 
-    Nguồn github: https://github.com/macchrome/winchrome/releases
+    Nguồn:
+        - Windows: https://github.com/macchrome/winchrome/releases
+        - Linux/macOS: https://googlechromelabs.github.io/chrome-for-testing/
     """
-    def __init__(self):
-        f"""
-        Khởi tạo class với các tham số mặc định:
-        - URL tải Chromium và công cụ 7zr.exe
-        - Tên tệp nén và công cụ giải nén
-        - Đường dẫn thư mục tải và thư mục đích
-        """
-        self._CHROMIUM_URL = "https://github.com/macchrome/winchrome/releases/download/v142.7444.142-M142.0.7444.142-r1522585-Win64/ungoogled-chromium-142.0.7444.142-1_Win64.7z"
-        self._EXE_URL = "https://www.7-zip.org/a/7zr.exe"
-        self._FILE_CHROMIUM = "chromium142.7z"
-        self._FILE_EXE = "7zr.exe"
-        self._TARGET_FOLDER_NAME = "chromium142"
-        self._DOWLOAD_PATH = Path(self._get_system_drive()) / 'chromium'
+    _SOURCES = {
+        'win64': {
+            'version': '142.0.7444.142',
+            'url': 'https://github.com/macchrome/winchrome/releases/download/v142.7444.142-M142.0.7444.142-r1522585-Win64/ungoogled-chromium-142.0.7444.142-1_Win64.7z',
+            'binary': 'chrome.exe',
+            'sha256': None,
+        },
+        'linux64': {
+            'version': '142.0.7444.175',
+            'url': 'https://storage.googleapis.com/chrome-for-testing-public/142.0.7444.175/linux64/chrome-linux64.zip',
+            'binary': 'chrome',
+            'sha256': None,
+        },
+        'mac-x64': {
+            'version': '142.0.7444.175',
+            'url': 'https://storage.googleapis.com/chrome-for-testing-public/142.0.7444.175/mac-x64/chrome-mac-x64.zip',
+            'binary': 'Google Chrome for Testing',
+            'sha256': None,
+        },
+        'mac-arm64': {
+            'version': '142.0.7444.175',
+            'url': 'https://storage.googleapis.com/chrome-for-testing-public/142.0.7444.175/mac-arm64/chrome-mac-arm64.zip',
+            'binary': 'Google Chrome for Testing',
+            'sha256': None,
+        },
+    }
+    _EXE_URL = "https://www.7-zip.org/a/7zr.exe"
+    _MANIFEST = ".browserkit.json"
+    _PART_SIZE_MIN = 8 * 1024 * 1024  # Mỗi đoạn tải tối thiểu 8MB
+    _CHUNK_SIZE = 256 * 1024
+
+    def __init__(self,
+                 url: str | None = None,
+                 sha256: str | None = None,
+                 version: str | None = None,
+                 binary: str | None = None,
+                 cache_dir: str | Path | None = None,
+                 connections: int = 8):
+        """
+        Khởi tạo và thiết lập Chromium. Kết quả lưu tại `self.path` (None nếu thất bại).
+
+        Args:
+            url (str, optional): URL tệp nén Chromium. Mặc định lấy theo hệ điều hành hiện tại.
+            sha256 (str, optional): Mã SHA-256 được ghim của tệp nén. Sai lệch sẽ hủy cài đặt.
+            version (str, optional): Tên phiên bản, dùng để đặt tên thư mục cache.
+            binary (str, optional): Tên tệp thực thi cần tìm sau khi giải nén.
+            cache_dir (str | Path, optional): Thư mục cache. Mặc định đọc biến môi trường `BROWSERKIT_CHROMIUM_DIR`,
+                nếu không có thì dùng thư mục cache của hệ thống.
+            connections (int): Số kết nối tải song song tối đa. Mặc định 8.
+        """
+        self._platform = self._get_platform()
+        source = dict(self._SOURCES.get(self._platform, {}))
+        if url:
+            source = {'url': url, 'sha256': None, 'version': None,
+                      'binary': source.get('binary', 'chrome')}
+        for key, value in (('sha256', sha256), ('version', version), ('binary', binary)):
+            if value:
+                source[key] = value
+
+        self._url: str | None = source.get('url')
+        self._sha256: str | None = source['sha256'].lower() if source.get('sha256') else None
+        self._version: str = source.get('version') or Utility._sanitize_text(Path(self._url or 'custom').stem)
+        self._binary: str = source.get('binary') or 'chrome'
+        self._connections = max(1, int(connections))
+        self._cache_dir = Path(cache_dir) if cache_dir else self._get_cache_dir()
+        self._download_dir = self._cache_dir / 'downloads'
+        self._target_dir = self._cache_dir / f'{self._platform}-{self._version}'
 
         self.path = self._setup()
-    
+
+    @staticmethod
+    def _get_platform() -> str:
+        if sys.platform.startswith('win'):
+            return 'win64'
+        if sys.platform == 'darwin':
+            return 'mac-arm64' if platform.machine().lower() in ('arm64', 'aarch64') else 'mac-x64'
+        return 'linux64'
+
     @staticmethod
     def _get_system_drive() -> Path:
         """
@@ -275,172 +609,365 @@ class Chromium:
         ctypes.windll.kernel32.GetWindowsDirectoryW(buffer, 260)
         return Path(Path(buffer.value).drive + "\\")
 
-    def _show_download_progress(self, block_num, block_size, total_size):
-        downloaded = block_num * block_size
+    @classmethod
+    def _get_cache_dir(cls) -> Path:
+        """
+        Thư mục cache dùng chung cho mọi tool trên máy:
+            - Biến môi trường `BROWSERKIT_CHROMIUM_DIR` (nếu có)
+            - Windows: `<ổ hệ thống>\\chromium`
+            - macOS: `~/Library/Caches/selenium-browserkit/chromium`
+            - Linux: `$XDG_CACHE_HOME/selenium-browserkit/chromium` (mặc định `~/.cache`)
+        """
+        env_dir = os.environ.get('BROWSERKIT_CHROMIUM_DIR')
+        if env_dir:
+            return Path(env_dir)
+        if sys.platform.startswith('win'):
+            return cls._get_system_drive() / 'chromium'
+        if sys.platform == 'darwin':
+            return Path.home() / 'Library' / 'Caches' / 'selenium-browserkit' / 'chromium'
+        base = os.environ.get('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+        return Path(base) / 'selenium-browserkit' / 'chromium'
+
+    def _show_download_progress(self, downloaded: int, total_size: int):
         percent = downloaded / total_size * 100 if total_size > 0 else 0
         percent = percent if percent < 100 else 100
         bar_len = 40
-        filled_len = int(bar_len * downloaded // total_size) if total_size else 0
+        filled_len = min(bar_len, int(bar_len * downloaded // total_size)) if total_size else 0
         bar = '=' * filled_len + '-' * (bar_len - filled_len)
         sys.stdout.write(f"\r📥 [{bar}] {percent:5.1f}%")
         sys.stdout.flush()
 
-    def _download_file(self, file_name: str, url: str) -> Path | None:
+    @staticmethod
+    def _sha256_file(file_path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _probe(self, session: requests.Session, url: str) -> tuple[int, bool]:
+        """
+        Lấy kích thước tệp và kiểm tra máy chủ có hỗ trợ tải theo đoạn (Range) không.
+
+        Returns:
+            tuple[int, bool]: (tổng số byte - 0 nếu không rõ, có hỗ trợ Range hay không)
+        """
+        with session.get(url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=15) as response:
+            if response.status_code == 206:
+                content_range = response.headers.get('Content-Range', '')
+                total = content_range.rsplit('/', 1)[-1]
+                if total.isdigit():
+                    return int(total), True
+            response.raise_for_status()
+            return int(response.headers.get('Content-Length') or 0), False
+
+    def _download_part(self, session: requests.Session, url: str, part_path: Path,
+                       start: int, end: int | None, progress) -> None:
+        """
+        Tải một đoạn [start, end] vào `part_path`, nối tiếp phần đã tải trước đó (nếu có).
+        `end=None` nghĩa là tải toàn bộ tệp bằng một luồng (máy chủ không hỗ trợ Range).
         """
-        Tải một tập tin từ URL nếu chưa tồn tại trong thư mục chỉ định.
+        done = part_path.stat().st_size if part_path.exists() else 0
+        if end is None:
+            done = 0
+        else:
+            length = end - start + 1
+            if done > length:
+                part_path.unlink()
+                done = 0
+            if done == length:
+                return
+
+        headers = {'Range': f'bytes={start + done}-{end}'} if end is not None else {}
+        with session.get(url, headers=headers, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            if end is not None and response.status_code != 206:
+                raise IOError(f'Máy chủ không trả về đoạn bytes={start + done}-{end}')
+            with open(part_path, 'ab' if done else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self._CHUNK_SIZE):
+                    f.write(chunk)
+                    progress(len(chunk))
+
+    def _download_file(self, file_name: str, url: str, sha256: str | None = None) -> Path | None:
+        """
+        Tải một tập tin từ URL nếu chưa tồn tại trong thư mục tải.
+
+        - Chia tệp thành nhiều đoạn và tải song song khi máy chủ hỗ trợ Range.
+        - Các đoạn được lưu riêng (`.partN`), lần chạy sau sẽ tải tiếp phần còn thiếu.
+        - Nếu có `sha256`, tệp hoàn chỉnh phải khớp, nếu không sẽ bị xóa.
 
         Args:
             file_name (str): Tên tệp cần tải.
             url (str): URL nguồn.
+            sha256 (str, optional): Mã SHA-256 mong đợi.
 
         Returns:
-            Path | None: Trả về đường dẫn tệp nếu mới tải, None nếu tệp đã tồn tại.
+            Path | None: Đường dẫn tệp nếu tải (hoặc đã có) và hợp lệ, None nếu thất bại.
         """
-        file_path = self._DOWLOAD_PATH / file_name
+        self._download_dir.mkdir(parents=True, exist_ok=True)
+        file_path = self._download_dir / file_name
+        meta_path = self._download_dir / f'{file_name}.parts.json'
 
         if file_path.exists():
-            size = file_path.stat().st_size
-            if size > 0:
+            if file_path.stat().st_size > 0 and (not sha256 or self._sha256_file(file_path) == sha256):
                 print(f"✅ Đã tồn tại {file_name}")
                 return file_path
-            else:
-                print(f"❌ File lỗi ({size} bytes). Xóa file...")
-                file_path.unlink(missing_ok=True)
+            print(f"❌ File lỗi hoặc sai SHA-256. Xóa file...")
+            file_path.unlink(missing_ok=True)
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self._connections)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
         try:
             print(f"⬇️ Đang tải {file_name}...")
-            urllib.request.urlretrieve(url, file_path, reporthook=self._show_download_progress)
-            Utility.wait_time(2)
-            
-            if file_path.exists():
-                if file_path.stat().st_size > 0:
-                    print(f"✅ Tải {file_name} thành công")
-                    return file_path
-                else:
-                    print(f"❌ File tải bị lỗi ({size} bytes). Xóa file...")
-                    file_path.unlink(missing_ok=True)
+            total, ranged = self._probe(session, url)
+
+            if ranged and total > 0:
+                count = max(1, min(self._connections, -(-total // self._PART_SIZE_MIN)))
+                step = -(-total // count)
+                ranges = [(i * step, min(total, (i + 1) * step) - 1) for i in range(count)]
             else:
-                print(f"❌ Không tìm thấy {file_path} đã tải...")
+                ranges = [(0, None)]
+
+            # Bố cục đoạn khác lần trước (đổi URL/kích thước) → bỏ các đoạn cũ
+            meta = {'url': url, 'total': total, 'ranges': ranges}
+            old_meta = None
+            if meta_path.exists():
+                try:
+                    old_meta = json.loads(meta_path.read_text(encoding='utf-8'))
+                except Exception:
+                    old_meta = None
+            part_paths = [self._download_dir / f'{file_name}.part{i}' for i in range(len(ranges))]
+            if old_meta != json.loads(json.dumps(meta)):
+                for old_part in self._download_dir.glob(f'{file_name}.part*'):
+                    old_part.unlink(missing_ok=True)
+                meta_path.write_text(json.dumps(meta), encoding='utf-8')
+
+            lock = threading.Lock()
+            downloaded = [sum(p.stat().st_size for p in part_paths if p.exists()) if ranged else 0]
+            shown = [-1]
+
+            def progress(size: int):
+                with lock:
+                    downloaded[0] += size
+                    percent = downloaded[0] * 100 // total if total else 0
+                    if percent != shown[0]:
+                        shown[0] = percent
+                        self._show_download_progress(downloaded[0], total)
+
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(self._download_part, session, url, part_path, start, end, progress)
+                           for part_path, (start, end) in zip(part_paths, ranges)]
+                for future in futures:
+                    future.result()
+            print()
+
+            # Ghép các đoạn, đồng thời tính SHA-256
+            digest = hashlib.sha256()
+            tmp_path = self._download_dir / f'{file_name}.tmp{os.getpid()}'
+            with open(tmp_path, 'wb') as out:
+                for part_path in part_paths:
+                    with open(part_path, 'rb') as f:
+                        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                            digest.update(chunk)
+                            out.write(chunk)
+
+            if total and tmp_path.stat().st_size != total:
+                print(f"❌ File tải bị lỗi ({tmp_path.stat().st_size}/{total} bytes). Xóa file...")
+                tmp_path.unlink(missing_ok=True)
+                for part_path in part_paths:
+                    part_path.unlink(missing_ok=True)
+                return None
+
+            if sha256 and digest.hexdigest() != sha256:
+                print(f"❌ Sai SHA-256: {digest.hexdigest()} (mong đợi {sha256}). Xóa file...")
+                tmp_path.unlink(missing_ok=True)
+                for part_path in part_paths:
+                    part_path.unlink(missing_ok=True)
+                return None
+
+            os.replace(tmp_path, file_path)
+            for part_path in part_paths:
+                part_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            print(f"✅ Tải {file_name} thành công")
+            return file_path
 
         except Exception as e:
-            print(f"❌ Lỗi quá trình tải: {e}")
-        
+            print(f"\n❌ Lỗi quá trình tải (chạy lại để tải tiếp): {e}")
+        finally:
+            session.close()
+
         return None
-    
-    def _delete_file(self, file_path: Path):
+
+    @staticmethod
+    def _extract_zip(file_path: Path, dest: Path):
+        """
+        Giải nén `.zip`, giữ nguyên quyền thực thi và symlink (cần cho bản Linux/macOS).
         """
-        Xóa một tệp nếu tồn tại.
+        dest_root = dest.resolve()
+        with zipfile.ZipFile(file_path) as zf:
+            for info in zf.infolist():
+                target = (dest / info.filename).resolve()
+                if dest_root != target and dest_root not in target.parents:
+                    raise ValueError(f'Đường dẫn không hợp lệ trong file nén: {info.filename}')
+
+                mode = info.external_attr >> 16
+                if stat.S_ISLNK(mode):
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    os.symlink(zf.read(info).decode('utf-8'), target)
+                    continue
+
+                zf.extract(info, dest)
+                if mode and not info.is_dir():
+                    os.chmod(target, stat.S_IMODE(mode))
 
-        Args:
-            file_path (Path): Đường dẫn đến tệp cần xóa.
+    @staticmethod
+    def _extract_tar(file_path: Path, dest: Path):
+        with tarfile.open(file_path) as tf:
+            if hasattr(tarfile, 'data_filter'):
+                tf.extractall(dest, filter='data')
+            else:
+                tf.extractall(dest)
 
-        Returns:
-            bool: True nếu xóa thành công, False nếu thất bại.
+    def _extract_7z_with_7zr(self, file_path: Path, dest: Path):
         """
-        if file_path.exists() and file_path.is_file():
-            try:
-                file_path.unlink()
-                return True
-            except Exception as e:
-                print(f"❌ Không thể xóa file {file_path}: {e}")
-        else:
-            print(f"⚠️ File không tồn tại: {file_path}")
-        return False
-
-    def _extract_7z_with_7zr(self, file_path: Path | None, tool_extract: Path | None)-> Path | None:
+        Giải nén tệp `.7z` bằng công cụ `7zr.exe` (chỉ hỗ trợ Windows).
         """
-        Giải nén tệp `.7z` bằng công cụ `7zr.exe`, và tìm thư mục mới được tạo sau khi giải nén.
-
-        Args:
-            file_path (Path): Đường dẫn đến file `.7z`.
-            tool_extract (Path): Đường dẫn đến `7zr.exe`.
+        tool_extract = self._download_file('7zr.exe', self._EXE_URL)
+        if not tool_extract:
+            raise RuntimeError('Không tải được 7zr.exe')
+
+        result = subprocess.run(
+            [str(tool_extract), 'x', str(file_path), f'-o{dest}', '-y'],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
+
+    def _find_binary(self, root: Path) -> Path | None:
+        for path in sorted(root.rglob(self._binary), key=lambda p: len(p.parts)):
+            if path.is_file():
+                return path
+        return None
 
-        Returns:
-            Path | None: Trả về thư mục mới được giải nén, hoặc None nếu thất bại.
+    def _installed_binary(self) -> Path | None:
+        """
+        Kiểm tra bản cài đặt trong cache (không cần mạng) dựa trên manifest.
+        Bản cài có SHA-256 khác với mã được ghim sẽ bị bỏ qua.
         """
-        before_folders = set(f.name for f in self._DOWLOAD_PATH.iterdir() if f.is_dir())
+        manifest_path = self._target_dir / self._MANIFEST
+        if not manifest_path.exists():
+            return None
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        except Exception:
+            return None
+        if self._sha256 and manifest.get('sha256') != self._sha256:
+            return None
+        binary_path = self._target_dir / manifest.get('binary', '')
+        return binary_path if binary_path.is_file() else None
 
-        timeout = time.time()+10
-        if not (tool_extract and file_path):
-            if not tool_extract:
-               print(f"❌ tool_extract không thể là None")
-            if not file_path:
-               print(f"❌ file_path không thể là None") 
+    def _install(self) -> Path | None:
+        """
+        Tải, giải nén vào thư mục tạm rồi đổi tên nguyên tử thành thư mục phiên bản.
+        """
+        archive_name = Path(urllib.parse.urlparse(self._url).path).name or f'{self._version}.zip'
+        archive_path = self._download_file(archive_name, self._url, self._sha256)
+        if not archive_path:
             return None
-        
-        while True:
-            if tool_extract and tool_extract.exists():
-                if file_path and file_path.exists() and (file_path.stat().st_size / (1024 *1024) > 100):
-                    break
-            if timeout - time.time() < 0:
-                print(f'Lỗi không tìm thấy đủ 2 file: {self._FILE_CHROMIUM} (>100M) - {self._FILE_EXE} (500k)')
-                return None
-            Utility.wait_time(1)
 
+        staging_dir = Path(tempfile.mkdtemp(prefix=f'.staging-{self._target_dir.name}-', dir=self._cache_dir))
         try:
-            result = subprocess.run(
-                [str(tool_extract), 'x', str(file_path), f'-o{self._DOWLOAD_PATH}', '-y'],
-                capture_output=True, text=True
-            )
-        except Exception as e:
-            Utility._logger(f'Lỗi giải nén file: {e}')
-            return None
-        
-        if result.returncode == 0:
-            print("✅ Giải nén hoàn tất.")
-            self._delete_file(file_path)
-            self._delete_file(tool_extract)
-            after_folders = set(f.name for f in self._DOWLOAD_PATH.iterdir() if f.is_dir())
-            new_folders = list(after_folders - before_folders)
-            if new_folders:
-                for name in new_folders:
-                    if "ungoogled" in name.lower():
-                        return self._DOWLOAD_PATH / name
-                return self._DOWLOAD_PATH / new_folders[0]
+            # mkdtemp tạo thư mục 0700, mở quyền đọc để mọi user trên máy dùng chung
+            staging_dir.chmod(0o755)
+            print(f"📦 Đang giải nén {archive_name}...")
+            name = archive_name.lower()
+            if name.endswith('.zip'):
+                self._extract_zip(archive_path, staging_dir)
+            elif name.endswith('.7z'):
+                self._extract_7z_with_7zr(archive_path, staging_dir)
+            elif tarfile.is_tarfile(archive_path):
+                self._extract_tar(archive_path, staging_dir)
             else:
-                print("⚠️ Không tìm thấy thư mục mới.")
+                print(f"❌ Không hỗ trợ định dạng {archive_name}")
                 return None
-        else:
-            print(f"❌ Giải nén lỗi: {result.stderr}")
+
+            binary_path = self._find_binary(staging_dir)
+            if not binary_path:
+                print(f"❌ Không tìm thấy {self._binary} trong {archive_name}")
+                return None
+
+            manifest = {
+                'version': self._version,
+                'url': self._url,
+                'sha256': self._sha256 or self._sha256_file(archive_path),
+                'binary': binary_path.relative_to(staging_dir).as_posix(),
+                'installed_at': int(time.time()),
+            }
+            (staging_dir / self._MANIFEST).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+
+            if self._target_dir.exists():
+                shutil.rmtree(self._target_dir, ignore_errors=True)
+            os.rename(staging_dir, self._target_dir)
+            archive_path.unlink(missing_ok=True)
+
+            print("✅ Giải nén hoàn tất.")
+            return self._target_dir / manifest['binary']
+
+        except Exception as e:
+            print(f"❌ Giải nén lỗi: {e}")
             return None
-    
+        finally:
+            if staging_dir.exists():
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
     def _setup(self) -> Path | None:
         """
         Hàm chính để thiết lập trình duyệt Chromium:
-        - Tạo thư mục tải nếu chưa có
-        - Kiểm tra nếu thư mục đích đã tồn tại thì bỏ qua
-        - Nếu chưa có, tải xuống và giải nén
-        - Đổi tên thư mục giải nén thành thư mục đích
+        - Nếu thư mục phiên bản đã được cài (có manifest) thì dùng luôn
+        - Nếu chưa có, giành khóa cài đặt (FileLock), tải xuống, kiểm tra SHA-256 và giải nén
+        - Đổi tên nguyên tử thư mục tạm thành thư mục phiên bản
 
         Returns:
-            Path | None: Trả về path chrome.exe, hoặc None nếu thất bại.
+            Path | None: Trả về path file thực thi chrome, hoặc None nếu thất bại.
         """
-        self._DOWLOAD_PATH.mkdir(parents=True, exist_ok=True)
+        installed = self._installed_binary()
+        if installed:
+            return installed
 
-        target_dir = self._DOWLOAD_PATH / self._TARGET_FOLDER_NAME
-        target_chromium = target_dir / 'chrome.exe'
+        # Bản cài cũ (chromium142/chrome.exe) của các phiên bản trước
+        legacy_chromium = self._cache_dir / 'chromium142' / 'chrome.exe'
+        if self._platform == 'win64' and not self._sha256 and legacy_chromium.exists():
+            return legacy_chromium
 
-        if target_chromium.exists():
-            return target_chromium
-        else:
-            chromium_path = self._download_file(self._FILE_CHROMIUM, self._CHROMIUM_URL)
-            exe_path = self._download_file(self._FILE_EXE, self._EXE_URL)
-            if chromium_path and exe_path:
-                extracted_folder = self._extract_7z_with_7zr(chromium_path, exe_path)
-                if extracted_folder:
-                    extracted_chromium = extracted_folder / 'chrome.exe'
-                    if (extracted_chromium).exists():
-                        extracted_folder.rename(target_dir)
-                        if target_chromium.exists():
-                            print(f"✅ Phiên bản chromium lưu tại: {target_dir}")
-                            return target_chromium
-                        else:
-                            print(f"❌ Không tìm thấy {target_chromium}")
-                    else:
-                        print(f"❌ Không tìm thấy {extracted_chromium}")
-                else:
-                    print(f"❌ Không tìm thấy {extracted_folder}")
-            else:
-                print(f"❌ Không thể thực hiện giải nén vì thiếu file.")
-            
-        return None
-  
\ No newline at end of file
+        if not self._url:
+            print(f"❌ Không có nguồn Chromium cho hệ điều hành {self._platform}")
+            return None
+
+        # Khóa cài đặt giữa các tool cùng chạy trên máy, tự nhả nếu tool giữ khóa bị crash
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            install_lock = FileLock(self._cache_dir / f'{self._target_dir.name}.lock')
+            if not install_lock.acquire():
+                print(f"⏳ Tool khác đang cài Chromium, chờ...")
+                if not install_lock.acquire(timeout=1800, poll=1):
+                    print(f"❌ Chờ quá lâu nhưng {install_lock.path} vẫn bị khóa.")
+                    return None
+        except Exception as e:
+            print(f"❌ Không thể khóa thư mục cache {self._cache_dir}: {e}")
+            return None
+
+        try:
+            # Tool khác có thể vừa cài xong trước khi giành được khóa
+            installed = self._installed_binary()
+            if installed:
+                return installed
+
+            chromium_path = self._install()
+            if chromium_path:
+                print(f"✅ Phiên bản chromium lưu tại: {self._target_dir}")
+            return chromium_path
+        finally:
+            install_lock.release()
@@ -0,0 +1,133 @@
+import time
+import random
+import threading
+
+class Clock:
+    '''
+    Đồng hồ dùng cho mọi khoảng chờ của BrowserKit (`Utility.wait_time`, `Utility.timeout`, `Node`, `BrowserManager`).
+
+    Args:
+        speed (float, optional): Hệ số thời gian ngủ. 1 = bình thường, 0.5 = nhanh gấp đôi, 0 = không ngủ.
+            Chỉ áp dụng cho các khoảng chờ "giả lập người dùng", không rút ngắn timeout chờ trang/phần tử.
+        distribution (str, optional): Phân phối dao động khi `wait(..., fix=False)`:
+            - 'uniform': đều trong [1 - gap, 1 + gap] (mặc định).
+            - 'normal': chuẩn quanh 1 (độ lệch gap/2), cắt trong [1 - gap, 1 + gap].
+            - 'lognormal': lệch phải như thời gian phản xạ của người (trung vị 1), tối đa 1 + 2*gap.
+            - 'none': không dao động.
+        gap (float, optional): Biên độ dao động. Mặc định 0.4 (±40%).
+        seed (int, optional): Seed cho bộ sinh ngẫu nhiên (tái lập được kết quả khi test).
+    '''
+    DISTRIBUTIONS = ('uniform', 'normal', 'lognormal', 'none')
+
+    def __init__(self, speed: float = 1.0, distribution: str = 'uniform', gap: float = 0.4, seed: int | None = None) -> None:
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f'distribution phải thuộc {self.DISTRIBUTIONS}')
+        self.speed = max(0.0, float(speed))
+        self.distribution = distribution
+        self.gap = gap
+        self._random = random.Random(seed)
+        self._local = threading.local()
+
+    def now(self) -> float:
+        '''Thời điểm hiện tại (giây, đơn điệu tăng) dùng để đo khoảng thời gian.'''
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        '''Ngủ `seconds` giây (đã nhân `speed`).'''
+        seconds = seconds * self.speed
+        if seconds > 0:
+            time.sleep(seconds)
+            self._local.slept = self.thread_slept() + seconds
+
+    def poll(self, seconds: float):
+        '''
+        Chờ `seconds` giây giữa hai lần kiểm tra lại (poll) một điều kiện: KHÔNG nhân `speed`, không tính vào `thread_slept`.
+
+        `speed` chỉ dành cho nhịp người dùng; với `speed=0` các vòng poll vẫn giữ nhịp thật thay vì quay vòng
+        liên tục và dồn lệnh vào chromedriver/file lock.
+        '''
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def thread_slept(self) -> float:
+        '''Tổng số giây thread hiện tại đã ngủ qua đồng hồ này (dùng để tách thời gian ngủ khỏi thời gian chờ trang).'''
+        return getattr(self._local, 'slept', 0.0)
+
+    def jitter(self, seconds: float, gap: float | None = None) -> float:
+        '''Trả về `seconds` đã dao động theo `distribution`.'''
+        gap = self.gap if gap is None else gap
+        if seconds <= 0 or gap <= 0 or self.distribution == 'none':
+            return seconds
+
+        if self.distribution == 'normal':
+            factor = min(max(self._random.gauss(1, gap / 2), 1 - gap), 1 + gap)
+        elif self.distribution == 'lognormal':
+            factor = min(self._random.lognormvariate(0, gap / 2), 1 + 2 * gap)
+        else:
+            factor = self._random.uniform(1 - gap, 1 + gap)
+        return seconds * factor
+
+    def wait(self, seconds: float, fix: bool = False) -> float:
+        '''
+        Ngủ `seconds` giây, có dao động nếu `fix=False`.
+
+        Returns:
+            float: Số giây đã chờ (trước khi nhân `speed`).
+        '''
+        seconds = seconds if fix else self.jitter(seconds)
+        self.sleep(seconds)
+        return seconds
+
+class VirtualClock(Clock):
+    '''
+    Đồng hồ ảo: `sleep` không chờ thật mà chỉ cộng thời gian, `now` trả về thời gian ảo.
+
+    Dùng để chạy/đo logic lập lịch và Node (mọi khoảng chờ đi qua `Utility`) mà không tốn thời gian thực.
+
+    Ví dụ:
+        clock = VirtualClock(seed=1)
+        set_clock(clock)
+        ...
+        print(clock.slept)  # tổng số giây "đã ngủ"
+    '''
+    def __init__(self, start: float = 0.0, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._now = start
+        self.slept = 0.0
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        with self._lock:
+            return self._now
+
+    def advance(self, seconds: float):
+        '''Tiến đồng hồ ảo thêm `seconds` giây.'''
+        with self._lock:
+            self._now += max(0.0, seconds)
+
+    def sleep(self, seconds: float):
+        seconds = max(0.0, seconds * self.speed)
+        with self._lock:
+            self._now += seconds
+            self.slept += seconds
+        self._local.slept = self.thread_slept() + seconds
+
+    def poll(self, seconds: float):
+        self.advance(seconds)
+
+_clock = Clock()
+
+def get_clock() -> Clock:
+    '''Đồng hồ đang dùng chung cho toàn bộ BrowserKit.'''
+    return _clock
+
+def set_clock(clock: Clock) -> Clock:
+    '''
+    Thay đồng hồ dùng chung (ví dụ `VirtualClock` khi test, hoặc `Clock(speed=0.2)` khi không cần nhịp người dùng).
+
+    Returns:
+        Clock: Đồng hồ cũ (để khôi phục lại).
+    '''
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
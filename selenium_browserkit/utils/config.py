@@ -0,0 +1,118 @@
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .core import Utility, DIR_PATH
+
+@dataclass(frozen=True)
+class Config:
+    '''
+    Nội dung `config.txt` đã phân tích (mỗi dòng `KEY=value`, bỏ qua dòng trống/chú thích `#`).
+
+    - Khóa so khớp chính xác (`PROXY` không khớp `PROXY_X`), một khóa có thể lặp nhiều dòng.
+    - Dòng có giá trị rỗng (`AI_BOT=`) bị bỏ qua.
+    - Đọc qua `load_config()`: chỉ phân tích lại khi file thay đổi (mtime/kích thước).
+    '''
+    entries: dict[str, list[str]] = field(default_factory=dict)
+    version: tuple[int, int] = (0, 0)
+
+    @classmethod
+    def parse(cls, text: str, version: tuple[int, int] = (0, 0)) -> 'Config':
+        entries: dict[str, list[str]] = {}
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            value = value.strip()
+            if value:
+                entries.setdefault(key.strip(), []).append(value)
+        return cls(entries, version)
+
+    def get(self, key: str) -> list[str]:
+        '''Mọi giá trị của `key` theo thứ tự trong file (danh sách rỗng nếu không có).'''
+        return list(self.entries.get(key, []))
+
+    def first(self, *keys: str) -> str | None:
+        '''Giá trị đầu tiên của khóa đầu tiên có trong file.'''
+        for key in keys:
+            if self.entries.get(key):
+                return self.entries[key][0]
+        return None
+
+    def _number(self, cast, *keys: str):
+        value = self.first(*keys)
+        if value is None:
+            return None
+        try:
+            return cast(value)
+        except ValueError:
+            return None
+
+    @property
+    def max_profiles(self) -> int | None:
+        '''MAX_PROFLIES (chấp nhận cả MAX_PROFILES): số profile chạy đồng thời. None nếu không có/không hợp lệ.'''
+        value = self._number(int, 'MAX_PROFLIES', 'MAX_PROFILES')
+        return value if value and value > 0 else None
+
+    @property
+    def delay_profiles(self) -> float | None:
+        '''DELAY_PROFILES: số giây chờ giữa hai lần mở profile trong chế độ auto.'''
+        value = self._number(float, 'DELAY_PROFILES')
+        return value if value is not None and value >= 0 else None
+
+    @property
+    def user_data_dir(self) -> Path | None:
+        value = self.first('USER_DATA_DIR')
+        return Path(value) if value else None
+
+    @property
+    def python_path(self) -> str | None:
+        return self.first('PYTHON_PATH')
+
+    @property
+    def proxies(self) -> list[str]:
+        return self.get('PROXY')
+
+    @property
+    def tele_bots(self) -> list[str]:
+        return self.get('TELE_BOT')
+
+    @property
+    def ai_bots(self) -> list[str]:
+        return self.get('AI_BOT')
+
+_cache: dict[Path, Config] = {}
+_lock = threading.Lock()
+
+def load_config(path: str | Path | None = None) -> Config | None:
+    '''
+    Đọc `config.txt` (mặc định trong thư mục tool), dùng lại kết quả đã phân tích nếu file không đổi.
+
+    Chỉ tốn một lệnh `stat` khi file không đổi → gọi thường xuyên được (ví dụ mỗi vòng lặp của `_run_multi` để nạp lại cấu hình).
+
+    Returns:
+        Config | None: None nếu file không tồn tại hoặc đọc lỗi.
+    '''
+    path = Path(path) if path else DIR_PATH / 'config.txt'
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        config = _cache.get(path)
+        if config is not None and config.version == version:
+            return config
+
+    try:
+        text = path.read_text(encoding='utf-8')
+    except Exception as e:
+        Utility._logger(message=f'Lỗi khi đọc tệp {path}: {e}')
+        return None
+
+    config = Config.parse(text, version)
+    with _lock:
+        _cache[path] = config
+    return config
@@ -1,10 +1,7 @@
-import time
-import psutil
-import random
-import inspect
 import re
 import os
 import sys
+import logging
 import pathlib
 
 from pathlib import Path
@@ -12,6 +9,9 @@ from typing import List, Optional
 
 import requests
 
+from .clock import get_clock
+from .logger import backend as log_backend
+
 DIR_PATH = Path(sys.argv[0]).resolve().parent
 
 class Utility:
@@ -19,11 +19,14 @@ class Utility:
     @staticmethod
     def wait_time(second: float = 5, fix: bool = False) -> None:
         '''
-        Đợi trong một khoảng thời gian nhất định.  Với giá trị dao động từ -50% đên 50%
+        Đợi trong một khoảng thời gian nhất định. Với giá trị dao động ±40% (theo phân phối của đồng hồ hiện tại)
 
         Args:
             seconds (int) = 2: Số giây cần đợi.
             fix (bool) = False: False sẽ random, True không random
+
+        Ghi chú:
+            - Thời gian chờ thực tế còn nhân với `speed` của đồng hồ (xem `clock.set_clock`).
         '''
         try:
             sec = float(second)
@@ -33,11 +36,7 @@ class Utility:
             Utility._logger('SYS', f'⏰ Giá trị second không hợp lệ ({second}), dùng mặc định 5s')
             sec = 5.0
 
-        if not fix:
-            gap = 0.4
-            sec = random.uniform(sec * (1 - gap), sec * (1 + gap))
-
-        time.sleep(second)
+        get_clock().wait(sec, fix)
 
     @staticmethod
     def timeout(second: int = 5):
@@ -57,10 +56,11 @@ class Utility:
         Cách dùng:
             check_timeout = timeout(5) while check_timeout(): ...
         """
-        start_time = time.time()
+        clock = get_clock()
+        start_time = clock.now()
         
         def checker():
-            return time.time() - start_time < second
+            return clock.now() - start_time < second
         
         return checker
         
@@ -74,7 +74,7 @@ class Utility:
         return re.sub(r'[^a-zA-Z0-9_\-]', '_', text)
     
     @staticmethod
-    def _logger(profile_name: str = 'System', message: str = 'Chưa có mô tả nhật ký', show_log: bool = True):
+    def _logger(profile_name: str = 'System', message: str = 'Chưa có mô tả nhật ký', show_log: bool = True, level: int | None = None):
         '''
         Ghi và hiển thị thông báo nhật ký (log)
         
@@ -85,10 +85,24 @@ class Utility:
             profile_name (str): tên hồ sơ hiện tại
             message (str): Nội dung thông báo log.
             show_log (bool, option): cho phép hiển thị nhật ký hay không. Mặc định: True (cho phép)
+                show_log=False được ghi ở level DEBUG (mặc định bị lọc bỏ, bật bằng `Utility.configure_logging(level='DEBUG')`).
+            level (int, optional): Level logging cụ thể (logging.INFO, logging.WARNING, ...). Ghi đè `show_log`.
         '''
-        if show_log:
-            func_name = inspect.stack()[2].function
-            print(f'[{profile_name}][{func_name}]: {message}')
+        if level is None:
+            level = logging.INFO if show_log else logging.DEBUG
+        log_backend.log(level, profile_name, message, depth=2)
+
+    @staticmethod
+    def configure_logging(level: int | str = 'INFO', console: bool = True, log_dir: str | Path | None = DIR_PATH / 'logs',
+                          max_bytes: int = 1_000_000, backup_count: int = 3):
+        '''
+        Cấu hình nhật ký: level tối thiểu, ghi console, thư mục file log theo profile (JSON lines, xoay vòng theo dung lượng).
+
+        Ví dụ:
+            Utility.configure_logging(level='DEBUG')            # hiện cả log show_log=False
+            Utility.configure_logging(log_dir=None)             # không ghi file
+        '''
+        log_backend.configure(level=level, console=console, log_dir=log_dir, max_bytes=max_bytes, backup_count=backup_count)
     
     @staticmethod
     def _print_section(title: str, icon: str = "🔔"):
@@ -282,166 +296,11 @@ class Utility:
                 - None nếu tệp không tồn tại hoặc gặp lỗi khi đọc.
         
         Ghi chú:
-            - Nếu tệp không tồn tại, sẽ ghi log và trả về None.
-            - Nếu dòng không hợp lệ (ít hơn 2 phần tử), sẽ ghi cảnh báo nhưng bỏ qua dòng đó.
-        """
-        config_path = DIR_PATH / 'config.txt'
-        results = []
-
-        if not config_path.exists():
-            return None
-    
-        try:
-            with open(config_path, 'r',encoding='utf-8') as file:
-                data = file.readlines()
-            for line in data:
-                if line.strip().startswith(keyname):
-                    parts = line.strip().split('=', 1)
-                    if len(parts) >= 2 and parts[-1]:
-                        results.append(parts[-1].strip())
-            
-            return results
-        
-        except Exception as e:
-            Utility._logger(message=f'Lỗi khi đọc tệp {config_path}: {e}')
-            return None
-
-    @staticmethod
-    def _wait_until_profile_free(profile_name: str, lock_path: Path, timeout: int = 60):
-        """
-        Chờ cho đến khi profile được giải phóng (file lock không còn tồn tại).
-
-        Args:
-            lock_path (str): Đường dẫn đến file lock.
-            timeout (int, optional): Thời gian chờ tối đa (giây). Mặc định là 60.
-
-        Raises:
-            TimeoutError: Nếu vượt quá thời gian chờ mà profile vẫn bị khóa.
-        """
-        # Cần kiểm tra có tồn tại chrome quá trình không?
-        # Kiểm tra nếu file lock tồn tại quá 12h thì xóa file
-        if os.path.exists(lock_path):
-            try:
-                print(f'🔍 Kiểm tra trạng thái 🗝️ [{profile_name}.lock]')
-                ctime = os.path.getctime(lock_path)
-                now = time.time()
-                # Xóa lock, nếu đã tồn tại hơn 12 tiếng
-                if now - ctime > 43200:  # 12h = 43200 giây
-                    os.remove(lock_path)
-            except Exception:
-                raise 
-
-        start_time = time.time()
-        while os.path.exists(lock_path):
-            if time.time() - start_time > timeout:
-                raise TimeoutError(f"Chờ quá {timeout}s nhưng [profile {profile_name}] vẫn bị khóa.")
-            Utility.wait_time(10, True)
-            print(f"🔒 Profile [{profile_name}] đang bận, chờ...")
-    
-    @staticmethod
-    def _is_process_alive(pid: int) -> bool:
-        try:
-            pid = int(pid)
-            process = psutil.Process(pid)
-            return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
-        except psutil.NoSuchProcess:
-            return False
-        except Exception as e:
-            print(f"Lỗi khi kiểm tra process {pid}: {e}")
-            return False
-    
-    @staticmethod
-    def _read_lock(path_lock: Path):
-        """
-        Đọc file lock và trả về dict chứa các cặp key=value.
-
-        Args:
-            path_lock (Path): Đường dẫn tới file lock.
-
-        Returns:
-            dict[str, str] | None: Dict dữ liệu từ file lock, 
-                                   hoặc None nếu không tồn tại / lỗi.
+            - Khóa so khớp chính xác (`PROXY` không khớp `PROXY_X`); dòng chú thích `#` và dòng giá trị rỗng bị bỏ qua.
+            - File chỉ được đọc lại khi thay đổi (xem `utils.config.load_config`), gọi nhiều lần không tốn I/O.
         """
-        try:
-            if not path_lock.exists():
-                return None
-
-            result = {}
-            with open(path_lock, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or "=" not in line:
-                        continue
-                    k, v = line.split("=", 1)
-                    result[k.strip().upper()] = v.strip()
-
-            return result if result else None
-        except Exception as e:
-            print(f"Lỗi khi đọc lock file {path_lock}: {e}")
+        from .config import load_config
+        config = load_config()
+        if config is None:
             return None
-    
-    @staticmethod
-    def _kill_chrome(chrome_pid):
-        """
-        Kill Chrome process theo PID.
-
-        Args:
-            chrome_pid (int): PID của process Chrome.
-
-        Returns:
-            bool: True nếu kill thành công, False nếu thất bại hoặc không tìm thấy.
-        """
-        if not chrome_pid:
-            return False
-
-        try:
-            chrome_pid = int(chrome_pid)
-            proc = psutil.Process(chrome_pid)
-            # Kill tất cả process con trước (tránh orphan)
-            for child in proc.children(recursive=True):
-                try:
-                    child.kill()
-                except Exception as e:
-                    print(f"Lỗi khi kill child {child.pid}: {e}")
-            proc.kill()
-            return True
-        except psutil.NoSuchProcess:
-            # Chrome PID không tồn tại.
-            return True
-        except Exception as e:
-            print(f"Lỗi khi kill Chrome PID {chrome_pid}: {e}")
-            return False
-    
-    @staticmethod
-    def _remove_lock(lock_path: str):
-        """
-        Xóa file lock để giải phóng profile.
-
-        Args:
-            lock_path (str): Đường dẫn đến file lock cần xóa.
-        """
-        if os.path.exists(lock_path):
-            try:
-                os.remove(lock_path)
-            except Exception as e:
-                print(f"Lỗi khi xóa lock file {lock_path}: {e}")
-
-    @staticmethod
-    def _pid_python(tmp_path: Path):
-        tmp_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(tmp_path, "w") as f:
-            f.write(f"TOOL={Utility._sanitize_text(DIR_PATH.name)}\n")
-
-    @staticmethod
-    def _lock_profile(lock_path: Path, chrome_pid: str ):
-        """
-        Tạo file lock để khóa profile.
-
-        Args:
-            lock_path (str): Đường dẫn đến file lock cần tạo.
-        """
-        lock_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(lock_path, "w", encoding="utf-8") as f:
-            f.write(f"CHROMEPID={chrome_pid}\n")
-            f.write(f"TOOL={Utility._sanitize_text(DIR_PATH.name)}\n")
-            f.write(f"PYTHONPID={os.getpid()}\n")
\ No newline at end of file
+        return config.get(keyname)
@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from selenium.webdriver.remote.webelement import WebElement
+
+class CacheEntry(NamedTuple):
+    elements: list[WebElement]
+    page_id: str
+    generation: int
+
+class ElementCache:
+    '''
+    Cache kết quả tìm phần tử của `Node`, khóa theo (by, value, id của phần tử cha, tìm một/tìm tất cả).
+
+    - Mỗi entry ghi lại "thế hệ" DOM lúc tìm: `page_id` (đổi khi tải trang mới) và `generation`
+      (bộ đếm tăng khi MutationObserver thấy DOM thay đổi cấu trúc/thuộc tính, xem `scripts.DOM_GENERATION`).
+    - Không kiểm tra trước: chỉ khi dùng lại entry mới so thế hệ hiện tại của trang (một lần `execute_script`).
+    - Giới hạn `max_size` entry, bỏ entry ít dùng nhất (LRU).
+    '''
+    def __init__(self, max_size: int = 128) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(by: str, value: str, parent_element: WebElement | None = None, many: bool = False) -> tuple:
+        return (by, value, parent_element.id if parent_element is not None else None, many)
+
+    def get(self, key: tuple, page_id: str, generation: int) -> list[WebElement] | None:
+        '''Trả về các phần tử đã cache nếu trang vẫn ở đúng thế hệ lúc cache, ngược lại xóa entry và trả về None.'''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.page_id != page_id or entry.generation != generation:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.elements
+
+    def put(self, key: tuple, elements: list[WebElement], page_id: str, generation: int):
+        with self._lock:
+            self._entries[key] = CacheEntry(list(elements), page_id, generation)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,116 @@
+import os
+from pathlib import Path
+
+from .core import Utility
+from .clock import get_clock
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+class FileLock:
+    """
+    Khóa độc quyền dựa trên advisory lock của hệ điều hành (`flock` trên Linux/macOS, `msvcrt.locking` trên Windows).
+
+    - Khóa gắn với file descriptor đang mở nên được kernel tự giải phóng khi tiến trình chết (crash, kill, tắt máy đột ngột),
+      không còn tình trạng file lock "mồ côi" cần dọn bằng thời gian hay dò PID.
+    - Có thể kiểm tra bận/rảnh bằng try-lock không chặn (`FileLock.is_locked`).
+
+    Cách dùng:
+        lock = FileLock(user_data_dir / 'profile_1.lock')
+        if lock.acquire():
+            try: ...
+            finally: lock.release()
+    """
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._fd: int | None = None
+
+    @property
+    def locked(self) -> bool:
+        """True nếu đối tượng này đang giữ khóa."""
+        return self._fd is not None
+
+    @staticmethod
+    def _try_lock(fd: int) -> bool:
+        try:
+            if os.name == 'nt':
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _unlock(fd: int):
+        if os.name == 'nt':
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def acquire(self, timeout: float = 0, poll: float = 0.5) -> bool:
+        """
+        Giành khóa.
+
+        Args:
+            timeout (float, optional): Số giây chờ tối đa. Mặc định 0 (thử một lần, không chặn).
+            poll (float, optional): Khoảng thời gian giữa các lần thử khi `timeout > 0`.
+
+        Returns:
+            bool: True nếu giành được khóa, False nếu file đang bị tiến trình khác khóa.
+        """
+        if self._fd is not None:
+            return True
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        check_timeout = Utility.timeout(timeout)
+        while not self._try_lock(fd):
+            if not check_timeout():
+                os.close(fd)
+                return False
+            get_clock().poll(poll)
+
+        self._fd = fd
+        return True
+
+    def release(self):
+        """Trả khóa (an toàn khi gọi nhiều lần)."""
+        if self._fd is None:
+            return
+        try:
+            self._unlock(self._fd)
+        except OSError:
+            pass
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    @staticmethod
+    def is_locked(path: str | Path) -> bool:
+        """
+        Kiểm tra nhanh file có đang bị khóa bởi ai đó (kể cả chính tiến trình này qua đối tượng khác) hay không.
+        """
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            return False
+        try:
+            if FileLock._try_lock(fd):
+                FileLock._unlock(fd)
+                return False
+            return True
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        if not self.acquire():
+            raise TimeoutError(f'{self.path} đang bị khóa.')
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -0,0 +1,165 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+LOGGER_NAME = 'selenium_browserkit'
+
+class _ConsoleFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return f'[{record.profile}][{record.caller}]: {record.getMessage()}'
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'profile': record.profile,
+            'func': record.caller,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }, ensure_ascii=False)
+
+class ProfileFileHandler(logging.Handler):
+    '''
+    Ghi mỗi profile ra một file riêng `<log_dir>/<profile>.log` (JSON lines), tự xoay vòng theo dung lượng.
+
+    Chỉ giữ mở tối đa `max_open` file cùng lúc (đóng file ít dùng nhất) để không cạn file descriptor khi có nhiều profile.
+    '''
+    def __init__(self, log_dir: Path, max_bytes: int = 1_000_000, backup_count: int = 3, max_open: int = 32) -> None:
+        super().__init__()
+        self.log_dir = Path(log_dir)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.max_open = max_open
+        self._handlers: OrderedDict[str, RotatingFileHandler] = OrderedDict()
+        self.setFormatter(_JsonFormatter())
+
+    def _handler_for(self, profile: str) -> RotatingFileHandler:
+        handler = self._handlers.get(profile)
+        if handler is None:
+            from .core import Utility
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                self.log_dir / f'{Utility._sanitize_text(profile)}.log',
+                maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8', delay=True)
+            handler.setFormatter(self.formatter)
+            self._handlers[profile] = handler
+            while len(self._handlers) > self.max_open:
+                _, oldest = self._handlers.popitem(last=False)
+                oldest.close()
+        else:
+            self._handlers.move_to_end(profile)
+        return handler
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._handler_for(record.profile).emit(record)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
+class LogBackend:
+    '''
+    Backend nhật ký của BrowserKit.
+
+    - Lọc theo level TRƯỚC khi tra tên hàm gọi hay định dạng chuỗi → log bị tắt gần như không tốn chi phí.
+    - Tên hàm gọi lấy bằng `sys._getframe` (không dựng lại cả call stack như `inspect.stack()`).
+    - Các thread chỉ đẩy record vào hàng đợi (`QueueHandler`); một thread nền (`QueueListener`) ghi ra console
+      và file theo profile, nên 20 thread log cùng lúc không tranh nhau `print`.
+    '''
+    def __init__(self) -> None:
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.propagate = False
+        self._listener: QueueListener | None = None
+        self._lock = threading.Lock()
+
+    def configure(self,
+        level: int | str = logging.INFO,
+        console: bool = True,
+        log_dir: str | Path | None = None,
+        max_bytes: int = 1_000_000,
+        backup_count: int = 3,
+    ):
+        '''
+        Cấu hình (hoặc cấu hình lại) backend nhật ký.
+
+        Args:
+            level (int | str, optional): Level tối thiểu được ghi. Mặc định INFO (log `show_log=False` là DEBUG).
+            console (bool, optional): Ghi ra console. Mặc định True.
+            log_dir (str | Path, optional): Thư mục ghi file log theo profile. None = không ghi file.
+            max_bytes (int, optional): Dung lượng tối đa mỗi file trước khi xoay vòng. Mặc định 1MB.
+            backup_count (int, optional): Số file cũ giữ lại. Mặc định 3.
+        '''
+        with self._lock:
+            self._stop_listener()
+            handlers = []
+            if console:
+                stream = logging.StreamHandler(sys.stdout)
+                stream.setFormatter(_ConsoleFormatter())
+                handlers.append(stream)
+            if log_dir:
+                handlers.append(ProfileFileHandler(Path(log_dir), max_bytes, backup_count))
+
+            log_queue = queue.SimpleQueue()
+            self.logger.handlers.clear()
+            self.logger.addHandler(QueueHandler(log_queue))
+            self.logger.setLevel(level)
+            self._listener = QueueListener(log_queue, *handlers, respect_handler_level=False)
+            self._listener.start()
+
+    def _ensure(self):
+        if self._listener is None:
+            from .core import DIR_PATH
+            level = os.environ.get('BROWSERKIT_LOG_LEVEL', 'INFO').upper()
+            # BROWSERKIT_LOG_DIR rỗng → tắt ghi file
+            log_dir = os.environ.get('BROWSERKIT_LOG_DIR', str(DIR_PATH / 'logs'))
+            self.configure(level=level, log_dir=log_dir or None)
+
+    def enabled(self, level: int) -> bool:
+        self._ensure()
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level: int, profile_name: str, message, depth: int = 1):
+        '''
+        Ghi một record. `depth` là số frame tính từ hàm gọi `log` tới hàm cần hiển thị tên.
+        '''
+        if not self.enabled(level):
+            return
+        try:
+            caller = sys._getframe(depth + 1).f_code.co_name
+        except ValueError:
+            caller = '?'
+        self.logger.log(level, '%s', message, extra={'profile': profile_name, 'caller': caller})
+
+    def _stop_listener(self):
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+    def flush(self):
+        '''Ghi hết các record còn trong hàng đợi (dừng và khởi động lại listener).'''
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener.start()
+
+    def shutdown(self):
+        with self._lock:
+            self._stop_listener()
+
+backend = LogBackend()
+atexit.register(backend.shutdown)
@@ -0,0 +1,183 @@
+import time
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+import psutil
+
+from .core import Utility
+from .process import ProcessTable, ProcessGroup
+
+@dataclass
+class ResourceUsage:
+    rss_mb: float = 0
+    cpu_percent: float = 0
+    processes: int = 0
+    sampled_at: float = 0
+
+@dataclass
+class ResourceBudget:
+    '''
+    Ngân sách tài nguyên cho một profile.
+
+    Args:
+        max_memory_mb (int, optional): Tổng RSS tối đa (MB) của cây tiến trình Chrome. None = không giới hạn.
+        max_cpu_percent (float, optional): CPU tối đa (%, 100 = một nhân) của cả cây tiến trình.
+        action (str, optional): Xử lý khi vượt ngân sách:
+            - 'warn': chỉ cảnh báo.
+            - 'close_tabs': đóng các tab/cửa sổ nền (giữ tab hiện tại) tại checkpoint kế tiếp.
+            - 'restart': mở lại trình duyệt (cùng profile, cùng URL) tại checkpoint kế tiếp.
+        patience (int, optional): Số lần lấy mẫu liên tiếp vượt ngưỡng trước khi xử lý (tránh phản ứng với đột biến ngắn).
+    '''
+    max_memory_mb: int | None = None
+    max_cpu_percent: float | None = None
+    action: str = 'warn'
+    patience: int = 3
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_memory_mb is not None or self.max_cpu_percent is not None
+
+class _Watch:
+    def __init__(self, group: ProcessGroup, budget: ResourceBudget, restart: Callable | None) -> None:
+        self.group = group
+        self.budget = budget
+        self.restart = restart
+        self.usage: ResourceUsage | None = None
+        self.over = 0
+        self.pending: str | None = None
+
+class ResourceMonitor:
+    '''
+    Thread nền lấy mẫu RSS/CPU của cây tiến trình Chrome theo từng profile.
+
+    - Mỗi lượt chỉ chụp bảng tiến trình một lần (`ProcessTable.snapshot()`) cho toàn bộ profile đang theo dõi.
+    - Vượt ngân sách `patience` lần liên tiếp → cảnh báo, và với action 'close_tabs'/'restart' thì đánh dấu
+      việc cần làm. Việc đó được `Node` thực hiện tại checkpoint an toàn (giữa các bước của `execute_chain`),
+      vì WebDriver không được dùng đồng thời từ thread khác.
+    '''
+    def __init__(self, interval: float = 5) -> None:
+        self.interval = interval
+        self._watches: dict[str, _Watch] = {}
+        self._procs: dict[tuple[int, float], psutil.Process] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def watch(self, profile_name: str, group: ProcessGroup, budget: ResourceBudget | None = None, restart: Callable | None = None):
+        '''
+        Bắt đầu (hoặc cập nhật) theo dõi một profile.
+
+        Args:
+            group (ProcessGroup): Nhóm tiến trình của trình duyệt (leader là chromedriver).
+            budget (ResourceBudget, optional): Ngân sách tài nguyên. Mặc định chỉ đo, không giới hạn.
+            restart (Callable, optional): Hàm mở lại trình duyệt, trả về driver mới. Cần cho action 'restart'.
+        '''
+        with self._lock:
+            self._watches[profile_name] = _Watch(group, budget or ResourceBudget(), restart)
+        if not (self._thread and self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='resource-monitor', daemon=True)
+            self._thread.start()
+
+    def unwatch(self, profile_name: str):
+        with self._lock:
+            self._watches.pop(profile_name, None)
+
+    def usage(self, profile_name: str) -> ResourceUsage | None:
+        '''Mức sử dụng tài nguyên ở lần lấy mẫu gần nhất, None nếu chưa có.'''
+        watch = self._watches.get(profile_name)
+        return watch.usage if watch else None
+
+    def total_rss_mb(self) -> float:
+        '''Tổng RSS (MB) của tất cả profile đang theo dõi.'''
+        with self._lock:
+            return sum(w.usage.rss_mb for w in self._watches.values() if w.usage)
+
+    @staticmethod
+    def host_available_mb() -> float:
+        '''RAM trống (MB) của máy.'''
+        return psutil.virtual_memory().available / 1024 / 1024
+
+    def pop_action(self, profile_name: str) -> str | None:
+        '''Lấy (và xóa) việc cần làm đang chờ của profile: 'close_tabs', 'restart' hoặc None.'''
+        watch = self._watches.get(profile_name)
+        if not watch:
+            return None
+        action, watch.pending = watch.pending, None
+        if action:
+            # Đã xử lý → nếu vẫn vượt ngân sách sẽ báo lại sau `patience` lần lấy mẫu
+            watch.over = 0
+        return action
+
+    def restart(self, profile_name: str):
+        '''Gọi hàm mở lại trình duyệt đã đăng ký, trả về driver mới (hoặc None nếu không hỗ trợ).'''
+        watch = self._watches.get(profile_name)
+        if not watch or not watch.restart:
+            return None
+        return watch.restart()
+
+    def sample(self):
+        '''Lấy mẫu một lượt cho toàn bộ profile đang theo dõi.'''
+        table = ProcessTable.snapshot()
+        with self._lock:
+            watches = list(self._watches.items())
+
+        seen = set()
+        for profile_name, watch in watches:
+            watch.group.refresh(table=table)
+            rss = cpu = 0
+            members = watch.group.alive_members(table)
+            for info in members:
+                key = (info.pid, info.create_time)
+                seen.add(key)
+                try:
+                    proc = self._procs.get(key)
+                    if proc is None:
+                        # Lần đầu cpu_percent() luôn trả 0, từ lần sau mới là % giữa hai lần lấy mẫu
+                        proc = self._procs[key] = psutil.Process(info.pid)
+                    with proc.oneshot():
+                        rss += proc.memory_info().rss
+                        cpu += proc.cpu_percent(None)
+                except psutil.Error:
+                    continue
+            watch.usage = ResourceUsage(round(rss / 1024 / 1024, 1), round(cpu, 1), len(members), time.time())
+            self._enforce(profile_name, watch)
+
+        for key in set(self._procs) - seen:
+            del self._procs[key]
+
+    def _enforce(self, profile_name: str, watch: _Watch):
+        budget, usage = watch.budget, watch.usage
+        if not budget.enabled:
+            return
+        reasons = []
+        if budget.max_memory_mb is not None and usage.rss_mb > budget.max_memory_mb:
+            reasons.append(f'RAM {usage.rss_mb:.0f}/{budget.max_memory_mb} MB')
+        if budget.max_cpu_percent is not None and usage.cpu_percent > budget.max_cpu_percent:
+            reasons.append(f'CPU {usage.cpu_percent:.0f}/{budget.max_cpu_percent:.0f}%')
+
+        if not reasons:
+            watch.over = 0
+            return
+        watch.over += 1
+        if watch.over != budget.patience:
+            return
+
+        # Chỉ báo một lần cho mỗi đợt vượt ngưỡng
+        Utility._logger(profile_name, f'⚠️ Vượt ngân sách tài nguyên: {", ".join(reasons)} ({usage.processes} tiến trình)')
+        if budget.action in ('close_tabs', 'restart'):
+            watch.pending = budget.action
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                Utility._logger(message=f'Lỗi khi theo dõi tài nguyên: {e}')
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
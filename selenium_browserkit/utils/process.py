@@ -0,0 +1,247 @@
+import os
+import json
+import signal
+import subprocess
+from typing import NamedTuple
+
+import psutil
+
+class ProcessInfo(NamedTuple):
+    pid: int
+    ppid: int
+    name: str
+    create_time: float
+
+class ProcessTable:
+    """
+    Ảnh chụp (snapshot) bảng tiến trình của hệ thống tại một thời điểm.
+
+    Liệt kê toàn bộ tiến trình đúng một lần (pid, ppid, name, create_time), sau đó mọi câu hỏi
+    "PID này còn sống không?", "các tiến trình con của PID này?" trong cùng một lượt kiểm tra
+    đều được trả lời từ ảnh chụp, không tạo thêm `psutil.Process` cho từng PID.
+
+    PID bị hệ điều hành tái sử dụng được phát hiện bằng `create_time`: nếu thời điểm tạo khác
+    với giá trị đã ghi nhận, đó là một tiến trình khác.
+    """
+    # Sai số cho phép khi so create_time (psutil làm tròn khác nhau giữa các lần đọc)
+    CTIME_TOLERANCE = 1.0
+
+    def __init__(self, processes: dict[int, ProcessInfo]) -> None:
+        self._processes = processes
+        self._children: dict[int, list[int]] | None = None
+
+    @classmethod
+    def snapshot(cls) -> 'ProcessTable':
+        processes = {}
+        for proc in psutil.process_iter(['pid', 'ppid', 'name', 'create_time', 'status']):
+            info = proc.info
+            if info.get('status') == psutil.STATUS_ZOMBIE or info.get('create_time') is None:
+                continue
+            processes[info['pid']] = ProcessInfo(
+                info['pid'], info.get('ppid') or 0, info.get('name') or '', info['create_time'])
+        return cls(processes)
+
+    @staticmethod
+    def identify(pid: int | None) -> ProcessInfo | None:
+        """Đọc thông tin một tiến trình (dùng khi cần ghi nhận create_time của PID vừa tạo)."""
+        if not pid:
+            return None
+        try:
+            proc = psutil.Process(int(pid))
+            with proc.oneshot():
+                return ProcessInfo(proc.pid, proc.ppid(), proc.name(), proc.create_time())
+        except (psutil.Error, ValueError):
+            return None
+
+    def __len__(self) -> int:
+        return len(self._processes)
+
+    def __contains__(self, pid) -> bool:
+        return self.get(pid) is not None
+
+    def get(self, pid) -> ProcessInfo | None:
+        try:
+            return self._processes.get(int(pid))
+        except (TypeError, ValueError):
+            return None
+
+    def is_alive(self, pid, create_time: float | None = None) -> bool:
+        """
+        Args:
+            pid (int): PID cần kiểm tra.
+            create_time (float, optional): Thời điểm tạo đã ghi nhận. Nếu có, PID trùng nhưng
+                create_time khác được xem là PID đã bị tái sử dụng (tiến trình cũ đã chết).
+        """
+        info = self.get(pid)
+        if info is None:
+            return False
+        if create_time is not None and abs(info.create_time - float(create_time)) > self.CTIME_TOLERANCE:
+            return False
+        return True
+
+    def children(self, pid, recursive: bool = True) -> list[ProcessInfo]:
+        """Các tiến trình con (mặc định gồm cả cháu chắt) của `pid`, theo thứ tự duyệt theo chiều rộng."""
+        if self._children is None:
+            self._children = {}
+            for info in self._processes.values():
+                self._children.setdefault(info.ppid, []).append(info.pid)
+
+        result = []
+        queue = [(child_pid, self.get(pid)) for child_pid in self._children.get(int(pid), [])]
+        while queue:
+            child_pid, parent = queue.pop(0)
+            info = self._processes.get(child_pid)
+            if info is None:
+                continue
+            # Tiến trình con tạo trước cha → ppid đã bị tái sử dụng, không phải con thật
+            if parent and info.create_time + self.CTIME_TOLERANCE < parent.create_time:
+                continue
+            result.append(info)
+            if recursive:
+                queue.extend((grandchild, info) for grandchild in self._children.get(child_pid, []))
+        return result
+
+class ProcessGroup:
+    """
+    Nhóm tiến trình của một trình duyệt: chromedriver (leader) cùng Chrome, renderer, GPU, utility...
+
+    - chromedriver được khởi chạy trong session/process group riêng (`popen_kwargs()`), nên trên Linux/macOS
+      toàn bộ cây tiến trình Chrome dùng chung một pgid và có thể gửi tín hiệu một lần cho cả nhóm.
+    - Danh sách thành viên (pid, create_time) được lưu vào lease để dọn chính xác sau khi tool crash,
+      kể cả trên Windows (không có pgid) hoặc khi tiến trình đã bị tách khỏi cây cha.
+    """
+    def __init__(self, pgid: int | None = None, members: list[ProcessInfo] | None = None, leader: int | None = None) -> None:
+        self.pgid = pgid
+        self.leader = leader
+        self.members: dict[int, ProcessInfo] = {info.pid: info for info in members or []}
+
+    @staticmethod
+    def popen_kwargs() -> dict:
+        """Tham số `popen_kw` cho Service của Selenium để chromedriver chạy trong process group riêng."""
+        if os.name == 'nt':
+            return {'creation_flags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {'start_new_session': True}
+
+    @classmethod
+    def from_leader(cls, pid: int, table: ProcessTable | None = None) -> 'ProcessGroup':
+        """Tạo nhóm từ PID leader (chromedriver) và toàn bộ tiến trình con hiện có."""
+        group = cls(pgid=cls._own_pgid(pid), leader=pid)
+        group.refresh(pid, table)
+        return group
+
+    @staticmethod
+    def _own_pgid(pid: int) -> int | None:
+        # Chỉ dùng pgid khi leader thực sự là trưởng nhóm, tránh gửi tín hiệu nhầm vào nhóm của tool
+        if os.name == 'nt':
+            return None
+        try:
+            pgid = os.getpgid(pid)
+        except OSError:
+            return None
+        return pgid if pgid == pid and pgid != os.getpgid(0) else None
+
+    def refresh(self, pid: int | None = None, table: ProcessTable | None = None):
+        """Bổ sung các tiến trình con mới sinh (renderer, GPU, ...) của leader vào nhóm."""
+        pid = pid or self.leader
+        if not pid:
+            return
+        table = table or ProcessTable.snapshot()
+        leader = table.get(pid)
+        if leader is None:
+            return
+        for info in [leader] + table.children(pid):
+            self.members.setdefault(info.pid, info)
+
+    def alive_members(self, table: ProcessTable) -> list[ProcessInfo]:
+        """Các thành viên còn sống (đúng create_time) theo ảnh chụp `table`; thành viên đã chết bị loại khỏi nhóm."""
+        alive = [info for info in self.members.values() if table.is_alive(info.pid, info.create_time)]
+        self.members = {info.pid: info for info in alive}
+        return alive
+
+    def find(self, name: str) -> ProcessInfo | None:
+        """Thành viên đầu tiên có tên chứa `name` (không phân biệt hoa thường), không tính leader."""
+        for info in list(self.members.values())[1:]:
+            if name in info.name.lower():
+                return info
+        return None
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'pgid': self.pgid,
+            'members': [[info.pid, info.create_time] for info in self.members.values()],
+        })
+
+    @classmethod
+    def from_json(cls, data: str | None) -> 'ProcessGroup':
+        if not data:
+            return cls()
+        try:
+            raw = json.loads(data)
+            members = [ProcessInfo(int(pid), 0, '', float(ctime)) for pid, ctime in raw.get('members', [])]
+            return cls(raw.get('pgid'), members)
+        except (ValueError, TypeError, AttributeError):
+            return cls()
+
+    def _alive(self, table: ProcessTable) -> list[psutil.Process]:
+        procs = []
+        for info in self.members.values():
+            if not table.is_alive(info.pid, info.create_time):
+                continue
+            try:
+                procs.append(psutil.Process(info.pid))
+            except psutil.Error:
+                pass
+        return procs
+
+    @staticmethod
+    def _is_zombie(proc: psutil.Process) -> bool:
+        try:
+            return proc.status() == psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return True
+
+    def _signal_group(self, sig_name: str):
+        # Windows không có process group theo kiểu POSIX (pgid luôn None)
+        if not self.pgid:
+            return
+        try:
+            os.killpg(self.pgid, getattr(signal, sig_name))
+        except OSError:
+            pass
+
+    def terminate(self, timeout: float = 5, table: ProcessTable | None = None) -> bool:
+        """
+        Đóng cả nhóm: gửi SIGTERM cho process group (và từng thành viên đã ghi nhận), chờ tối đa
+        `timeout` giây, tiến trình nào còn sống thì SIGKILL.
+
+        Returns:
+            bool: True nếu không còn thành viên nào sống.
+        """
+        table = table or ProcessTable.snapshot()
+        # Không còn thành viên nào đúng create_time → pgid có thể đã thuộc về nhóm khác, không gửi tín hiệu
+        procs = self._alive(table)
+        if not procs:
+            return True
+
+        self._signal_group('SIGTERM')
+        for proc in procs:
+            try:
+                proc.terminate()
+            except psutil.Error:
+                pass
+        _, alive = psutil.wait_procs(procs, timeout=timeout)
+
+        if alive:
+            self._signal_group('SIGKILL')
+            for proc in alive:
+                try:
+                    proc.kill()
+                except psutil.Error:
+                    pass
+            _, alive = psutil.wait_procs(alive, timeout=timeout)
+
+        # Zombie (đã chết, chờ tiến trình cha thu hồi) không còn chiếm tài nguyên
+        alive = [proc for proc in alive if not self._is_zombie(proc)]
+        for proc in alive:
+            print(f"Không thể đóng tiến trình {proc.pid}")
+        return not alive
@@ -0,0 +1,44 @@
+import time
+import random
+import threading
+
+class TokenBucket:
+    '''
+    Giới hạn tốc độ kiểu token bucket, an toàn giữa các thread.
+
+    Args:
+        rate (float): Số token nạp lại mỗi giây (ví dụ 15 yêu cầu/phút → `rate=15/60`).
+        capacity (float, optional): Số token tối đa (số yêu cầu được phép dồn một lúc). Mặc định 1.
+
+    Dùng thời gian thực (`time.monotonic`), không theo đồng hồ chung: giới hạn của API bên ngoài không đổi theo `speed`.
+    '''
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        '''Lấy một token (có thể "nợ" trước) và trả về số giây cần chờ trước khi được dùng nó.'''
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            if self._tokens >= 0 or self.rate <= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        '''Chờ tới khi có token.'''
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+def backoff(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    '''Thời gian chờ trước lần thử lại thứ `attempt` (bắt đầu từ 0): lũy thừa 2 có "full jitter" để các thread không thử lại cùng lúc.'''
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -0,0 +1,255 @@
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+from .core import Utility, DIR_PATH
+from .process import ProcessTable, ProcessInfo, ProcessGroup
+
+class ProfileRegistry:
+    """
+    Sổ đăng ký quyền sử dụng (lease) profile, lưu trong một file SQLite (WAL) tại thư mục user_data.
+
+    Thay thế các file `.lock`/`.pid` dạng KEY=VALUE:
+        - Mỗi profile đang mở có đúng một lease (profile, tool, owner_pid, chrome_pid, nhóm tiến trình, heartbeat).
+        - Nhận/trả lease trong transaction nguyên tử nên nhiều tool dùng chung user_data không bị tranh chấp.
+        - Tool đang chạy gửi heartbeat định kỳ; lease quá `ttl` giây không có heartbeat được xem là bỏ rơi
+          và được dọn bằng một câu truy vấn có index.
+        - PID luôn đi kèm create_time để không nhầm với tiến trình khác tái sử dụng PID.
+    """
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS leases (
+            profile      TEXT PRIMARY KEY,
+            tool         TEXT NOT NULL,
+            owner_pid    INTEGER NOT NULL,
+            owner_ctime  REAL,
+            chrome_pid   INTEGER,
+            chrome_ctime REAL,
+            processes    TEXT,
+            acquired_at  REAL NOT NULL,
+            heartbeat_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_leases_heartbeat ON leases(heartbeat_at);
+        CREATE INDEX IF NOT EXISTS idx_leases_owner ON leases(owner_pid);
+        CREATE TABLE IF NOT EXISTS tools (
+            pid          INTEGER PRIMARY KEY,
+            ctime        REAL,
+            tool         TEXT NOT NULL,
+            started_at   REAL NOT NULL,
+            heartbeat_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tools_heartbeat ON tools(heartbeat_at);
+    """
+
+    def __init__(self, user_data_dir: Path, ttl: float = 60) -> None:
+        '''
+        Args:
+            user_data_dir (Path): Thư mục user_data chứa các profile.
+            ttl (float, optional): Số giây không có heartbeat thì lease bị xem là hết hạn. Mặc định 60.
+        '''
+        self.path = Path(user_data_dir) / 'profiles.db'
+        self.ttl = ttl
+        self.tool = Utility._sanitize_text(DIR_PATH.name)
+        self._pid = os.getpid()
+        own = ProcessTable.identify(self._pid)
+        self._ctime = own.create_time if own else None
+        self._local = threading.local()
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat_thread: threading.Thread | None = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self._SCHEMA)
+        self._migrate(conn)
+
+    def _migrate(self, conn: sqlite3.Connection):
+        # Bổ sung cột cho file profiles.db tạo bởi phiên bản cũ
+        columns = {
+            'leases': {'owner_ctime': 'REAL', 'chrome_ctime': 'REAL', 'processes': 'TEXT'},
+            'tools': {'ctime': 'REAL'},
+        }
+        for table, wanted in columns.items():
+            existing = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for name, kind in wanted.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3.Connection không dùng chung giữa các thread → mỗi thread một kết nối
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def register_tool(self):
+        """Ghi nhận tool (tiến trình Python) hiện tại đang chạy."""
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO tools(pid, ctime, tool, started_at, heartbeat_at) VALUES (?, ?, ?, ?, ?)",
+            (self._pid, self._ctime, self.tool, now, now))
+
+    def unregister_tool(self):
+        """Xóa tool hiện tại cùng toàn bộ lease nó đang giữ."""
+        conn = self._transaction()
+        try:
+            conn.execute("DELETE FROM leases WHERE owner_pid = ?", (self._pid,))
+            conn.execute("DELETE FROM tools WHERE pid = ?", (self._pid,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def acquire(self, profile_name: str, force: bool = False) -> bool:
+        """
+        Nhận lease cho profile trong một transaction.
+
+        Args:
+            force (bool, optional): True sẽ ghi đè lease của tool khác (dùng khi đã giữ khóa OS của profile).
+
+        Returns:
+            bool: True nếu nhận được (hoặc tool hiện tại đã giữ sẵn), False nếu profile đang được tool khác giữ.
+        """
+        now = time.time()
+        conn = self._transaction()
+        try:
+            row = conn.execute(
+                "SELECT owner_pid FROM leases WHERE profile = ? AND heartbeat_at >= ?",
+                (profile_name, now - self.ttl)).fetchone()
+            if row and row['owner_pid'] != self._pid and not force:
+                conn.execute("ROLLBACK")
+                return False
+
+            conn.execute(
+                "INSERT OR REPLACE INTO leases(profile, tool, owner_pid, owner_ctime, acquired_at, heartbeat_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (profile_name, self.tool, self._pid, self._ctime, now, now))
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def set_processes(self, profile_name: str, group: ProcessGroup, chrome: ProcessInfo | None = None):
+        """Ghi nhóm tiến trình (pgid + toàn bộ PID) và tiến trình Chrome chính vào lease của tool hiện tại."""
+        self._conn().execute(
+            "UPDATE leases SET chrome_pid = ?, chrome_ctime = ?, processes = ?, heartbeat_at = ? "
+            "WHERE profile = ? AND owner_pid = ?",
+            (chrome.pid if chrome else None, chrome.create_time if chrome else None,
+             group.to_json(), time.time(), profile_name, self._pid))
+
+    @staticmethod
+    def process_group(lease: dict, table: ProcessTable) -> ProcessGroup:
+        """Dựng lại nhóm tiến trình từ lease (lease cũ chỉ có chrome_pid → lấy Chrome và cây con hiện tại)."""
+        group = ProcessGroup.from_json(lease.get('processes'))
+        if not group.members and table.is_alive(lease.get('chrome_pid'), lease.get('chrome_ctime')):
+            group.refresh(lease['chrome_pid'], table)
+        return group
+
+    def owns(self, lease: dict | None) -> bool:
+        """True nếu lease do chính tiến trình này giữ (so cả PID lẫn thời điểm tạo tiến trình, không chỉ tên tool)."""
+        if not lease or lease.get('owner_pid') != self._pid:
+            return False
+        owner_ctime = lease.get('owner_ctime')
+        return owner_ctime is None or self._ctime is None or abs(owner_ctime - self._ctime) <= ProcessTable.CTIME_TOLERANCE
+
+    def release(self, profile_name: str, force: bool = False):
+        """
+        Trả lease của profile.
+
+        Args:
+            force (bool, optional): True sẽ xóa lease dù do tool khác giữ. Mặc định False.
+        """
+        if force:
+            self._conn().execute("DELETE FROM leases WHERE profile = ?", (profile_name,))
+        else:
+            self._conn().execute(
+                "DELETE FROM leases WHERE profile = ? AND owner_pid = ?", (profile_name, self._pid))
+
+    def get(self, profile_name: str) -> dict | None:
+        """Trả về lease còn hiệu lực của profile, hoặc None."""
+        row = self._conn().execute(
+            "SELECT * FROM leases WHERE profile = ? AND heartbeat_at >= ?",
+            (profile_name, time.time() - self.ttl)).fetchone()
+        return dict(row) if row else None
+
+    def active(self) -> dict[str, str]:
+        """
+        Returns:
+            dict[str, str]: {profile_name: tên tool} của các lease còn hiệu lực.
+        """
+        rows = self._conn().execute(
+            "SELECT profile, tool FROM leases WHERE heartbeat_at >= ?",
+            (time.time() - self.ttl,)).fetchall()
+        return {row['profile']: row['tool'] for row in rows}
+
+    def heartbeat(self):
+        """Làm mới heartbeat cho tool hiện tại và mọi lease nó đang giữ."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("UPDATE leases SET heartbeat_at = ? WHERE owner_pid = ?", (now, self._pid))
+        conn.execute("UPDATE tools SET heartbeat_at = ? WHERE pid = ?", (now, self._pid))
+
+    def expire(self, table: ProcessTable | None = None) -> list[dict]:
+        """
+        Dọn các lease và tool đã quá `ttl` không có heartbeat (tool bị tắt đột ngột, crash, ...).
+
+        Args:
+            table (ProcessTable, optional): Ảnh chụp bảng tiến trình. Nếu có, lease của tool đã chết
+                (hoặc PID đã bị tái sử dụng) được dọn ngay, không cần chờ hết `ttl`.
+
+        Returns:
+            list[dict]: Các lease vừa bị dọn, để xử lý tiếp (ví dụ kill Chrome còn sót).
+        """
+        deadline = time.time() - self.ttl
+        conn = self._transaction()
+        try:
+            dead_owners = []
+            if table is not None:
+                owners = conn.execute(
+                    "SELECT DISTINCT owner_pid, owner_ctime FROM leases WHERE heartbeat_at >= ? "
+                    "UNION SELECT pid, ctime FROM tools WHERE heartbeat_at >= ?", (deadline, deadline)).fetchall()
+                dead_owners = [row[0] for row in owners if not table.is_alive(row[0], row[1])]
+            marks = ','.join('?' * len(dead_owners))
+            where = f"heartbeat_at < ? OR owner_pid IN ({marks})" if dead_owners else "heartbeat_at < ?"
+
+            rows = conn.execute(f"SELECT * FROM leases WHERE {where}", (deadline, *dead_owners)).fetchall()
+            conn.execute(f"DELETE FROM leases WHERE {where}", (deadline, *dead_owners))
+            conn.execute(f"DELETE FROM tools WHERE {where.replace('owner_pid', 'pid')}", (deadline, *dead_owners))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [dict(row) for row in rows]
+
+    def _heartbeat_loop(self, interval: float):
+        while not self._stop_heartbeat.wait(interval):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                Utility._logger(message=f'Lỗi khi gửi heartbeat {self.path}: {e}')
+
+    def start_heartbeat(self, interval: float | None = None):
+        """Chạy thread nền gửi heartbeat định kỳ (mặc định ttl/3 giây)."""
+        if self._heartbeat_thread and self._heartbeat_thread.is_alive():
+            return
+        self._stop_heartbeat.clear()
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop, args=(interval or self.ttl / 3,),
+            name='profile-registry-heartbeat', daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        self._stop_heartbeat.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join(timeout=5)
+            self._heartbeat_thread = None
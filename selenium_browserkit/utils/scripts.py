@@ -0,0 +1,625 @@
+'''
+Các đoạn JavaScript dùng chung, chạy trong trang qua `execute_script` / `execute_async_script`.
+
+Mỗi script nhận tham số qua `arguments[...]` (không ghép chuỗi) để an toàn với dấu nháy và ký tự đặc biệt.
+'''
+
+# Cài (một lần cho mỗi document) bộ đếm request fetch/XHR đang chạy, thời điểm có hoạt động mạng
+# và thời điểm DOM thay đổi gần nhất. Dùng được cả qua `Page.addScriptToEvaluateOnNewDocument`.
+NETWORK_TRACKER = r'''
+(() => {
+    const w = window;
+    if (w.__bkReady) return;
+    const st = w.__bkReady = {inflight: 0, lastMutation: performance.now(), lastNetwork: performance.now()};
+    const begin = () => { st.inflight++; st.lastNetwork = performance.now(); };
+    const end = () => { st.inflight--; st.lastNetwork = performance.now(); };
+    const fetch0 = w.fetch;
+    if (fetch0) {
+        w.fetch = function () {
+            begin();
+            let p;
+            try { p = fetch0.apply(this, arguments); } catch (e) { end(); throw e; }
+            return p.finally(end);
+        };
+    }
+    const send0 = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        begin();
+        this.addEventListener('loadend', end, {once: true});
+        return send0.apply(this, arguments);
+    };
+    // Ảnh, script, css, ... không đi qua fetch/XHR → lấy thời điểm tải xong từ Resource Timing
+    if (w.PerformanceObserver) {
+        try {
+            new PerformanceObserver((list) => {
+                for (const entry of list.getEntries()) st.lastNetwork = Math.max(st.lastNetwork, entry.responseEnd);
+            }).observe({type: 'resource', buffered: true});
+        } catch (_) {}
+    }
+    const observe = () => new MutationObserver(() => { st.lastMutation = performance.now(); })
+        .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    if (document.documentElement) observe();
+    else document.addEventListener('DOMContentLoaded', observe, {once: true});
+})();
+'''
+
+# Chờ trang "sẵn sàng": DOM đã parse, không còn request fetch/XHR, DOM yên lặng `quiet` ms,
+# phần tử (nếu có) đứng yên giữa 2 frame. Hết `budget` ms thì trả false.
+#   arguments: [budget_ms, quiet_ms, element|null, callback]
+WAIT_READY = NETWORK_TRACKER + r'''
+const [budget, quiet, el] = arguments;
+const done = arguments[arguments.length - 1];
+const st = window.__bkReady;
+const start = performance.now();
+const rectOf = (e) => {
+    try {
+        if (!e.isConnected) return null;
+        const r = e.getBoundingClientRect();
+        return [r.x, r.y, r.width, r.height].join();
+    } catch (_) { return null; }
+};
+let lastRect = null;
+const next = () => {
+    // Tab nền không chạy requestAnimationFrame → setTimeout dự phòng
+    let fired = false;
+    const go = () => { if (!fired) { fired = true; setTimeout(tick, 50); } };
+    requestAnimationFrame(go);
+    setTimeout(go, 150);
+};
+const tick = () => {
+    const now = performance.now();
+    if (now - start >= budget) return done(false);
+    const rect = el ? rectOf(el) : null;
+    const stable = !el || (rect !== null && rect === lastRect);
+    lastRect = rect;
+    if (document.readyState !== 'loading' && st.inflight <= 0 && now - st.lastMutation >= quiet && stable) {
+        return done(true);
+    }
+    next();
+};
+tick();
+'''
+
+# Gõ văn bản vào phần tử ngay trong trang, một phím mỗi lần với độ trễ tính sẵn (sự kiện tổng hợp, isTrusted=false).
+# Ký tự thường: keydown → keypress → insertText (execCommand, fallback native setter + input) → keyup.
+# Phím đặc biệt ({key, code, keyCode}): Enter (xuống dòng trong textarea/contenteditable, gửi form với input),
+#   Tab/Shift... (chuyển focus sang phần tử kế, các phím sau gõ vào phần tử đang focus), Backspace/Delete, mũi tên/Home/End.
+# Tiến độ ghi vào el.__bkTyped; TYPE_TEXT_CANCEL dừng giữa chừng (khi script timeout) và trả về tiến độ.
+#   arguments: [element, keys[] (str | {key, code, keyCode}), delays_ms[], callback] → callback(số phím đã gõ)
+TYPE_TEXT = r'''
+const [el, keys, delays] = arguments;
+const done = arguments[arguments.length - 1];
+el.__bkTyped = 0;
+el.__bkTypeCancel = false;
+const fieldProto = (t) => t instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+    : t instanceof HTMLInputElement ? HTMLInputElement.prototype : null;
+const codeOf = (ch) => /^[a-z]$/i.test(ch) ? 'Key' + ch.toUpperCase()
+    : /^[0-9]$/.test(ch) ? 'Digit' + ch : ch === ' ' ? 'Space' : '';
+const caret = (t) => { try { return [t.selectionStart, t.selectionEnd]; } catch (_) { return [null, null]; } };
+const setCaret = (t, n) => { try { t.setSelectionRange(n, n); } catch (_) {} };
+const focus = () => {
+    if (document.activeElement === el || el.contains(document.activeElement)) return;
+    el.focus();
+    if (fieldProto(el)) setCaret(el, el.value.length);
+};
+// Phần tử nhận phím: phần tử đích, hoặc phần tử được focus sau Tab
+let target = null;
+const current = () => target || el;
+const setValue = (t, value, data, inputType) => {
+    Object.getOwnPropertyDescriptor(fieldProto(t), 'value').set.call(t, value);
+    t.dispatchEvent(new InputEvent('input', {bubbles: true, data: data, inputType: inputType}));
+};
+const insert = (t, text) => {
+    let inserted = false;
+    try { inserted = document.execCommand('insertText', false, text); } catch (_) {}
+    if (!inserted && fieldProto(t)) {
+        const [a, b] = caret(t);
+        const v = t.value;
+        const start = a === null ? v.length : a, end = b === null ? v.length : b;
+        setValue(t, v.slice(0, start) + text + v.slice(end), text, 'insertText');
+        setCaret(t, start + text.length);
+    }
+};
+const remove = (t, forward) => {
+    let removed = false;
+    try { removed = document.execCommand(forward ? 'forwardDelete' : 'delete', false); } catch (_) {}
+    if (!removed && fieldProto(t)) {
+        const [a, b] = caret(t);
+        const v = t.value;
+        let start = a === null ? v.length : a, end = b === null ? v.length : b;
+        if (start === end) { if (forward) end = Math.min(v.length, end + 1); else start = Math.max(0, start - 1); }
+        setValue(t, v.slice(0, start) + v.slice(end), null, forward ? 'deleteContentForward' : 'deleteContentBackward');
+        setCaret(t, start);
+    }
+};
+const tabbable = () => Array.from(document.querySelectorAll(
+    'a[href], button, input, select, textarea, iframe, [tabindex], [contenteditable=""], [contenteditable="true"]'))
+    .filter((n) => n.tabIndex >= 0 && !n.disabled && n.type !== 'hidden' && n.getClientRects().length);
+const special = (t, spec) => {
+    const v = fieldProto(t) ? t.value : null;
+    switch (spec.key) {
+        case 'Enter':
+            if (t instanceof HTMLTextAreaElement) insert(t, '\n');
+            else if (t.isContentEditable) { try { document.execCommand('insertParagraph', false); } catch (_) {} }
+            else if (t instanceof HTMLInputElement && t.form) {
+                if (t.form.requestSubmit) t.form.requestSubmit(); else t.form.submit();
+            } else if (t instanceof HTMLButtonElement || t instanceof HTMLAnchorElement) t.click();
+            return;
+        case 'Tab': {
+            const list = tabbable();
+            const next = list[(list.indexOf(t) + 1) % list.length];
+            if (next) { next.focus(); target = next; }
+            return;
+        }
+        case 'Backspace': return remove(t, false);
+        case 'Delete': return remove(t, true);
+        case 'ArrowLeft': if (v !== null) setCaret(t, Math.max(0, (caret(t)[0] ?? v.length) - 1)); return;
+        case 'ArrowRight': if (v !== null) setCaret(t, Math.min(v.length, (caret(t)[1] ?? v.length) + 1)); return;
+        case 'Home': if (v !== null) setCaret(t, 0); return;
+        case 'End': if (v !== null) setCaret(t, v.length); return;
+    }
+};
+const typeKey = (k) => {
+    if (!target) focus();
+    const t = current();
+    const spec = typeof k === 'string' ? {key: k, code: codeOf(k), keyCode: k.toUpperCase().charCodeAt(0)} : k;
+    const printable = typeof k === 'string';
+    const opts = {key: spec.key, code: spec.code, keyCode: spec.keyCode, which: spec.keyCode,
+                  bubbles: true, cancelable: true, composed: true};
+    if (t.dispatchEvent(new KeyboardEvent('keydown', opts))) {
+        if (printable || spec.key === 'Enter') {
+            t.dispatchEvent(new KeyboardEvent('keypress', {...opts, charCode: printable ? k.charCodeAt(0) : 13}));
+        }
+        if (printable) insert(t, k); else special(t, spec);
+    }
+    current().dispatchEvent(new KeyboardEvent('keyup', opts));
+};
+let i = 0;
+const step = () => {
+    try {
+        if (el.__bkTypeCancel || !el.isConnected || i >= keys.length) return done(i);
+        typeKey(keys[i]);
+        el.__bkTyped = ++i;
+        setTimeout(step, delays[i] || 0);
+    } catch (e) { done(i); }
+};
+setTimeout(step, delays[0] || 0);
+'''
+
+# Dừng TYPE_TEXT đang chạy trên phần tử, trả về số ký tự đã gõ.
+#   arguments: [element] → int
+TYPE_TEXT_CANCEL = r'''
+const el = arguments[0];
+el.__bkTypeCancel = true;
+return el.__bkTyped || 0;
+'''
+
+# Focus phần tử và đặt con trỏ cuối nội dung trước khi gõ phím thật (ActionChains gõ vào phần tử đang focus).
+#   arguments: [element]
+FOCUS_END = r'''
+const el = arguments[0];
+if (document.activeElement !== el) el.focus();
+try {
+    if (el instanceof HTMLInputElement || el instanceof HTMLTextAreaElement) {
+        const n = el.value.length;
+        el.setSelectionRange(n, n);
+    } else if (el.isContentEditable) {
+        const range = document.createRange();
+        range.selectNodeContents(el);
+        range.collapse(false);
+        const selection = getSelection();
+        selection.removeAllRanges();
+        selection.addRange(range);
+    }
+} catch (_) { /* input type email/number không hỗ trợ selection */ }
+'''
+
+# Hàm tìm phần tử theo locator của Selenium (By.*) ngay trong trang, dùng chung cho các script khác.
+LOCATOR_HELPERS = r'''
+const __bkXPath = (expr, root, all) => {
+    const doc = root.ownerDocument || root;
+    if (!all) return doc.evaluate(expr, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    const snap = doc.evaluate(expr, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const out = [];
+    for (let i = 0; i < snap.snapshotLength; i++) out.push(snap.snapshotItem(i));
+    return out;
+};
+const __bkFindAll = (by, value, root) => {
+    root = root || document;
+    switch (by) {
+        case 'id': return [...root.querySelectorAll('[id="' + CSS.escape(value) + '"]')];
+        case 'name': return [...root.querySelectorAll('[name="' + CSS.escape(value) + '"]')];
+        case 'class name': return [...root.querySelectorAll('.' + CSS.escape(value))];
+        case 'tag name': return [...root.querySelectorAll(value)];
+        case 'css selector': return [...root.querySelectorAll(value)];
+        case 'xpath': return __bkXPath(value, root, true);
+        case 'link text': return [...root.querySelectorAll('a')].filter(a => a.textContent.trim() === value);
+        case 'partial link text': return [...root.querySelectorAll('a')].filter(a => a.textContent.includes(value));
+        default: throw new Error('Unsupported locator: ' + by);
+    }
+};
+const __bkFind = (by, value, root) => {
+    root = root || document;
+    if (by === 'xpath') return __bkXPath(value, root, false);
+    if (by === 'css selector' || by === 'tag name') return root.querySelector(value);
+    return __bkFindAll(by, value, root)[0] || null;
+};
+'''
+
+# Điền nhiều trường trong một lần gọi. Dùng native setter của prototype để framework (React/Vue) nhận giá trị mới,
+# sau đó phát input/change. Checkbox/radio: click nếu trạng thái khác giá trị mong muốn.
+#   arguments: [[[by, value, text|bool], ...], root|null] → [[status, detail], ...]
+#   status: 'ok' | 'not_found' | 'rejected' | 'error'
+FILL_FORM = LOCATOR_HELPERS + r'''
+const [fields, root] = arguments;
+const nativeSetter = (el) => {
+    for (const C of [HTMLInputElement, HTMLTextAreaElement, HTMLSelectElement]) {
+        if (el instanceof C) return Object.getOwnPropertyDescriptor(C.prototype, 'value').set;
+    }
+    return null;
+};
+const fire = (el, type) => el.dispatchEvent(new Event(type, {bubbles: true}));
+return fields.map(([by, value, text]) => {
+    let el;
+    try { el = __bkFind(by, value, root); } catch (e) { return ['error', String(e)]; }
+    if (!el) return ['not_found', null];
+    try {
+        el.focus();
+        if (el.type === 'checkbox' || el.type === 'radio') {
+            if (el.checked !== Boolean(text)) el.click();
+            return [el.checked === Boolean(text) ? 'ok' : 'rejected', el.checked];
+        }
+        const setter = nativeSetter(el);
+        if (setter) {
+            setter.call(el, String(text));
+            fire(el, 'input');
+            fire(el, 'change');
+        } else if (el.isContentEditable) {
+            document.getSelection().selectAllChildren(el);
+            document.execCommand('insertText', false, String(text));
+        } else {
+            return ['rejected', 'not editable'];
+        }
+        el.blur();
+        const current = setter ? el.value : el.textContent;
+        return [current === String(text) ? 'ok' : 'rejected', current];
+    } catch (e) {
+        return ['error', String(e)];
+    }
+});
+'''
+
+# Chuẩn hóa văn bản để so khớp: NFC, chữ thường theo locale, gộp khoảng trắng.
+TEXT_HELPERS = r'''
+const __bkFold = (s) => s.normalize('NFC').toLocaleLowerCase().replace(/\s+/g, ' ');
+const __bkSkipTags = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+const __bkVisible = (el) => el.checkVisibility ? el.checkVisibility({checkOpacity: true, checkVisibilityCSS: true})
+    : !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+'''
+
+# Duyệt toàn bộ text của trang MỘT lần (TreeWalker) và dò mọi chuỗi cần tìm cùng lúc bằng Aho–Corasick.
+# Text được nối liền (giống normalize-space(.) của XPath) nên tìm được cả chuỗi trải qua nhiều thẻ con.
+#   arguments: [needles[], with_elements, root|null] → [[needle_index, [elements]|null], ...]
+TEXT_SCAN = TEXT_HELPERS + r'''
+const [needles, withElements, root0] = arguments;
+const root = root0 || document.body || document.documentElement;
+
+// Trie + failure links
+const next = [new Map()], fail = [0], out = [[]], lengths = [];
+needles.forEach((needle, idx) => {
+    const word = __bkFold(needle).trim();
+    lengths.push(word.length);
+    if (!word) return;
+    let s = 0;
+    for (const ch of word) {
+        let t = next[s].get(ch);
+        if (t === undefined) { t = next.length; next.push(new Map()); fail.push(0); out.push([]); next[s].set(ch, t); }
+        s = t;
+    }
+    out[s].push(idx);
+});
+const queue = [...next[0].values()];
+for (let qi = 0; qi < queue.length; qi++) {
+    const s = queue[qi];
+    for (const [ch, t] of next[s]) {
+        let f = fail[s];
+        while (f && !next[f].has(ch)) f = fail[f];
+        const g = next[f].get(ch);
+        fail[t] = g !== undefined && g !== t ? g : 0;
+        out[t] = out[t].concat(out[fail[t]]);
+        queue.push(t);
+    }
+}
+
+const found = new Map();
+const nodes = [], starts = [];
+let state = 0, pos = 0, lastSpace = true;
+const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT, {
+    acceptNode: (n) => n.parentElement && __bkSkipTags.has(n.parentElement.tagName)
+        ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT,
+});
+for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+    let text = __bkFold(node.data);
+    if (lastSpace && text.startsWith(' ')) text = text.slice(1);
+    if (!text) continue;
+    if (withElements) { nodes.push(node); starts.push(pos); }
+    for (const ch of text) {
+        while (state && !next[state].has(ch)) state = fail[state];
+        state = next[state].get(ch) || 0;
+        for (const idx of out[state]) {
+            if (!found.has(idx)) found.set(idx, []);
+            if (withElements) found.get(idx).push([pos + ch.length - lengths[idx], nodes.length - 1]);
+        }
+        pos += ch.length;
+    }
+    lastSpace = text.endsWith(' ');
+}
+
+// Phần tử chứa trọn một lần khớp = tổ tiên chung gần nhất của text node đầu và cuối
+const nodeAt = (offset, hint) => {
+    let lo = 0, hi = hint;
+    while (lo < hi) { const mid = (lo + hi + 1) >> 1; if (starts[mid] <= offset) lo = mid; else hi = mid - 1; }
+    return nodes[lo];
+};
+const commonAncestor = (a, b) => {
+    const range = document.createRange();
+    range.setStartBefore(a); range.setEndAfter(b);
+    let el = range.commonAncestorContainer;
+    return el.nodeType === 1 ? el : el.parentElement;
+};
+return [...found.entries()].map(([idx, hits]) => {
+    if (!withElements) return [idx, null];
+    const elements = new Set(hits.map(([start, endNode]) =>
+        commonAncestor(nodeAt(Math.max(start, 0), endNode), nodes[endNode])));
+    return [idx, [...elements]];
+});
+'''
+
+# Tìm các phần tử NHỎ NHẤT có text khớp (không trả về cả chuỗi tổ tiên như XPath contains(normalize-space(.))).
+# Text mỗi phần tử được gom một lần (bỏ script/style); nhánh nào không chứa chuỗi cần tìm thì bỏ qua cả nhánh.
+#   arguments: [text, mode 'contains'|'exact'|'regex', visible_only, root|null] → [elements]
+FIND_BY_TEXT = TEXT_HELPERS + r'''
+const [text, mode, visibleOnly, root0] = arguments;
+const root = root0 || document.body || document.documentElement;
+
+const texts = new Map();
+const collect = (el) => {
+    let s = '';
+    for (const child of el.childNodes) {
+        if (child.nodeType === 3) s += child.data;
+        else if (child.nodeType === 1 && !__bkSkipTags.has(child.tagName)) s += collect(child);
+    }
+    texts.set(el, s);
+    return s;
+};
+collect(root);
+
+let test, prune = null;
+if (mode === 'regex') {
+    const re = new RegExp(text, 'iu');
+    test = (s) => re.test(s.normalize('NFC').replace(/\s+/g, ' ').trim());
+} else {
+    const needle = __bkFold(text).trim();
+    prune = (s) => __bkFold(s).includes(needle);
+    test = mode === 'exact' ? (s) => __bkFold(s).trim() === needle : prune;
+}
+
+const results = [];
+const visit = (el) => {
+    let inner = false;
+    for (const child of el.children) {
+        if (!texts.has(child)) continue;
+        if (prune && !prune(texts.get(child))) continue;
+        if (visibleOnly && !__bkVisible(child)) continue;
+        if (visit(child)) inner = true;
+    }
+    if (inner) return true;
+    if (el !== root && test(texts.get(el))) {
+        results.push(el);
+        return true;
+    }
+    return false;
+};
+visit(root);
+return results;
+'''
+
+# Thế hệ DOM cho cache phần tử: page_id ngẫu nhiên theo document (đổi khi điều hướng) và bộ đếm
+# tăng mỗi khi DOM đổi cấu trúc hoặc thuộc tính (bỏ qua `style` vì animation đổi liên tục).
+# Chỉ đổi text không làm tăng bộ đếm → phần tử đã cache (vd. nhãn số dư) vẫn dùng lại được.
+#   → [page_id, generation]
+DOM_GENERATION = r'''
+if (!window.__bkDomGen) {
+    const state = window.__bkDomGen = {
+        pageId: Date.now().toString(36) + Math.random().toString(36).slice(2),
+        generation: 0,
+    };
+    new MutationObserver((mutations) => {
+        if (mutations.some((m) => m.type === 'childList' || m.attributeName !== 'style')) state.generation++;
+    }).observe(document, {childList: true, subtree: true, attributes: true});
+}
+return [window.__bkDomGen.pageId, window.__bkDomGen.generation];
+'''
+
+# Chờ nhiều locator cùng lúc trong trang (một vòng lặp duy nhất, kích hoạt bởi MutationObserver và định kỳ).
+#   arguments: [[[by, value], ...], mode 'any'|'all'|'first', budget_ms, root|null, callback]
+#   → [[element|null, ...], [[index, error], ...]]
+# Hết budget mà chưa đạt điều kiện vẫn trả về những gì đang khớp.
+QUERY_MANY = LOCATOR_HELPERS + r'''
+const [locators, mode, budget, root] = arguments;
+const done = arguments[arguments.length - 1];
+const errors = [];
+const broken = new Set();
+const start = performance.now();
+let finished = false, observer = null, timer = null;
+
+const query = () => locators.map(([by, value], i) => {
+    if (broken.has(i)) return null;
+    try {
+        return __bkFind(by, value, root);
+    } catch (e) {
+        broken.add(i);
+        errors.push([i, String(e && e.message || e)]);
+        return null;
+    }
+});
+const check = () => {
+    if (finished) return;
+    let found = query();
+    const ok = mode === 'all' ? found.every(Boolean) : found.some(Boolean);
+    // Locator lỗi (XPath sai, kiểu không hỗ trợ) sẽ không bao giờ khớp → dừng sớm nếu không thể đạt điều kiện
+    const impossible = mode === 'all' ? broken.size > 0 : broken.size === locators.length;
+    if (!ok && !impossible && performance.now() - start < budget) return;
+    if (mode === 'first') {
+        const first = found.findIndex(Boolean);
+        found = found.map((el, i) => (i === first ? el : null));
+    }
+    finished = true;
+    if (observer) observer.disconnect();
+    clearInterval(timer);
+    done([found, errors]);
+};
+
+check();
+if (!finished) {
+    observer = new MutationObserver(check);
+    observer.observe(root || document, {childList: true, subtree: true, attributes: true});
+    timer = setInterval(check, 100);
+}
+'''
+
+# Chờ một điều kiện của phần tử ngay trong trang: kiểm tra lại khi DOM đổi (MutationObserver, gom theo frame)
+# và định kỳ 100ms (rAF bị tạm dừng ở tab nền, CSS transition không sinh mutation).
+#   arguments: [by, value, condition, text, many, budget_ms, root|null, callback]
+#   condition: 'present' | 'visible' | 'clickable' | 'gone' | 'text'
+#   → ['ok', element | elements | null] | ['timeout', null] | ['error', message]
+WAIT_FOR = LOCATOR_HELPERS + TEXT_HELPERS + r'''
+const [by, value, condition, text, many, budget, root] = arguments;
+const done = arguments[arguments.length - 1];
+const start = performance.now();
+const visible = (el) => el.isConnected && __bkVisible(el) && el.getClientRects().length > 0;
+const enabled = (el) => !el.disabled && el.getAttribute('aria-disabled') !== 'true';
+const wanted = condition === 'text' ? String(text).normalize('NFC').replace(/\s+/g, ' ').trim() : null;
+const textOf = (el) => (el.innerText ?? el.textContent ?? '').normalize('NFC').replace(/\s+/g, ' ').trim();
+const accept = {
+    present: () => true,
+    visible: visible,
+    clickable: (el) => visible(el) && enabled(el),
+    text: (el) => textOf(el) === wanted,
+}[condition];
+
+let finished = false, observer = null, timer = null, frame = 0;
+const finish = (result) => {
+    finished = true;
+    if (observer) observer.disconnect();
+    clearInterval(timer);
+    if (frame) cancelAnimationFrame(frame);
+    done(result);
+};
+const evaluate = () => {
+    if (condition === 'gone') {
+        const el = __bkFind(by, value, root);
+        return !el || !visible(el) ? [true, null] : [false];
+    }
+    if (many) {
+        const els = __bkFindAll(by, value, root).filter(accept);
+        return els.length ? [true, els] : [false];
+    }
+    if (condition === 'present') {
+        const el = __bkFind(by, value, root);
+        return el ? [true, el] : [false];
+    }
+    const el = __bkFindAll(by, value, root).find(accept);
+    return el ? [true, el] : [false];
+};
+const check = () => {
+    frame = 0;
+    if (finished) return;
+    try {
+        const [ok, result] = evaluate();
+        if (ok) return finish(['ok', result]);
+    } catch (e) {
+        return finish(['error', String(e && e.message || e)]);
+    }
+    if (performance.now() - start >= budget) finish(['timeout', null]);
+};
+const schedule = () => { if (!frame && !finished) frame = requestAnimationFrame(check); };
+
+if (!accept && condition !== 'gone') {
+    finish(['error', 'Unsupported condition: ' + condition]);
+} else {
+    check();
+    if (!finished) {
+        observer = new MutationObserver(schedule);
+        observer.observe(root || document, {childList: true, subtree: true, attributes: true, characterData: true});
+        timer = setInterval(check, 100);
+    }
+}
+'''
+
+# Chờ một mốc tải trang sau khi điều hướng và trả về thời điểm (ms từ lúc bắt đầu điều hướng) của từng mốc.
+#   arguments: [wait_until 'commit'|'domcontentloaded'|'load'|'networkidle', budget_ms, idle_ms, max_inflight,
+#               old_origin, old_url, callback]
+#   → {reached, stale, url, commit, domcontentloaded, load, networkidle}
+# old_origin/old_url: `performance.timeOrigin`/URL của tài liệu trước khi điều hướng (null = không kiểm tra).
+#   Script còn chạy trong tài liệu cũ (điều hướng chưa commit) → chờ tới khi tài liệu bị hủy hoặc hết budget và trả về
+#   `stale: true` để phía Python chạy lại trong tài liệu mới. Cùng tài liệu nhưng URL đã đổi (#hash, pushState) = đã tới.
+# networkidle: DOM đã parse, số request fetch/XHR đang chạy <= max_inflight và không có hoạt động mạng trong idle_ms.
+NAVIGATION_WAIT = NETWORK_TRACKER + r'''
+const [until, budget, idle, maxInflight, oldOrigin, oldUrl] = arguments;
+const done = arguments[arguments.length - 1];
+const st = window.__bkReady;
+const start = performance.now();
+const stale = () => oldOrigin !== null && oldOrigin !== undefined
+    && performance.timeOrigin === oldOrigin && location.href === oldUrl;
+let idleAt = null;
+const report = (reached) => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    done({
+        reached: reached,
+        stale: !reached && stale(),
+        url: location.href,
+        commit: nav ? nav.responseStart : 0,
+        domcontentloaded: nav && nav.domContentLoadedEventEnd ? nav.domContentLoadedEventEnd : null,
+        load: nav && nav.loadEventEnd ? nav.loadEventEnd : null,
+        networkidle: idleAt,
+    });
+};
+const tick = () => {
+    const now = performance.now();
+    if (stale()) {
+        if (now - start >= budget) return report(false);
+        return setTimeout(tick, 50);
+    }
+    const parsed = document.readyState !== 'loading';
+    if (idleAt === null && parsed && st.inflight <= maxInflight && now - st.lastNetwork >= idle) {
+        idleAt = st.lastNetwork + idle;
+    }
+    const reached = {
+        commit: true,
+        domcontentloaded: parsed,
+        load: document.readyState === 'complete',
+        networkidle: idleAt !== null,
+    }[until];
+    if (reached) return report(true);
+    if (now - start >= budget) return report(false);
+    setTimeout(tick, 50);
+};
+tick();
+'''
+
+# Vùng chụp ảnh (tọa độ CSS px tính theo trang) của phần tử hoặc của khung nhìn hiện tại, kèm devicePixelRatio.
+#   arguments: [element|null] → {x, y, width, height, dpr}
+CAPTURE_GEOMETRY = r'''
+const el = arguments[0];
+const dpr = window.devicePixelRatio || 1;
+if (el) {
+    const r = el.getBoundingClientRect();
+    return {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height, dpr: dpr};
+}
+const root = document.documentElement;
+return {
+    x: window.scrollX, y: window.scrollY,
+    width: root.clientWidth || window.innerWidth, height: root.clientHeight || window.innerHeight, dpr: dpr,
+};
+'''
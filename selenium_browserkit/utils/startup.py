@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .core import Utility
+
+class StartupGraph:
+    '''
+    Chạy các bước kiểm tra trước khi mở tool song song theo đồ thị phụ thuộc.
+
+    - Mỗi bước có tên, chỉ bắt đầu khi mọi bước nó phụ thuộc đã xong (không chiếm worker trong lúc chờ).
+    - Bước lỗi được ghi log và cho kết quả None; các bước phụ thuộc vẫn chạy (tự kiểm tra đầu vào).
+    - Nơi cần kết quả gọi `wait(...)` đúng các bước mình cần → profile mở được ngay khi đủ điều kiện,
+      không chờ các bước chậm không liên quan.
+
+    Ví dụ:
+        graph = StartupGraph()
+        graph.add('chromium', setup_chromium)
+        graph.add('proxy:0', lambda: check(proxy))
+        graph.add('proxies', collect, deps=['proxy:0'])
+        graph.wait('chromium', 'proxies')
+    '''
+    def __init__(self, max_workers: int = 8) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='startup')
+        self._tasks: dict[str, Future] = {}
+        self.durations: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, func: Callable[[], Any], deps: Iterable[str] = ()) -> Future:
+        '''
+        Thêm một bước. Các bước trong `deps` phải được thêm trước (tên không tồn tại bị bỏ qua).
+
+        Returns:
+            Future: Kết quả của `func()` (None nếu lỗi).
+        '''
+        future = Future()
+        with self._lock:
+            dep_futures = [self._tasks[dep] for dep in deps if dep in self._tasks]
+            self._tasks[name] = future
+
+        remaining = [len(dep_futures)]
+        lock = threading.Lock()
+
+        def on_dep_done(_):
+            with lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready:
+                self._pool.submit(self._run, name, func, future)
+
+        if not dep_futures:
+            self._pool.submit(self._run, name, func, future)
+        for dep_future in dep_futures:
+            dep_future.add_done_callback(on_dep_done)
+        return future
+
+    def _run(self, name: str, func: Callable[[], Any], future: Future):
+        start = time.monotonic()
+        try:
+            result = func()
+        except Exception as e:
+            Utility._logger(message=f'❌ Bước kiểm tra "{name}" lỗi: {e}')
+            result = None
+        self.durations[name] = time.monotonic() - start
+        future.set_result(result)
+
+    def done(self, name: str) -> bool:
+        '''True nếu bước `name` đã xong (hoặc không tồn tại).'''
+        future = self._tasks.get(name)
+        return future is None or future.done()
+
+    def wait(self, *names: str, timeout: float | None = None) -> list[Any]:
+        '''
+        Chờ các bước `names` xong (không truyền tên → chờ tất cả). Bước không tồn tại được coi là đã xong.
+
+        Returns:
+            list: Kết quả từng bước theo thứ tự `names` (None nếu lỗi/không tồn tại).
+        '''
+        with self._lock:
+            futures = [self._tasks.get(name) for name in names] if names else list(self._tasks.values())
+        return [future.result(timeout) if future is not None else None for future in futures]
+
+    def shutdown(self):
+        '''Chờ mọi bước xong rồi dừng worker.'''
+        self.wait()
+        self._pool.shutdown(wait=True)
+
+class ValidationCache:
+    '''
+    Ghi nhớ kết quả xác thực token (Telegram `getMe`, Gemini `models.list`) ra đĩa trong `ttl` giây,
+    để mở lại tool trong vài phút không phải gọi mạng lại.
+
+    - Chỉ lưu kết quả thành công; khóa là SHA-256 của token (không lưu token dạng rõ).
+    - Ghi file nguyên tử (`os.replace`), an toàn khi nhiều thread cùng ghi.
+    '''
+    def __init__(self, path: str | Path, ttl: float = 600) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(kind: str, *parts: str | None) -> str:
+        return hashlib.sha256('|'.join([kind, *(part or '' for part in parts)]).encode()).hexdigest()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, kind: str, *parts: str | None) -> dict | None:
+        '''Dữ liệu đã lưu cho (kind, parts) nếu còn hạn, ngược lại None.'''
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._load().get(self._key(kind, *parts))
+        if not entry or entry.get('expires', 0) < time.time():
+            return None
+        return entry.get('data', {})
+
+    def put(self, kind: str, *parts: str | None, **data):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            now = time.time()
+            entries = {key: entry for key, entry in self._load().items() if entry.get('expires', 0) >= now}
+            entries[self._key(kind, *parts)] = {'expires': now + self.ttl, 'data': data}
+            tmp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                tmp_path.unlink(missing_ok=True)
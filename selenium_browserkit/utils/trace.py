@@ -0,0 +1,152 @@
+import time
+import threading
+from dataclasses import dataclass, field
+
+@dataclass
+class StepSpan:
+    '''
+    Thời gian của một bước trong `Node.execute_chain` (đơn vị giây).
+
+    - `sleep`: thời gian ngủ qua đồng hồ chung (`Utility.wait_time`, `wait` trước hành động, ...).
+    - `roundtrip`: tổng thời gian chờ phản hồi của `roundtrips` lệnh WebDriver.
+    - `other`: phần còn lại (chờ poll của WebDriverWait, xử lý Python, ...).
+    - `outcome`: 'ok' | 'failed' (dừng chuỗi) | 'skipped' (thất bại nhưng bỏ qua) | 'error' (ngoại lệ) | 'aborted' (checkpoint thất bại).
+    '''
+    index: int
+    name: str
+    outcome: str = 'ok'
+    attempts: int = 1
+    total: float = 0
+    sleep: float = 0
+    roundtrip: float = 0
+    roundtrips: int = 0
+    error: str | None = None
+
+    @property
+    def other(self) -> float:
+        return max(0.0, self.total - self.sleep - self.roundtrip)
+
+@dataclass
+class ChainResult:
+    '''
+    Kết quả của `Node.execute_chain(..., trace=True)`. Dùng được như bool (True nếu cả chuỗi thành công).
+    '''
+    name: str
+    ok: bool = True
+    spans: list[StepSpan] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    @property
+    def total(self) -> float:
+        return sum(span.total for span in self.spans)
+
+    def summary(self) -> str:
+        lines = [f'{self.name}: {"ok" if self.ok else "failed"} {self.total:.2f}s']
+        for span in self.spans:
+            lines.append(
+                f'  #{span.index} {span.name:<24} {span.outcome:<8} {span.total:6.2f}s '
+                f'(sleep {span.sleep:.2f}s, rtt {span.roundtrip:.2f}s/{span.roundtrips}, other {span.other:.2f}s'
+                f'{f", x{span.attempts}" if span.attempts > 1 else ""})')
+        return '\n'.join(lines)
+
+class RoundTripMeter:
+    '''
+    Đếm số lệnh WebDriver và tổng thời gian chờ phản hồi bằng cách bọc `driver.execute`
+    (mọi lệnh của Selenium, kể cả trong WebDriverWait, đều đi qua hàm này).
+    '''
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+    @classmethod
+    def of(cls, driver) -> 'RoundTripMeter':
+        '''Trả về bộ đếm của driver, cài vào driver ở lần gọi đầu tiên.'''
+        meter = driver.__dict__.get('_bk_meter')
+        if meter is None:
+            meter = cls()
+            execute = driver.execute
+
+            def timed_execute(driver_command, params=None):
+                start = time.perf_counter()
+                try:
+                    return execute(driver_command, params)
+                finally:
+                    meter.count += 1
+                    meter.seconds += time.perf_counter() - start
+
+            driver.execute = timed_execute
+            driver._bk_meter = meter
+        return meter
+
+    def read(self) -> tuple[int, float]:
+        return self.count, self.seconds
+
+class LatencyReport:
+    '''
+    Gom thời gian các bước `execute_chain` của mọi profile trong một lần chạy, theo (chuỗi, thứ tự bước, tên bước).
+    '''
+    def __init__(self) -> None:
+        self._spans: dict[tuple[str, int, str], list[StepSpan]] = {}
+        self._profiles: dict[tuple[str, int, str], set[str]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, profile_name: str, result: ChainResult):
+        with self._lock:
+            for span in result.spans:
+                key = (result.name, span.index, span.name)
+                self._spans.setdefault(key, []).append(span)
+                self._profiles.setdefault(key, set()).add(profile_name)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    @staticmethod
+    def _percentile(values: list[float], q: float) -> float:
+        values = sorted(values)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def steps(self) -> list[dict]:
+        '''
+        Returns:
+            list[dict]: Thống kê từng bước, sắp xếp theo tổng thời gian giảm dần (bước tốn thời gian nhất lên đầu).
+        '''
+        with self._lock:
+            items = [(key, list(spans), len(self._profiles[key])) for key, spans in self._spans.items()]
+
+        rows = []
+        for (chain, index, name), spans, profiles in items:
+            totals = [span.total for span in spans]
+            count = len(spans)
+            rows.append({
+                'chain': chain,
+                'index': index,
+                'step': name,
+                'count': count,
+                'profiles': profiles,
+                'ok': sum(span.outcome == 'ok' for span in spans),
+                'retries': sum(span.attempts - 1 for span in spans),
+                'sum': sum(totals),
+                'mean': sum(totals) / count,
+                'p50': self._percentile(totals, 0.5),
+                'p95': self._percentile(totals, 0.95),
+                'max': max(totals),
+                'sleep': sum(span.sleep for span in spans) / count,
+                'roundtrip': sum(span.roundtrip for span in spans) / count,
+                'roundtrips': sum(span.roundtrips for span in spans) / count,
+                'other': sum(span.other for span in spans) / count,
+            })
+        rows.sort(key=lambda row: row['sum'], reverse=True)
+        return rows
+
+    def format(self, limit: int | None = 20) -> str:
+        '''Bảng thống kê dạng chữ (mặc định 20 bước tốn thời gian nhất).'''
+        rows = self.steps()[:limit]
+        lines = [f'{"chuỗi / bước":<44} {"n":>4} {"ok":>4} {"p50":>7} {"p95":>7} {"sleep":>7} {"rtt":>7} {"lệnh":>5} {"khác":>7}']
+        for row in rows:
+            label = f'{row["chain"][:24]} #{row["index"]} {row["step"]}'[:44]
+            lines.append(
+                f'{label:<44} {row["count"]:>4} {row["ok"]:>4} {row["p50"]:>6.2f}s {row["p95"]:>6.2f}s '
+                f'{row["sleep"]:>6.2f}s {row["roundtrip"]:>6.2f}s {row["roundtrips"]:>5.1f} {row["other"]:>6.2f}s')
+        return '\n'.join(lines)